@@ -1,5 +1,6 @@
 """Tests for wtools.utils.video -- JPEGBIN1 read/write."""
 
+import asyncio
 import os
 import struct
 
@@ -12,9 +13,24 @@ from wtools.utils.video import (
     HEADER_SIZE,
     HEADER_STRUCT,
     MAGIC,
+    SUPPORTED_VERSIONS,
+    FrameCache,
     JPEGBinError,
+    JPEGBinIndex,
+    JPEGBinReader,
+    JPEGBinShardReader,
+    JPEGBinShardWriter,
+    JPEGBinWriter,
+    SharedFrameCache,
+    aread_jpeg_bin,
+    aread_jpeg_bin_metadata,
+    build_jpeg_bin_index,
     read_jpeg_bin,
+    read_jpeg_bin_batch,
     read_jpeg_bin_metadata,
+    read_jpeg_bin_segments,
+    repack_jpeg_bin,
+    verify_jpeg_bin,
     video_to_jpeg_bin,
     write_jpeg_bin,
 )
@@ -125,6 +141,23 @@ class TestWriteJpegBin:
         with pytest.raises(ValueError, match="frame_indices"):
             _write_bin(path, frames, frame_indices=[0, 1, 2])
 
+    def test_parallel_encode_matches_serial(self, tmp_path):
+        """Encoding on a thread pool should produce a byte-identical file."""
+        frames = _make_frames(n=9)
+        serial = tmp_path / "serial.bin"
+        parallel = tmp_path / "parallel.bin"
+        _write_bin(serial, frames)
+        write_jpeg_bin(
+            output_path=str(parallel),
+            frames=frames,
+            source_fps=30.0,
+            sample_fps=2.0,
+            total_num_frames=300,
+            workers=4,
+        )
+
+        assert parallel.read_bytes() == serial.read_bytes()
+
     def test_jpeg_quality_affects_size(self, tmp_path):
         """Lower quality should produce a smaller file (for random frames)."""
         frames = _make_frames(n=10, height=64, width=64, seed=123)
@@ -138,6 +171,85 @@ class TestWriteJpegBin:
         assert os.path.getsize(str(path_lq)) < os.path.getsize(str(path_hq))
 
 
+# ---------------------------------------------------------------------------
+# JPEGBinWriter tests
+# ---------------------------------------------------------------------------
+class TestJPEGBinWriter:
+    @pytest.mark.parametrize("expected_nframes", [None, 3, 5, 8])
+    @pytest.mark.parametrize("workers", [None, 3])
+    def test_matches_write_jpeg_bin(self, tmp_path, expected_nframes, workers):
+        """Streaming output should be byte-identical to write_jpeg_bin."""
+        frames = _make_frames(n=5)
+        indices = [0, 15, 30, 45, 60]
+        ref = tmp_path / "ref.bin"
+        _write_bin(ref, frames, frame_indices=indices)
+
+        path = tmp_path / "stream.bin"
+        with JPEGBinWriter(
+            str(path),
+            source_fps=30.0,
+            sample_fps=2.0,
+            total_num_frames=300,
+            expected_nframes=expected_nframes,
+            workers=workers,
+        ) as writer:
+            for idx, frame in zip(indices, frames):
+                writer.append(frame, idx)
+            assert len(writer) == 5
+
+        assert path.read_bytes() == ref.read_bytes()
+        assert sorted(os.listdir(str(tmp_path))) == ["ref.bin", "stream.bin"]
+
+    def test_default_frame_indices(self, tmp_path):
+        """Frame indices should default to the append order."""
+        path = tmp_path / "default_idx.bin"
+        with JPEGBinWriter(str(path), 30.0, 2.0, 300) as writer:
+            for frame in _make_frames(n=3):
+                writer.append(frame)
+
+        assert read_jpeg_bin_metadata(str(path))["frame_indices"] == [0, 1, 2]
+
+    def test_exception_discards_output(self, tmp_path):
+        """An exception inside the block should leave no file behind."""
+        path = tmp_path / "aborted.bin"
+        with pytest.raises(RuntimeError):
+            with JPEGBinWriter(str(path), 30.0, 2.0, 300) as writer:
+                writer.append(_make_frames(n=1)[0])
+                raise RuntimeError("boom")
+
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_empty_raises(self, tmp_path):
+        """Closing without frames should raise and clean up."""
+        path = tmp_path / "empty.bin"
+        writer = JPEGBinWriter(str(path), 30.0, 2.0, 300)
+        with pytest.raises(ValueError, match="empty"):
+            writer.close()
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_inconsistent_frame_shapes_raises(self, tmp_path):
+        """Frames with different dimensions should raise ValueError."""
+        path = tmp_path / "bad.bin"
+        with JPEGBinWriter(str(path), 30.0, 2.0, 300) as writer:
+            writer.append(np.zeros((32, 48, 3), dtype=np.uint8))
+            with pytest.raises(ValueError, match="shape"):
+                writer.append(np.zeros((64, 48, 3), dtype=np.uint8))
+
+        assert read_jpeg_bin_metadata(str(path))["nframes"] == 1
+
+    def test_header_fields_updatable_before_close(self, tmp_path):
+        """total_num_frames and selected_duration can be set late."""
+        path = tmp_path / "late.bin"
+        with JPEGBinWriter(str(path), 25.0, 5.0, 0) as writer:
+            writer.append(_make_frames(n=1)[0])
+            writer.total_num_frames = 50
+            writer.selected_duration = 1.5
+
+        meta = read_jpeg_bin_metadata(str(path))
+        assert meta["total_num_frames"] == 50
+        assert meta["selected_duration"] == pytest.approx(1.5)
+
+
 # ---------------------------------------------------------------------------
 # read_jpeg_bin_metadata tests
 # ---------------------------------------------------------------------------
@@ -168,7 +280,7 @@ class TestReadJpegBinMetadata:
         assert meta["video_backend"] == "jpeg_bin"
         assert len(meta["jpeg_lengths"]) == 5
         assert all(l > 0 for l in meta["jpeg_lengths"])
-        assert meta["payload_offset"] == 60 + 5 * 16
+        assert meta["payload_offset"] == 60 + 5 * 20
 
     def test_selected_duration_default(self, tmp_path):
         """selected_duration should default to total_num_frames / source_fps."""
@@ -454,6 +566,49 @@ class TestReadJpegBinReturnFormat:
         with pytest.raises(ValueError, match="return_format"):
             read_jpeg_bin(str(path), return_format="png")
 
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"start_frame": 2, "end_frame": 5},
+            {"num_frames": 3},
+            {"frame_interval": 4},
+        ],
+    )
+    def test_bytes_returns_payloads(self, tmp_path, kwargs):
+        """return_format='bytes' should return the stored JPEG payloads."""
+        import base64 as b64
+
+        path = tmp_path / "bytes.bin"
+        _write_bin(path, _make_frames(n=9, height=16, width=16))
+
+        views, meta, fps = read_jpeg_bin(str(path), return_format="bytes", **kwargs)
+        encoded, meta_b64, fps_b64 = read_jpeg_bin(
+            str(path), return_format="base64", **kwargs
+        )
+        assert all(isinstance(v, memoryview) and v.readonly for v in views)
+        assert [bytes(v) for v in views] == [b64.b64decode(s) for s in encoded]
+        assert meta == meta_b64
+        assert fps == fps_b64
+
+    def test_bytes_share_one_buffer(self, tmp_path):
+        """All returned views should slice a single buffer."""
+        path = tmp_path / "onebuf.bin"
+        _write_bin(path, _make_frames(n=4))
+
+        views, _, _ = read_jpeg_bin(str(path), return_format="bytes")
+        assert len({id(v.obj) for v in views}) == 1
+
+    def test_bytes_truncated_raises(self, tmp_path):
+        """A truncated payload span should raise JPEGBinError."""
+        path = tmp_path / "span.bin"
+        _write_bin(path, _make_frames(n=3))
+
+        with open(str(path), "r+b") as f:
+            f.truncate(os.path.getsize(str(path)) - 1)
+        with pytest.raises(JPEGBinError):
+            read_jpeg_bin(str(path), return_format="bytes")
+
 
 # ---------------------------------------------------------------------------
 # read_jpeg_bin sub-sampling tests
@@ -687,6 +842,1432 @@ class TestReadJpegBinSubSampling:
         assert meta["nframes"] == 3
 
 
+# ---------------------------------------------------------------------------
+# read_jpeg_bin parallel decode tests
+# ---------------------------------------------------------------------------
+class TestReadJpegBinWorkers:
+    def test_parallel_matches_serial(self, tmp_path):
+        """Decoding on a thread pool should give identical frames."""
+        frames = _make_frames(n=12, height=32, width=48)
+        path = tmp_path / "par.bin"
+        _write_bin(path, frames)
+
+        serial, meta_s, fps_s = read_jpeg_bin(str(path), num_frames=7)
+        parallel, meta_p, fps_p = read_jpeg_bin(str(path), num_frames=7, workers=4)
+        np.testing.assert_array_equal(parallel, serial)
+        assert meta_p == meta_s
+        assert fps_p == fps_s
+
+    def test_parallel_reader(self, tmp_path):
+        """JPEGBinReader.read should accept workers too."""
+        frames = _make_frames(n=6, height=16, width=16)
+        path = tmp_path / "par_reader.bin"
+        _write_bin(path, frames)
+
+        expected, _, _ = read_jpeg_bin(str(path))
+        with JPEGBinReader(str(path)) as reader:
+            result, _, _ = reader.read(workers=3)
+        np.testing.assert_array_equal(result, expected)
+
+    @pytest.mark.parametrize("func", ["read", "batch", "write"])
+    def test_workers_bounds_concurrency(self, tmp_path, monkeypatch, func):
+        """workers caps the threads used even after the pool has grown."""
+        import threading
+        import time
+
+        from wtools.utils import video
+
+        path = tmp_path / "bounded.bin"
+        frames = _make_frames(n=16, height=16, width=16)
+        _write_bin(path, frames)
+        read_jpeg_bin(str(path), workers=8)
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def tracking(target):
+            def wrapper(*args, **kwargs):
+                with lock:
+                    state["running"] += 1
+                    state["peak"] = max(state["peak"], state["running"])
+                time.sleep(0.005)
+                try:
+                    return target(*args, **kwargs)
+                finally:
+                    with lock:
+                        state["running"] -= 1
+
+            return wrapper
+
+        monkeypatch.setattr(
+            video, "_decode_jpeg_payload", tracking(video._decode_jpeg_payload)
+        )
+        monkeypatch.setattr(
+            video, "_encode_jpeg_frame", tracking(video._encode_jpeg_frame)
+        )
+        if func == "read":
+            read_jpeg_bin(str(path), workers=2)
+        elif func == "batch":
+            read_jpeg_bin_batch([str(path)] * 2, workers=2)
+        else:
+            write_jpeg_bin(str(tmp_path / "out.bin"), frames, 30.0, 2.0, 16, workers=2)
+        assert state["peak"] == 2
+
+    def test_parallel_corrupt_payload_raises(self, tmp_path):
+        """Decode errors in worker threads should propagate."""
+        frames = _make_frames(n=4)
+        path = tmp_path / "par_corrupt.bin"
+        _write_bin(path, frames)
+
+        meta = read_jpeg_bin_metadata(str(path), validate_size=False)
+        offset = meta["payload_offset"] + meta["jpeg_lengths"][0] + 2
+        with open(str(path), "r+b") as f:
+            f.seek(offset)
+            f.write(b"\x00" * 20)
+
+        with pytest.raises(JPEGBinError, match="JPEG decode failed"):
+            read_jpeg_bin(str(path), workers=2)
+
+    def test_header_shape_mismatch_raises(self, tmp_path):
+        """A payload whose size disagrees with the header should raise."""
+        frames = _make_frames(n=2, height=16, width=16)
+        path = tmp_path / "mismatch.bin"
+        _write_bin(path, frames)
+
+        # Rewrite the header's width field.
+        with open(str(path), "r+b") as f:
+            header = list(HEADER_STRUCT.unpack(f.read(HEADER_SIZE)))
+            header[7] = 32
+            f.seek(0)
+            f.write(HEADER_STRUCT.pack(*header))
+
+        with pytest.raises(JPEGBinError, match="shape"):
+            read_jpeg_bin(str(path))
+
+
+# ---------------------------------------------------------------------------
+# read_jpeg_bin out= tests
+# ---------------------------------------------------------------------------
+class TestReadJpegBinOut:
+    def test_out_is_filled_and_returned(self, tmp_path):
+        """Frames should be decoded into the caller's buffer."""
+        frames = _make_frames(n=6, height=16, width=24)
+        path = tmp_path / "out.bin"
+        _write_bin(path, frames)
+
+        expected, _, _ = read_jpeg_bin(str(path), num_frames=4)
+        buf = np.zeros((4, 16, 24, 3), dtype=np.uint8)
+        for workers in (None, 2):
+            buf[...] = 0
+            video, _, _ = read_jpeg_bin(
+                str(path), num_frames=4, out=buf, workers=workers
+            )
+            assert video is buf
+            np.testing.assert_array_equal(buf, expected)
+
+    def test_out_reader(self, tmp_path):
+        """JPEGBinReader.read should accept out too."""
+        frames = _make_frames(n=3, height=16, width=16)
+        path = tmp_path / "out_reader.bin"
+        _write_bin(path, frames)
+
+        buf = np.empty((3, 16, 16, 3), dtype=np.uint8)
+        with JPEGBinReader(str(path)) as reader:
+            video, _, _ = reader.read(out=buf)
+        assert video is buf
+
+    @pytest.mark.parametrize(
+        "buf",
+        [
+            np.empty((2, 16, 16, 3), dtype=np.uint8),
+            np.empty((3, 16, 16, 3), dtype=np.float32),
+            np.empty((3, 16, 32, 3), dtype=np.uint8)[:, :, ::2],
+        ],
+    )
+    def test_bad_out_raises(self, tmp_path, buf):
+        """Mismatched shape, dtype or layout should raise ValueError."""
+        frames = _make_frames(n=3, height=16, width=16)
+        path = tmp_path / "bad_out.bin"
+        _write_bin(path, frames)
+
+        with pytest.raises(ValueError, match="out"):
+            read_jpeg_bin(str(path), out=buf)
+
+
+# ---------------------------------------------------------------------------
+# read_jpeg_bin target_size tests
+# ---------------------------------------------------------------------------
+class TestReadJpegBinTargetSize:
+    def _smooth_frames(self, n=3, height=128, width=192):
+        rng = np.random.RandomState(0)
+        return [
+            cv2.GaussianBlur(
+                rng.randint(0, 256, (height, width, 3), dtype=np.uint8), (15, 15), 5
+            )
+            for _ in range(n)
+        ]
+
+    @pytest.mark.parametrize(
+        "target_size", [(24, 16), (48, 32), (96, 64), (100, 70), (192, 128)]
+    )
+    def test_matches_full_decode_then_resize(self, tmp_path, target_size):
+        """Reduced decode should closely match full decode + INTER_AREA resize."""
+        path = tmp_path / "reduce.bin"
+        _write_bin(path, self._smooth_frames())
+
+        full, _, _ = read_jpeg_bin(str(path))
+        video, meta, _ = read_jpeg_bin(str(path), target_size=target_size)
+        assert video.shape == (3, target_size[1], target_size[0], 3)
+        expected = np.stack(
+            [cv2.resize(f, target_size, interpolation=cv2.INTER_AREA) for f in full]
+        )
+        assert np.abs(video.astype(int) - expected).mean() < 2.0
+        # Metadata still describes the stored frames.
+        assert (meta["width"], meta["height"]) == (192, 128)
+
+    def test_upscale(self, tmp_path):
+        """A target larger than the stored frames should be resized up."""
+        path = tmp_path / "up.bin"
+        _write_bin(path, _make_frames(n=2, height=16, width=16))
+
+        video, _, _ = read_jpeg_bin(str(path), target_size=(40, 20), workers=2)
+        assert video.shape == (2, 20, 40, 3)
+
+    def test_reader_target_size(self, tmp_path):
+        """JPEGBinReader.read and decode should accept target_size."""
+        path = tmp_path / "reader_reduce.bin"
+        _write_bin(path, self._smooth_frames())
+
+        expected, _, _ = read_jpeg_bin(str(path), target_size=(48, 32))
+        with JPEGBinReader(str(path)) as reader:
+            video, _, _ = reader.read(target_size=(48, 32))
+            np.testing.assert_array_equal(video, expected)
+            np.testing.assert_array_equal(
+                reader.decode(1, target_size=(48, 32)), expected[1]
+            )
+
+    def test_invalid_target_size_raises(self, tmp_path):
+        """Non-positive target sizes should raise ValueError."""
+        path = tmp_path / "bad_size.bin"
+        _write_bin(path, _make_frames(n=2))
+
+        with pytest.raises(ValueError, match="target_size"):
+            read_jpeg_bin(str(path), target_size=(0, 10))
+
+
+# ---------------------------------------------------------------------------
+# read_jpeg_bin coalesced read tests
+# ---------------------------------------------------------------------------
+class TestReadJpegBinCoalesce:
+    @pytest.fixture
+    def read_calls(self, monkeypatch):
+        """Record the (offset, length) of every payload read."""
+        from wtools.utils import video
+
+        calls = []
+        read_payload = video._read_jpeg_payload
+
+        def counting(fin, offset, length, *args):
+            calls.append((offset, length))
+            return read_payload(fin, offset, length, *args)
+
+        monkeypatch.setattr(video, "_read_jpeg_payload", counting)
+        return calls
+
+    @pytest.mark.parametrize("return_format", ["numpy", "base64", "bytes"])
+    def test_contiguous_range_is_one_read(self, tmp_path, read_calls, return_format):
+        """A contiguous selection should be fetched with a single read."""
+        path = tmp_path / "range.bin"
+        _write_bin(path, _make_frames(n=20))
+        expected, _, _ = read_jpeg_bin(str(path), return_format=return_format)
+
+        read_calls.clear()
+        result, _, _ = read_jpeg_bin(
+            str(path), return_format=return_format, start_frame=3, end_frame=15
+        )
+        assert len(read_calls) == 1
+        if return_format == "numpy":
+            np.testing.assert_array_equal(result, expected[3:15])
+        else:
+            assert result == expected[3:15]
+
+    def test_gap_tolerance(self, tmp_path, read_calls):
+        """max_gap should control whether strided frames are merged."""
+        path = tmp_path / "gap.bin"
+        _write_bin(path, _make_frames(n=12))
+        expected, _, _ = read_jpeg_bin(str(path), frame_interval=3)
+
+        read_calls.clear()
+        merged, _, _ = read_jpeg_bin(str(path), frame_interval=3)
+        assert len(read_calls) == 1
+        np.testing.assert_array_equal(merged, expected)
+
+        read_calls.clear()
+        separate, _, _ = read_jpeg_bin(str(path), frame_interval=3, max_gap=0)
+        assert len(read_calls) == 4
+        np.testing.assert_array_equal(separate, expected)
+
+    def test_runs_are_read_lazily(self, tmp_path, read_calls):
+        """Each run is read only when its first frame is consumed."""
+        from wtools.utils.video import _read_payloads
+
+        path = tmp_path / "lazy.bin"
+        frames = _make_frames(n=12)
+        _write_bin(path, frames)
+        meta = read_jpeg_bin_metadata(str(path))
+        offsets = np.concatenate([[0], np.cumsum(meta["jpeg_lengths"])])
+        offsets += meta["payload_offset"]
+        expected, _, _ = read_jpeg_bin(str(path), return_format="bytes")
+
+        read_calls.clear()
+        with open(str(path), "rb") as fin:
+            payloads = _read_payloads(fin, offsets, [0, 1, 6, 1], str(path), 0)
+            assert bytes(next(payloads)) == bytes(expected[0])
+            assert len(read_calls) == 1
+            assert bytes(next(payloads)) == bytes(expected[1])
+            assert len(read_calls) == 1
+            assert [bytes(p) for p in payloads] == [
+                bytes(expected[6]),
+                bytes(expected[1]),
+            ]
+        assert len(read_calls) == 2
+
+    def test_negative_max_gap_raises(self, tmp_path):
+        """A negative max_gap should raise ValueError."""
+        path = tmp_path / "neg.bin"
+        _write_bin(path, _make_frames(n=2))
+
+        with pytest.raises(ValueError, match="max_gap"):
+            read_jpeg_bin(str(path), max_gap=-1)
+
+    def test_truncated_run_raises(self, tmp_path):
+        """A run cut short by truncation should raise JPEGBinError."""
+        path = tmp_path / "trunc.bin"
+        _write_bin(path, _make_frames(n=3))
+        size = os.path.getsize(str(path))
+        with open(str(path), "r+b") as f:
+            f.truncate(size - 5)
+
+        with pytest.raises(JPEGBinError):
+            read_jpeg_bin(str(path), return_format="bytes")
+
+
+# ---------------------------------------------------------------------------
+# read_jpeg_bin_segments tests
+# ---------------------------------------------------------------------------
+SEGMENTS = [
+    {"start_frame": 0, "end_frame": 8, "num_frames": 4},
+    {"start_frame": 4, "end_frame": 12, "num_frames": 4},
+    {"frame_interval": 5},
+    {},
+]
+
+
+class TestReadJpegBinSegments:
+    @pytest.fixture
+    def bin_path(self, tmp_path):
+        path = tmp_path / "segments.bin"
+        _write_bin(path, _make_frames(n=16), frame_indices=list(range(0, 160, 10)))
+        return str(path)
+
+    def test_matches_read_jpeg_bin(self, bin_path):
+        """Each segment should equal the matching read_jpeg_bin call."""
+        results = read_jpeg_bin_segments(bin_path, SEGMENTS, workers=4)
+        assert len(results) == len(SEGMENTS)
+        for (video, meta, fps), segment in zip(results, SEGMENTS):
+            expected, expected_meta, expected_fps = read_jpeg_bin(bin_path, **segment)
+            np.testing.assert_array_equal(video, expected)
+            assert meta == expected_meta
+            assert fps == pytest.approx(expected_fps)
+
+    def test_decodes_each_frame_once(self, bin_path, monkeypatch):
+        """Overlapping segments should decode shared frames only once."""
+        from wtools.utils import video
+
+        decoded = []
+        decode = video._decode_jpeg_payload
+
+        def counting(payload, path, frame_idx, *args):
+            decoded.append(frame_idx)
+            return decode(payload, path, frame_idx, *args)
+
+        monkeypatch.setattr(video, "_decode_jpeg_payload", counting)
+        segments = [{"start_frame": 0, "end_frame": 8}, {"start_frame": 4}]
+        read_jpeg_bin_segments(bin_path, segments)
+        assert sorted(decoded) == list(range(16))
+
+    def test_segments_are_independent(self, bin_path):
+        """Writing to one segment must not change another."""
+        segments = [{"end_frame": 4}, {"end_frame": 4}]
+        (first, _, _), (second, _, _) = read_jpeg_bin_segments(bin_path, segments)
+        first[:] = 0
+        assert second.any()
+
+    def test_target_size(self, bin_path):
+        """target_size should apply to every segment."""
+        results = read_jpeg_bin_segments(bin_path, SEGMENTS[:2], target_size=(24, 16))
+        for (video, _, _), segment in zip(results, SEGMENTS[:2]):
+            expected, _, _ = read_jpeg_bin(bin_path, target_size=(24, 16), **segment)
+            assert video.shape == (4, 16, 24, 3)
+            np.testing.assert_array_equal(video, expected)
+
+    def test_reader_matches_function(self, bin_path):
+        """JPEGBinReader.read_segments should match read_jpeg_bin_segments."""
+        expected = read_jpeg_bin_segments(bin_path, SEGMENTS)
+        with JPEGBinReader(bin_path) as reader:
+            results = reader.read_segments(SEGMENTS, workers=2)
+        for (video, meta, fps), (exp_video, exp_meta, exp_fps) in zip(
+            results, expected
+        ):
+            np.testing.assert_array_equal(video, exp_video)
+            assert meta == exp_meta
+            assert fps == exp_fps
+
+    def test_invalid_segments_raise(self, bin_path):
+        """Empty, out-of-range and unknown-key segments should raise."""
+        with pytest.raises(ValueError, match="empty"):
+            read_jpeg_bin_segments(bin_path, [])
+        with pytest.raises(ValueError, match="num_frames"):
+            read_jpeg_bin_segments(bin_path, [{"end_frame": 2, "num_frames": 3}])
+        with pytest.raises(TypeError):
+            read_jpeg_bin_segments(bin_path, [{"stop": 3}])
+
+
+# ---------------------------------------------------------------------------
+# read_jpeg_bin_batch tests
+# ---------------------------------------------------------------------------
+class TestReadJpegBinBatch:
+    @pytest.fixture
+    def bin_paths(self, tmp_path):
+        paths = []
+        for i, n in enumerate([10, 12, 9]):
+            path = tmp_path / f"clip{i}.bin"
+            _write_bin(path, _make_frames(n=n, seed=i))
+            paths.append(str(path))
+        return paths
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_matches_stacked_reads(self, bin_paths, workers):
+        """The batch should equal stacking per-file read_jpeg_bin calls."""
+        batch, metas, fps = read_jpeg_bin_batch(
+            bin_paths, num_frames=6, workers=workers
+        )
+        assert batch.shape == (3, 6, 32, 48, 3)
+        for b, path in enumerate(bin_paths):
+            expected, expected_meta, expected_fps = read_jpeg_bin(path, num_frames=6)
+            np.testing.assert_array_equal(batch[b], expected)
+            assert metas[b] == expected_meta
+            assert fps[b] == pytest.approx(expected_fps)
+
+    def test_decodes_into_out(self, bin_paths):
+        """A preallocated out buffer should be filled and returned."""
+        buf = np.zeros((3, 4, 32, 48, 3), dtype=np.uint8)
+        batch, _, _ = read_jpeg_bin_batch(bin_paths, num_frames=4, out=buf)
+        assert batch is buf
+        assert buf.any()
+
+        with pytest.raises(ValueError, match="shape"):
+            read_jpeg_bin_batch(bin_paths, num_frames=5, out=buf)
+
+    def test_mixed_resolution_needs_target_size(self, tmp_path, bin_paths):
+        """Files of different sizes should be resized to target_size."""
+        big = tmp_path / "big.bin"
+        _write_bin(big, _make_frames(n=8, height=64, width=96))
+        paths = bin_paths[:1] + [str(big)]
+
+        with pytest.raises(ValueError, match="target_size"):
+            read_jpeg_bin_batch(paths, num_frames=4)
+
+        batch, _, _ = read_jpeg_bin_batch(
+            paths, num_frames=4, target_size=(24, 16), workers=2
+        )
+        assert batch.shape == (2, 4, 16, 24, 3)
+        for b, path in enumerate(paths):
+            expected, _, _ = read_jpeg_bin(path, num_frames=4, target_size=(24, 16))
+            np.testing.assert_array_equal(batch[b], expected)
+
+    def test_different_lengths_raise(self, bin_paths):
+        """Clips of different lengths cannot share a batch."""
+        with pytest.raises(ValueError, match="num_frames"):
+            read_jpeg_bin_batch(bin_paths)
+
+    def test_empty_paths_raise(self):
+        with pytest.raises(ValueError, match="empty"):
+            read_jpeg_bin_batch([])
+
+
+# ---------------------------------------------------------------------------
+# FrameCache tests
+# ---------------------------------------------------------------------------
+class TestFrameCache:
+    def test_second_read_hits(self, tmp_path):
+        """A repeated read should be served from the cache."""
+        path = tmp_path / "cache.bin"
+        _write_bin(path, _make_frames(n=6))
+        expected, exp_meta, exp_fps = read_jpeg_bin(str(path))
+
+        cache = FrameCache()
+        for _ in range(2):
+            video, meta, fps = read_jpeg_bin(str(path), cache=cache)
+            np.testing.assert_array_equal(video, expected)
+            assert meta == exp_meta
+            assert fps == exp_fps
+        stats = cache.stats()
+        assert stats["misses"] == 6
+        assert stats["hits"] == 6
+        assert stats["entries"] == 6
+        assert stats["nbytes"] == expected.nbytes
+
+    def test_partial_hits(self, tmp_path):
+        """Only frames missing from the cache should be decoded."""
+        path = tmp_path / "partial.bin"
+        _write_bin(path, _make_frames(n=8))
+        expected, _, _ = read_jpeg_bin(str(path))
+
+        cache = FrameCache()
+        read_jpeg_bin(str(path), start_frame=0, end_frame=4, cache=cache)
+        video, _, _ = read_jpeg_bin(str(path), frame_interval=2, cache=cache)
+        np.testing.assert_array_equal(video, expected[::2])
+        assert cache.hits == 2
+        assert cache.misses == 6
+
+    def test_target_size_is_part_of_key(self, tmp_path):
+        """Frames decoded at different sizes are cached separately."""
+        path = tmp_path / "sizes.bin"
+        _write_bin(path, _make_frames(n=2, height=32, width=48))
+
+        cache = FrameCache()
+        full, _, _ = read_jpeg_bin(str(path), cache=cache)
+        small, _, _ = read_jpeg_bin(str(path), target_size=(24, 16), cache=cache)
+        assert small.shape == (2, 16, 24, 3)
+        assert cache.hits == 0
+        again, _, _ = read_jpeg_bin(str(path), target_size=(24, 16), cache=cache)
+        np.testing.assert_array_equal(again, small)
+        assert cache.hits == 2
+
+    def test_lru_eviction(self, tmp_path):
+        """The byte budget should evict least-recently-used frames."""
+        path = tmp_path / "lru.bin"
+        _write_bin(path, _make_frames(n=4, height=8, width=8))
+        frame_bytes = 8 * 8 * 3
+
+        cache = FrameCache(max_bytes=2 * frame_bytes)
+        read_jpeg_bin(str(path), start_frame=0, end_frame=2, cache=cache)
+        read_jpeg_bin(str(path), start_frame=0, end_frame=1, cache=cache)
+        read_jpeg_bin(str(path), start_frame=2, end_frame=3, cache=cache)
+        assert len(cache) == 2
+        assert cache.nbytes == 2 * frame_bytes
+        assert cache.evictions == 1
+        # Frame 0 was used most recently, so frame 1 was evicted.
+        read_jpeg_bin(str(path), start_frame=0, end_frame=1, cache=cache)
+        assert cache.hits == 2
+
+    def test_invalidated_on_rewrite(self, tmp_path):
+        """Rewriting the bin should drop its cached frames."""
+        path = tmp_path / "rewrite.bin"
+        _write_bin(path, _make_frames(n=3, seed=1))
+        cache = FrameCache()
+        read_jpeg_bin(str(path), cache=cache)
+
+        _write_bin(path, _make_frames(n=3, height=32, width=48, seed=2))
+        os.utime(str(path), ns=(0, 123))
+        expected, _, _ = read_jpeg_bin(str(path))
+        video, _, _ = read_jpeg_bin(str(path), cache=cache)
+        np.testing.assert_array_equal(video, expected)
+        assert cache.hits == 0
+        assert len(cache) == 3
+
+    def test_cached_frames_are_isolated(self, tmp_path):
+        """Mutating a returned clip must not corrupt the cache."""
+        path = tmp_path / "isolated.bin"
+        _write_bin(path, _make_frames(n=2))
+        cache = FrameCache()
+
+        video, _, _ = read_jpeg_bin(str(path), cache=cache)
+        expected = video.copy()
+        video[:] = 0
+        again, _, _ = read_jpeg_bin(str(path), cache=cache)
+        np.testing.assert_array_equal(again, expected)
+
+    def test_clear_and_invalid_budget(self):
+        """clear() empties the cache; a negative budget is rejected."""
+        cache = FrameCache(max_bytes=100)
+        frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        cache.put("a.bin", 0, (1, 1), frame)
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.nbytes == 0
+        with pytest.raises(ValueError, match="max_bytes"):
+            FrameCache(max_bytes=-1)
+
+
+# ---------------------------------------------------------------------------
+# SharedFrameCache tests
+# ---------------------------------------------------------------------------
+def _shared_cache_worker(args):
+    cache_dir, path = args
+    cache = SharedFrameCache(cache_dir)
+    video, _, _ = read_jpeg_bin(path, cache=cache)
+    return cache.hits, cache.misses, video
+
+
+class TestSharedFrameCache:
+    def test_shared_between_instances(self, tmp_path):
+        """A frame decoded through one instance is a hit for another."""
+        path = tmp_path / "shared.bin"
+        _write_bin(path, _make_frames(n=4))
+        expected, _, _ = read_jpeg_bin(str(path))
+        cache_dir = str(tmp_path / "cache")
+
+        first = SharedFrameCache(cache_dir)
+        read_jpeg_bin(str(path), cache=first)
+        assert (first.hits, first.misses) == (0, 4)
+
+        second = SharedFrameCache(cache_dir)
+        video, _, _ = read_jpeg_bin(str(path), cache=second)
+        np.testing.assert_array_equal(video, expected)
+        assert (second.hits, second.misses) == (4, 0)
+        assert second.footprint() == {
+            "files": 4,
+            "nbytes": sum(
+                os.path.getsize(os.path.join(d, f))
+                for d, _, files in os.walk(cache_dir)
+                for f in files
+            ),
+        }
+
+    def test_shared_between_processes(self, tmp_path):
+        """Worker processes should reuse frames cached by the parent."""
+        import multiprocessing
+
+        path = tmp_path / "procs.bin"
+        _write_bin(path, _make_frames(n=3))
+        cache_dir = str(tmp_path / "cache")
+        read_jpeg_bin(str(path), cache=SharedFrameCache(cache_dir))
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(2) as pool:
+            results = pool.map(_shared_cache_worker, [(cache_dir, str(path))] * 2)
+        expected, _, _ = read_jpeg_bin(str(path))
+        for hits, misses, video in results:
+            assert (hits, misses) == (3, 0)
+            np.testing.assert_array_equal(video, expected)
+
+    def test_frames_are_read_only_mappings(self, tmp_path):
+        """get() should return read-only memory-mapped frames."""
+        cache = SharedFrameCache(str(tmp_path / "cache"))
+        frame = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+        cache.put("a.bin", 5, (1, 2), frame, (3, 2))
+
+        cached = cache.get("a.bin", 5, (1, 2), (3, 2))
+        assert isinstance(cached, np.memmap)
+        assert not cached.flags.writeable
+        np.testing.assert_array_equal(cached, frame)
+        assert cache.get("a.bin", 5, (1, 2)) is None
+        assert cache.get("a.bin", 5, (1, 3), (3, 2)) is None
+        leftovers = [f for _, _, files in os.walk(cache.cache_dir) for f in files]
+        assert not any(f.endswith(".tmp") for f in leftovers)
+
+    def test_invalidated_on_rewrite(self, tmp_path):
+        """Frames of a rewritten bin should not be served."""
+        path = tmp_path / "rewrite.bin"
+        _write_bin(path, _make_frames(n=2, seed=1))
+        cache = SharedFrameCache(str(tmp_path / "cache"))
+        read_jpeg_bin(str(path), cache=cache)
+
+        _write_bin(path, _make_frames(n=2, height=32, width=48, seed=2))
+        os.utime(str(path), ns=(0, 123))
+        expected, _, _ = read_jpeg_bin(str(path))
+        video, _, _ = read_jpeg_bin(str(path), cache=cache)
+        np.testing.assert_array_equal(video, expected)
+        assert cache.hits == 0
+
+    def test_prune(self, tmp_path):
+        """prune() should delete the oldest frames down to the budget."""
+        cache = SharedFrameCache(str(tmp_path / "cache"))
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        for i in range(4):
+            cache.put("a.bin", i, (1, 1), frame)
+            os.utime(cache._path("a.bin", i, (1, 1), None), (i, i))
+        size = cache.footprint()["nbytes"] // 4
+
+        assert cache.prune(2 * size) == 2
+        assert cache.footprint()["files"] == 2
+        assert [cache.get("a.bin", i, (1, 1)) is None for i in range(4)] == [
+            True,
+            True,
+            False,
+            False,
+        ]
+        cache.clear()
+        assert cache.footprint() == {"files": 0, "nbytes": 0}
+        with pytest.raises(ValueError, match="max_bytes"):
+            SharedFrameCache(str(tmp_path / "bad"), max_bytes=-1)
+
+    def test_default_dir_is_private(self, tmp_path, monkeypatch):
+        """The default directory is per user, mode 0o700 and owned by us."""
+        from wtools.utils import video
+
+        assert str(os.getuid()) in os.path.basename(video._default_shared_cache_dir())
+
+        cache_dir = tmp_path / "frames"
+        monkeypatch.setattr(video, "_default_shared_cache_dir", lambda: str(cache_dir))
+        cache = SharedFrameCache()
+        assert cache.cache_dir == str(cache_dir)
+        assert os.stat(str(cache_dir)).st_mode & 0o777 == 0o700
+
+        os.chmod(str(cache_dir), 0o777)
+        SharedFrameCache()
+        assert os.stat(str(cache_dir)).st_mode & 0o777 == 0o700
+
+        os.rmdir(str(cache_dir))
+        (tmp_path / "elsewhere").mkdir()
+        os.symlink(str(tmp_path / "elsewhere"), str(cache_dir))
+        with pytest.raises(PermissionError, match="owned by the current user"):
+            SharedFrameCache()
+
+        if os.getuid() == 0:
+            os.unlink(str(cache_dir))
+            cache_dir.mkdir()
+            os.chown(str(cache_dir), 12345, 12345)
+            with pytest.raises(PermissionError):
+                SharedFrameCache()
+
+    def test_default_budget_prunes(self, tmp_path):
+        """Writes past the default budget should prune the oldest frames."""
+        cache = SharedFrameCache(str(tmp_path / "cache"))
+        assert cache.max_bytes == 1 << 30
+
+        cache = SharedFrameCache(str(tmp_path / "small"), max_bytes=4096)
+        frame = np.zeros((16, 16, 3), dtype=np.uint8)
+        for i in range(8):
+            cache.put("a.bin", i, (1, 1), frame)
+        assert cache.footprint()["nbytes"] <= 4096
+
+    def test_write_error_does_not_fail_read(self, tmp_path, monkeypatch):
+        """A full cache directory should be counted, not raised."""
+        path = tmp_path / "full.bin"
+        _write_bin(path, _make_frames(n=3))
+        expected, _, _ = read_jpeg_bin(str(path))
+        cache = SharedFrameCache(str(tmp_path / "cache"))
+
+        def no_space(*args, **kwargs):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(np, "save", no_space)
+        video, _, _ = read_jpeg_bin(str(path), cache=cache)
+        np.testing.assert_array_equal(video, expected)
+        assert cache.write_errors == 3
+        assert cache.footprint() == {"files": 0, "nbytes": 0}
+        leftovers = [f for _, _, files in os.walk(cache.cache_dir) for f in files]
+        assert leftovers == []
+
+
+# ---------------------------------------------------------------------------
+# format version / verify_jpeg_bin tests
+# ---------------------------------------------------------------------------
+def _downgrade_to_v1(path):
+    """Rewrite a current-version bin as a version 1 file (no CRC table)."""
+    meta = read_jpeg_bin_metadata(str(path))
+    n = meta["nframes"]
+    with open(str(path), "rb") as f:
+        data = f.read()
+    header = list(HEADER_STRUCT.unpack(data[:HEADER_SIZE]))
+    header[1] = 1
+    with open(str(path), "wb") as f:
+        f.write(HEADER_STRUCT.pack(*header))
+        f.write(data[HEADER_SIZE : HEADER_SIZE + n * 16])
+        f.write(data[meta["payload_offset"] :])
+
+
+class TestFormatVersion:
+    def test_crc32_table(self, tmp_path):
+        """Writers should store the CRC-32 of every payload."""
+        import zlib
+
+        path = tmp_path / "crc.bin"
+        _write_bin(path, _make_frames(n=4))
+        meta = read_jpeg_bin_metadata(str(path))
+        assert SUPPORTED_VERSIONS == (1, FORMAT_VERSION)
+
+        payloads, _, _ = read_jpeg_bin(str(path), return_format="bytes")
+        assert meta["crc32"] == [zlib.crc32(p) for p in payloads]
+        with JPEGBinReader(str(path)) as reader:
+            assert reader.crc32.tolist() == meta["crc32"]
+            assert reader.metadata == meta
+
+    def test_streaming_writer_crc32(self, tmp_path):
+        """JPEGBinWriter should store the same CRC-32s as write_jpeg_bin."""
+        frames = _make_frames(n=5)
+        ref = tmp_path / "ref.bin"
+        _write_bin(ref, frames, sample_fps=30.0, total_num_frames=5)
+        for expected_nframes in (None, 5, 3):
+            path = tmp_path / f"stream{expected_nframes}.bin"
+            with JPEGBinWriter(
+                str(path),
+                source_fps=30.0,
+                sample_fps=30.0,
+                total_num_frames=5,
+                expected_nframes=expected_nframes,
+            ) as writer:
+                for frame in frames:
+                    writer.append(frame)
+            with open(str(path), "rb") as f, open(str(ref), "rb") as fref:
+                assert f.read() == fref.read()
+
+    def test_v1_files_are_readable(self, tmp_path):
+        """Version 1 files (no CRC table) should still be read."""
+        path = tmp_path / "v1.bin"
+        frames = _make_frames(n=3)
+        _write_bin(path, frames)
+        expected, exp_meta, _ = read_jpeg_bin(str(path))
+        _downgrade_to_v1(path)
+
+        meta = read_jpeg_bin_metadata(str(path))
+        assert meta["crc32"] is None
+        assert meta["payload_offset"] == 60 + 3 * 16
+        video, meta, _ = read_jpeg_bin(str(path))
+        np.testing.assert_array_equal(video, expected)
+        assert meta == exp_meta
+        with JPEGBinReader(str(path)) as reader:
+            assert reader.crc32 is None
+            np.testing.assert_array_equal(reader[:], expected)
+        report = verify_jpeg_bin(str(path))
+        assert report["ok"]
+        assert not report["checksummed"]
+
+
+class TestVerifyJpegBin:
+    def test_valid_file(self, tmp_path):
+        """A freshly written file should verify cleanly."""
+        path = tmp_path / "ok.bin"
+        _write_bin(path, _make_frames(n=4))
+
+        report = verify_jpeg_bin(str(path), decode=True)
+        assert report == {
+            "path": str(path),
+            "nframes": 4,
+            "checksummed": True,
+            "bad_frames": [],
+            "ok": True,
+        }
+
+    def test_bit_flip_detected(self, tmp_path):
+        """A single flipped payload bit should be reported by frame."""
+        path = tmp_path / "flip.bin"
+        _write_bin(path, _make_frames(n=4))
+        meta = read_jpeg_bin_metadata(str(path))
+        offset = meta["payload_offset"] + sum(meta["jpeg_lengths"][:2]) + 100
+        with open(str(path), "r+b") as f:
+            f.seek(offset)
+            byte = f.read(1)[0]
+            f.seek(offset)
+            f.write(bytes([byte ^ 0x01]))
+
+        report = verify_jpeg_bin(str(path))
+        assert report["bad_frames"] == [2]
+        assert not report["ok"]
+
+    def test_v1_marker_and_decode_checks(self, tmp_path):
+        """Without checksums, markers and (optionally) decoding are checked."""
+        path = tmp_path / "v1bad.bin"
+        _write_bin(path, _make_frames(n=3))
+        _downgrade_to_v1(path)
+        meta = read_jpeg_bin_metadata(str(path))
+        with open(str(path), "r+b") as f:
+            # Break frame 0's SOI marker and overwrite frame 2's scan data.
+            f.seek(meta["payload_offset"])
+            f.write(b"\x00")
+            f.seek(meta["payload_offset"] + sum(meta["jpeg_lengths"][:2]))
+            f.write(b"\xff\xd8" + b"\x00" * 40)
+
+        assert verify_jpeg_bin(str(path))["bad_frames"] == [0]
+        assert verify_jpeg_bin(str(path), decode=True)["bad_frames"] == [0, 2]
+
+    def test_truncated_file_raises(self, tmp_path):
+        """Structural corruption should raise JPEGBinError."""
+        path = tmp_path / "trunc.bin"
+        _write_bin(path, _make_frames(n=2))
+        with open(str(path), "r+b") as f:
+            f.truncate(os.path.getsize(str(path)) - 3)
+
+        with pytest.raises(JPEGBinError, match="size"):
+            verify_jpeg_bin(str(path))
+
+
+# ---------------------------------------------------------------------------
+# repack_jpeg_bin tests
+# ---------------------------------------------------------------------------
+class TestRepackJpegBin:
+    @pytest.fixture
+    def src(self, tmp_path):
+        path = tmp_path / "src.bin"
+        _write_bin(
+            path,
+            _make_frames(n=6, height=32, width=48),
+            frame_indices=[0, 15, 30, 45, 60, 75],
+            jpeg_quality=95,
+        )
+        return path
+
+    def _smooth_src(self, path):
+        """A bin of smooth frames, so re-encoding error stays small."""
+        ramp = np.linspace(0, 255, 48, dtype=np.uint8)
+        frames = [np.broadcast_to(ramp[None, :, None], (32, 48, 3)).copy()] * 4
+        _write_bin(path, frames, frame_indices=[3, 9, 15, 21])
+        return path
+
+    def test_requality_preserves_metadata(self, tmp_path, src):
+        """Re-encoding should keep indices, rates and durations."""
+        dst = tmp_path / "q50.bin"
+        info = repack_jpeg_bin(str(src), str(dst), jpeg_quality=50)
+
+        old = read_jpeg_bin_metadata(str(src))
+        new = read_jpeg_bin_metadata(str(dst))
+        for key in (
+            "nframes",
+            "frame_indices",
+            "total_num_frames",
+            "source_fps",
+            "sample_fps",
+            "selected_duration",
+            "width",
+            "height",
+        ):
+            assert new[key] == old[key]
+        assert new["jpeg_quality"] == info["jpeg_quality"] == 50
+        assert info["file_size"] == os.path.getsize(str(dst))
+        assert info["file_size"] < os.path.getsize(str(src))
+        assert verify_jpeg_bin(str(dst))["ok"]
+
+    def test_downscale(self, tmp_path):
+        """max_size should shrink frames like read_jpeg_bin(target_size=...)."""
+        src = self._smooth_src(tmp_path / "smooth.bin")
+        dst = tmp_path / "small.bin"
+        info = repack_jpeg_bin(str(src), str(dst), max_size=24)
+
+        assert (info["width"], info["height"]) == (24, 16)
+        assert info["jpeg_quality"] == 95
+        expected, _, _ = read_jpeg_bin(str(src), target_size=(24, 16))
+        video, meta, _ = read_jpeg_bin(str(dst))
+        assert meta["frame_indices"] == [3, 9, 15, 21]
+        assert video.shape == (4, 16, 24, 3)
+        diff = np.abs(video.astype(np.int16) - expected.astype(np.int16))
+        assert diff.mean() < 3
+
+    def test_never_upscales(self, tmp_path, src):
+        dst = tmp_path / "same.bin"
+        info = repack_jpeg_bin(str(src), str(dst), max_size=100)
+        assert (info["width"], info["height"]) == (48, 32)
+
+    def test_workers_match_serial(self, tmp_path, src):
+        """Threaded repacking should produce the same file."""
+        serial = tmp_path / "serial.bin"
+        threaded = tmp_path / "threaded.bin"
+        repack_jpeg_bin(str(src), str(serial), jpeg_quality=80, max_size=24)
+        repack_jpeg_bin(
+            str(src), str(threaded), jpeg_quality=80, max_size=24, workers=4
+        )
+        assert threaded.read_bytes() == serial.read_bytes()
+
+    def test_in_place_upgrades_v1(self, tmp_path, src):
+        """Repacking a v1 file in place should yield a checksummed file."""
+        _downgrade_to_v1(src)
+        assert read_jpeg_bin_metadata(str(src))["crc32"] is None
+
+        repack_jpeg_bin(str(src), str(src), jpeg_quality=90)
+        meta = read_jpeg_bin_metadata(str(src))
+        assert meta["crc32"] is not None
+        assert meta["frame_indices"] == [0, 15, 30, 45, 60, 75]
+        assert verify_jpeg_bin(str(src))["checksummed"]
+
+    @pytest.mark.parametrize("workers", [None, 2])
+    def test_streams_frames(self, tmp_path, monkeypatch, workers):
+        """Frames are written as they are decoded, keeping their colours."""
+        from wtools.utils import video
+
+        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)] * 10
+        frames = [np.full((16, 16, 3), c, dtype=np.uint8) for c in colors]
+        src = tmp_path / "colors.bin"
+        _write_bin(src, frames)
+
+        decoded = []
+        first_encode = []
+        decode, encode = video._decode_jpeg_payload, video._encode_jpeg_frame
+
+        def counting_decode(*args):
+            decoded.append(args[2])
+            return decode(*args)
+
+        def counting_encode(*args):
+            if not first_encode:
+                first_encode.append(len(decoded))
+            return encode(*args)
+
+        monkeypatch.setattr(video, "_decode_jpeg_payload", counting_decode)
+        monkeypatch.setattr(video, "_encode_jpeg_frame", counting_encode)
+        dst = tmp_path / "stream.bin"
+        repack_jpeg_bin(str(src), str(dst), max_size=8, workers=workers)
+
+        assert len(decoded) == len(frames)
+        assert first_encode[0] <= 2 * (workers or 1)
+        video_out, _, _ = read_jpeg_bin(str(dst))
+        expected, _, _ = read_jpeg_bin(str(src), target_size=(8, 8))
+        diff = np.abs(video_out.astype(np.int16) - expected.astype(np.int16))
+        assert diff.max() < 16
+
+    def test_invalid_max_size(self, tmp_path, src):
+        with pytest.raises(ValueError, match="max_size"):
+            repack_jpeg_bin(str(src), str(tmp_path / "bad.bin"), max_size=0)
+
+
+# ---------------------------------------------------------------------------
+# JPEGBinIndex tests
+# ---------------------------------------------------------------------------
+class TestJPEGBinIndex:
+    def _make_tree(self, root):
+        paths = []
+        for i, sub in enumerate(["", "a", "a/b"]):
+            d = root / sub
+            d.mkdir(parents=True, exist_ok=True)
+            path = d / f"clip{i}.bin"
+            _write_bin(
+                path,
+                _make_frames(n=i + 2, height=16 + 8 * i, width=24, seed=i),
+                source_fps=25.0 + i,
+                sample_fps=2.0,
+                total_num_frames=100 * (i + 1),
+                frame_indices=list(range(0, 7 * (i + 2), 7)),
+            )
+            paths.append(path)
+        (root / "notes.txt").write_text("not a bin")
+        return paths
+
+    def test_metadata_matches_bins(self, tmp_path):
+        """Index lookups should equal read_jpeg_bin_metadata on each bin."""
+        root = tmp_path / "bins"
+        paths = self._make_tree(root)
+        index_path = str(tmp_path / "index.npz")
+
+        info = build_jpeg_bin_index(str(root), index_path, workers=4)
+        assert info["nfiles"] == 3
+        assert info["nframes"] == 2 + 3 + 4
+        assert info["errors"] == {}
+
+        index = JPEGBinIndex(index_path)
+        assert len(index) == 3
+        assert index.paths == ["a/b/clip2.bin", "a/clip1.bin", "clip0.bin"]
+        for path in paths:
+            expected = read_jpeg_bin_metadata(str(path))
+            assert index.metadata(str(path)) == expected
+            assert index.metadata(os.path.relpath(path, root)) == expected
+            assert str(path) in index
+
+    def test_columns(self, tmp_path):
+        """Per-file columns should be available for vectorized queries."""
+        root = tmp_path / "bins"
+        self._make_tree(root)
+        build_jpeg_bin_index(str(root), str(tmp_path / "index.npz"))
+
+        index = JPEGBinIndex(str(tmp_path / "index.npz"))
+        assert index.column("nframes").tolist() == [4, 3, 2]
+        assert index.column("height").tolist() == [32, 24, 16]
+        assert index.column("source_fps").tolist() == [27.0, 26.0, 25.0]
+        with pytest.raises(KeyError):
+            index.column("frame_indices")
+
+    def test_version_column_from_header(self, tmp_path, monkeypatch):
+        """The index stores each file's header version, not a guess."""
+        from wtools.utils import video
+
+        root = tmp_path / "bins"
+        root.mkdir()
+        for name in ("v1.bin", "v2.bin", "v3.bin"):
+            _write_bin(root / name, _make_frames(n=2))
+        _downgrade_to_v1(root / "v1.bin")
+        # A future version with the v2 layout.
+        with open(str(root / "v3.bin"), "r+b") as f:
+            header = list(HEADER_STRUCT.unpack(f.read(HEADER_SIZE)))
+            header[1] = 3
+            f.seek(0)
+            f.write(HEADER_STRUCT.pack(*header))
+        monkeypatch.setattr(video, "SUPPORTED_VERSIONS", (1, 2, 3))
+
+        build_jpeg_bin_index(str(root), str(tmp_path / "index.npz"))
+        index = JPEGBinIndex(str(tmp_path / "index.npz"))
+        assert index.paths == ["v1.bin", "v2.bin", "v3.bin"]
+        assert index.column("version").tolist() == [1, 2, 3]
+        assert index.metadata("v1.bin")["crc32"] is None
+        assert index.metadata("v3.bin")["crc32"] is not None
+
+    def test_invalid_bins_are_reported(self, tmp_path):
+        """Corrupt bins should be left out of the index and reported."""
+        root = tmp_path / "bins"
+        self._make_tree(root)
+        (root / "bad.bin").write_bytes(b"garbage")
+
+        info = build_jpeg_bin_index(str(root), str(tmp_path / "index.npz"))
+        assert list(info["errors"]) == ["bad.bin"]
+        assert "JPEGBinError" in info["errors"]["bad.bin"]
+
+        index = JPEGBinIndex(str(tmp_path / "index.npz"))
+        assert len(index) == 3
+        assert "bad.bin" not in index
+        with pytest.raises(KeyError):
+            index.metadata("bad.bin")
+
+    def test_empty_directory(self, tmp_path):
+        """An empty directory should produce an empty, loadable index."""
+        root = tmp_path / "empty"
+        root.mkdir()
+        info = build_jpeg_bin_index(str(root), str(tmp_path / "index.npz"))
+        assert info["nfiles"] == 0
+
+        index = JPEGBinIndex(str(tmp_path / "index.npz"))
+        assert len(index) == 0
+        assert list(index) == []
+
+    def test_unsupported_file_raises(self, tmp_path):
+        """An npz that is not an index should raise JPEGBinError."""
+        path = str(tmp_path / "other.npz")
+        np.savez(path, x=np.zeros(3))
+        with pytest.raises(JPEGBinError, match="index"):
+            JPEGBinIndex(path)
+
+
+# ---------------------------------------------------------------------------
+# asyncio API tests
+# ---------------------------------------------------------------------------
+class TestAsyncRead:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"num_frames": 3, "workers": 2},
+            {"return_format": "base64", "start_frame": 1},
+            {"return_format": "bytes", "end_frame": 4},
+            {"target_size": (24, 16)},
+        ],
+    )
+    def test_matches_read_jpeg_bin(self, tmp_path, kwargs):
+        """aread_jpeg_bin should return the same results as read_jpeg_bin."""
+        path = tmp_path / "async.bin"
+        _write_bin(path, _make_frames(n=6))
+
+        expected, exp_meta, exp_fps = read_jpeg_bin(str(path), **kwargs)
+        result, meta, fps = asyncio.run(aread_jpeg_bin(str(path), **kwargs))
+        if kwargs.get("return_format") == "bytes":
+            result = [bytes(v) for v in result]
+            expected = [bytes(v) for v in expected]
+        if isinstance(expected, list):
+            assert result == expected
+        else:
+            np.testing.assert_array_equal(result, expected)
+        assert meta == exp_meta
+        assert fps == exp_fps
+
+    def test_metadata(self, tmp_path):
+        """aread_jpeg_bin_metadata should match read_jpeg_bin_metadata."""
+        path = tmp_path / "async_meta.bin"
+        _write_bin(path, _make_frames(n=2))
+
+        meta = asyncio.run(aread_jpeg_bin_metadata(str(path)))
+        assert meta == read_jpeg_bin_metadata(str(path))
+
+    def test_concurrent_with_semaphore(self, tmp_path):
+        """Many clips can be read concurrently under a shared limit."""
+        paths = []
+        for i in range(5):
+            path = tmp_path / f"clip{i}.bin"
+            _write_bin(path, _make_frames(n=3, seed=i))
+            paths.append(str(path))
+
+        async def run():
+            limit = asyncio.Semaphore(2)
+            return await asyncio.gather(
+                *(aread_jpeg_bin(p, num_frames=2, semaphore=limit) for p in paths)
+            )
+
+        results = asyncio.run(run())
+        for path, (video, _, _) in zip(paths, results):
+            np.testing.assert_array_equal(video, read_jpeg_bin(path, num_frames=2)[0])
+
+    def test_decode_pool_not_grown(self, tmp_path, monkeypatch):
+        """The async and index paths must not resize the shared decode pool."""
+        from wtools.utils import video
+
+        monkeypatch.setattr(video, "_DECODE_POOL", video._SharedPool("test"))
+        monkeypatch.setattr(video, "_IO_POOL", video._SharedPool("test-io"))
+        path = tmp_path / "async_pool.bin"
+        _write_bin(path, _make_frames(n=3))
+
+        asyncio.run(aread_jpeg_bin(str(path)))
+        asyncio.run(aread_jpeg_bin_metadata(str(path)))
+        build_jpeg_bin_index(str(tmp_path), str(tmp_path / "index.npz"))
+        assert video._DECODE_POOL.workers == 0
+        assert video._IO_POOL.workers == video._DEFAULT_ASYNC_WORKERS
+
+        read_jpeg_bin(str(path), workers=2)
+        assert video._DECODE_POOL.workers == 2
+
+    def test_errors_propagate(self, tmp_path):
+        """Decode errors and missing files should raise from the coroutine."""
+        path = tmp_path / "async_corrupt.bin"
+        _write_bin(path, _make_frames(n=3))
+        meta = read_jpeg_bin_metadata(str(path))
+        with open(str(path), "r+b") as f:
+            f.seek(meta["payload_offset"] + 2)
+            f.write(b"\x00" * 20)
+
+        with pytest.raises(JPEGBinError, match="JPEG decode failed"):
+            asyncio.run(aread_jpeg_bin(str(path)))
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(aread_jpeg_bin(str(tmp_path / "missing.bin")))
+
+    def test_cancellation(self, tmp_path):
+        """Cancelling the awaiting task should raise CancelledError."""
+        path = tmp_path / "async_cancel.bin"
+        _write_bin(path, _make_frames(n=64, height=128, width=128))
+
+        async def run():
+            task = asyncio.ensure_future(aread_jpeg_bin(str(path), workers=1))
+            await asyncio.sleep(0)
+            task.cancel()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run())
+
+
+# ---------------------------------------------------------------------------
+# JPEGBinReader tests
+# ---------------------------------------------------------------------------
+class TestJPEGBinReader:
+    def test_decode_matches_read_jpeg_bin(self, tmp_path):
+        """Frames decoded by the reader should equal read_jpeg_bin output."""
+        frames = _make_frames(n=5, height=32, width=48)
+        path = tmp_path / "reader.bin"
+        _write_bin(path, frames)
+
+        video, _, _ = read_jpeg_bin(str(path))
+        with JPEGBinReader(str(path)) as reader:
+            for i in range(5):
+                np.testing.assert_array_equal(reader.decode(i), video[i])
+
+    def test_index_tables_are_views(self, tmp_path):
+        """Index tables should be exposed without copying the mapping."""
+        frames = _make_frames(n=4)
+        path = tmp_path / "views.bin"
+        _write_bin(path, frames, frame_indices=[3, 6, 9, 12])
+
+        with JPEGBinReader(str(path)) as reader:
+            assert reader.frame_indices.tolist() == [3, 6, 9, 12]
+            assert not reader.frame_indices.flags.writeable
+            assert not reader.frame_indices.flags.owndata
+            payload = reader.payload(1)
+            assert isinstance(payload, memoryview)
+            assert bytes(payload[:2]) == b"\xff\xd8"
+            assert len(payload) == int(reader.jpeg_lengths[1])
+
+    def test_metadata_matches_read_jpeg_bin_metadata(self, tmp_path):
+        """The reader's metadata should match read_jpeg_bin_metadata."""
+        frames = _make_frames(n=3)
+        path = tmp_path / "meta.bin"
+        _write_bin(path, frames, source_fps=25.0, sample_fps=5.0, total_num_frames=100)
+
+        with JPEGBinReader(str(path)) as reader:
+            assert reader.metadata == read_jpeg_bin_metadata(str(path))
+
+    def test_len_and_getitem(self, tmp_path):
+        """__getitem__ should accept ints, slices, index arrays and masks."""
+        frames = _make_frames(n=6, height=16, width=24)
+        path = tmp_path / "getitem.bin"
+        _write_bin(path, frames)
+
+        video, _, _ = read_jpeg_bin(str(path))
+        with JPEGBinReader(str(path)) as reader:
+            assert len(reader) == 6
+            np.testing.assert_array_equal(reader[2], video[2])
+            np.testing.assert_array_equal(reader[-1], video[5])
+            np.testing.assert_array_equal(reader[1:5:2], video[1:5:2])
+            np.testing.assert_array_equal(reader[[4, 0, 4]], video[[4, 0, 4]])
+            np.testing.assert_array_equal(
+                reader[np.array([True, False] * 3)], video[::2]
+            )
+            assert reader[3:3].shape == (0, 16, 24, 3)
+            with pytest.raises(IndexError):
+                reader[6]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"num_frames": 3},
+            {"frame_interval": 2},
+            {"start_frame": 1, "end_frame": 6, "num_frames": 2},
+            {"return_format": "base64", "frame_interval": 3},
+            {"return_format": "bytes", "start_frame": 2},
+        ],
+    )
+    def test_read_matches_read_jpeg_bin(self, tmp_path, kwargs):
+        """reader.read() should mirror read_jpeg_bin for every sub-sampling mode."""
+        frames = _make_frames(n=8, height=16, width=16)
+        path = tmp_path / "read.bin"
+        _write_bin(path, frames, frame_indices=list(range(0, 80, 10)))
+
+        expected, exp_meta, exp_fps = read_jpeg_bin(str(path), **kwargs)
+        with JPEGBinReader(str(path)) as reader:
+            # Repeated reads reuse the parsed index tables.
+            for _ in range(2):
+                result, meta, fps = reader.read(**kwargs)
+                if isinstance(expected, list):
+                    assert result == expected
+                else:
+                    np.testing.assert_array_equal(result, expected)
+                assert meta == exp_meta
+                assert fps == exp_fps
+
+    def test_bytes_outlive_close(self, tmp_path):
+        """Payload views returned in bytes mode stay valid after close()."""
+        path = tmp_path / "bytes_close.bin"
+        _write_bin(path, _make_frames(n=3))
+
+        expected, _, _ = read_jpeg_bin(str(path), return_format="bytes")
+        reader = JPEGBinReader(str(path))
+        views, _, _ = reader.read(return_format="bytes")
+        reader.close()
+        assert reader.closed
+        assert views == expected
+
+    def test_close(self, tmp_path):
+        """Closing the reader should unmap the file, even twice."""
+        frames = _make_frames(n=2)
+        path = tmp_path / "close.bin"
+        _write_bin(path, frames)
+
+        reader = JPEGBinReader(str(path))
+        assert not reader.closed
+        reader.close()
+        reader.close()
+        assert reader.closed
+
+    def test_out_of_range_raises(self, tmp_path):
+        """Out-of-range frame indices should raise IndexError."""
+        frames = _make_frames(n=2)
+        path = tmp_path / "range.bin"
+        _write_bin(path, frames)
+
+        with JPEGBinReader(str(path)) as reader:
+            with pytest.raises(IndexError):
+                reader.payload(2)
+
+    def test_truncated_raises(self, tmp_path):
+        """A truncated file should fail size validation."""
+        frames = _make_frames(n=3)
+        path = tmp_path / "trunc.bin"
+        _write_bin(path, frames)
+        with open(str(path), "r+b") as f:
+            f.truncate(os.path.getsize(str(path)) - 10)
+
+        with pytest.raises(JPEGBinError, match="Corrupt"):
+            JPEGBinReader(str(path))
+        with JPEGBinReader(str(path), validate_size=False) as reader:
+            with pytest.raises(JPEGBinError, match="Truncated"):
+                reader.payload(2)
+
+    def test_empty_file_raises(self, tmp_path):
+        """An empty file should raise JPEGBinError rather than fail to map."""
+        path = tmp_path / "empty.bin"
+        path.write_bytes(b"")
+
+        with pytest.raises(JPEGBinError, match="Truncated"):
+            JPEGBinReader(str(path))
+
+
+# ---------------------------------------------------------------------------
+# JPEGBIN shard tests
+# ---------------------------------------------------------------------------
+class TestJPEGBinShard:
+    def _make_shard(self, tmp_path, n_videos=3):
+        bins = {}
+        for i in range(n_videos):
+            path = tmp_path / f"clip{i}.bin"
+            _write_bin(path, _make_frames(n=3 + i, seed=i), source_fps=20.0 + i)
+            bins[f"clip{i}"] = str(path)
+        shard = tmp_path / "shard.jbs"
+        with JPEGBinShardWriter(str(shard)) as writer:
+            for key, path in bins.items():
+                writer.add(key, path)
+        return str(shard), bins
+
+    def test_roundtrip_matches_read_jpeg_bin(self, tmp_path):
+        """Each key should read back exactly like its source bin."""
+        shard, bins = self._make_shard(tmp_path)
+
+        with JPEGBinShardReader(shard) as reader:
+            assert list(reader) == list(bins)
+            assert len(reader) == 3
+            assert "clip1" in reader
+            for key, path in bins.items():
+                for kwargs in ({}, {"num_frames": 2}, {"return_format": "base64"}):
+                    expected, exp_meta, exp_fps = read_jpeg_bin(path, **kwargs)
+                    result, meta, fps = reader.read(key, **kwargs)
+                    if isinstance(expected, list):
+                        assert result == expected
+                    else:
+                        np.testing.assert_array_equal(result, expected)
+                    assert meta == exp_meta
+                    assert fps == exp_fps
+
+    def test_getitem_returns_reader(self, tmp_path):
+        """Indexing should return a JPEGBinReader over the record."""
+        shard, bins = self._make_shard(tmp_path)
+
+        with JPEGBinShardReader(shard) as reader:
+            with reader["clip2"] as clip:
+                assert isinstance(clip, JPEGBinReader)
+                assert len(clip) == 5
+                video, _, _ = read_jpeg_bin(bins["clip2"])
+                np.testing.assert_array_equal(clip[4], video[4])
+            assert reader.metadata("clip0")["source_fps"] == 20.0
+            with pytest.raises(KeyError):
+                reader["missing"]
+
+    def test_records_are_verbatim(self, tmp_path):
+        """Shard records should be byte-identical copies of the bins."""
+        shard, bins = self._make_shard(tmp_path, n_videos=2)
+        data = open(shard, "rb").read()
+        payload = b"".join(open(p, "rb").read() for p in bins.values())
+        assert data.startswith(payload)
+
+    def test_duplicate_key_raises(self, tmp_path):
+        """Adding the same key twice should raise ValueError."""
+        path = tmp_path / "a.bin"
+        _write_bin(path, _make_frames(n=2))
+        with JPEGBinShardWriter(str(tmp_path / "dup.jbs")) as writer:
+            writer.add("a", str(path))
+            with pytest.raises(ValueError, match="Duplicate"):
+                writer.add("a", str(path))
+
+    def test_invalid_bin_rejected(self, tmp_path):
+        """Corrupt input bins should not be packed, and no shard is left."""
+        path = tmp_path / "bad.bin"
+        path.write_bytes(b"BADMAGIC" + b"\x00" * 52)
+        shard = tmp_path / "bad.jbs"
+        with pytest.raises(JPEGBinError):
+            with JPEGBinShardWriter(str(shard)) as writer:
+                writer.add("bad", str(path))
+        assert sorted(os.listdir(str(tmp_path))) == ["bad.bin"]
+
+    def test_corrupt_footer_raises(self, tmp_path):
+        """A file without a shard footer should raise JPEGBinError."""
+        path = tmp_path / "plain.bin"
+        _write_bin(path, _make_frames(n=2))
+        with pytest.raises(JPEGBinError, match="magic"):
+            JPEGBinShardReader(str(path))
+
+
 # ---------------------------------------------------------------------------
 # video_to_jpeg_bin tests (requires a real video file)
 # ---------------------------------------------------------------------------
@@ -703,6 +2284,32 @@ class TestVideoToJpegBin:
             writer.write(frame)
         writer.release()
 
+    def _make_av_video_file(
+        self, path, n_frames=90, fps=30, gop=30, bframes=2, codec=None
+    ):
+        """Create an inter-coded (GOP + B-frame) video with PyAV.
+
+        *codec* defaults to libx264, falling back to mpeg4.
+        """
+        av = pytest.importorskip("av")
+        codecs = ("libx264", "mpeg4") if codec is None else (codec,)
+        codec = next((c for c in codecs if c in av.codecs_available), None)
+        if codec is None:
+            pytest.skip(f"None of {codecs} is available")
+        base = np.random.RandomState(7).randint(0, 256, (48, 64, 3), dtype=np.uint8)
+        with av.open(str(path), mode="w") as container:
+            stream = container.add_stream(codec, rate=fps)
+            stream.width, stream.height = 64, 48
+            stream.pix_fmt = "yuv420p"
+            stream.options = {"g": str(gop), "bf": str(bframes)}
+            for i in range(n_frames):
+                # Moving content, so P/B-frames carry real motion deltas.
+                frame = np.ascontiguousarray(np.roll(base, i, axis=1))
+                container.mux(
+                    stream.encode(av.VideoFrame.from_ndarray(frame, format="bgr24"))
+                )
+            container.mux(stream.encode())
+
     def test_video_to_bin_roundtrip(self, tmp_path):
         """Convert a video to bin and read it back."""
         video_path = tmp_path / "test.avi"
@@ -749,6 +2356,33 @@ class TestVideoToJpegBin:
         video, _, _ = read_jpeg_bin(str(bin_path))
         assert max(video.shape[1], video.shape[2]) <= max_size
 
+    def test_video_to_bin_ffmpeg_resize(self, tmp_path):
+        """resize_backend="ffmpeg" should match the OpenCV size and content."""
+        video_path = tmp_path / "big.avi"
+        self._make_video_file(video_path, n_frames=20, fps=30.0, width=128, height=96)
+
+        cv_bin = tmp_path / "cv.bin"
+        ff_bin = tmp_path / "ff.bin"
+        info_cv = video_to_jpeg_bin(str(video_path), str(cv_bin), max_size=48)
+        info_ff = video_to_jpeg_bin(
+            str(video_path), str(ff_bin), max_size=48, resize_backend="ffmpeg"
+        )
+
+        assert (info_ff["width"], info_ff["height"]) == (48, 36)
+        assert info_ff == {**info_cv, "file_size": info_ff["file_size"]}
+        video_cv, _, _ = read_jpeg_bin(str(cv_bin))
+        video_ff, _, _ = read_jpeg_bin(str(ff_bin))
+        diff = np.abs(video_cv.astype(np.int16) - video_ff.astype(np.int16))
+        assert diff.mean() < 8
+
+    def test_video_to_bin_invalid_resize_backend(self, tmp_path):
+        video_path = tmp_path / "bad.avi"
+        self._make_video_file(video_path, n_frames=5)
+        with pytest.raises(ValueError, match="resize_backend"):
+            video_to_jpeg_bin(
+                str(video_path), str(tmp_path / "bad.bin"), resize_backend="pil"
+            )
+
     def test_video_to_bin_hwaccel_disabled(self, tmp_path):
         """hwaccel=False should work with pure software decoding."""
         video_path = tmp_path / "sw.avi"
@@ -779,6 +2413,192 @@ class TestVideoToJpegBin:
         assert info["nframes"] > 0
         assert os.path.exists(str(bin_path))
 
+    @pytest.mark.parametrize("sample_fps", [2.0, 7.0, 30.0])
+    def test_video_to_bin_seek_matches_decode(self, tmp_path, sample_fps):
+        """seek=True should record the same frames as full decoding."""
+        video_path = tmp_path / "seek.avi"
+        self._make_video_file(video_path, n_frames=45, fps=30.0, width=64, height=48)
+
+        full = tmp_path / "full.bin"
+        sought = tmp_path / "seek.bin"
+        info_full = video_to_jpeg_bin(str(video_path), str(full), sample_fps=sample_fps)
+        info_seek = video_to_jpeg_bin(
+            str(video_path), str(sought), sample_fps=sample_fps, seek=True
+        )
+
+        assert info_seek == info_full
+        assert (
+            read_jpeg_bin_metadata(str(sought))["frame_indices"]
+            == read_jpeg_bin_metadata(str(full))["frame_indices"]
+        )
+        assert sought.read_bytes() == full.read_bytes()
+
+    @pytest.mark.parametrize("codec", ["libx264", "mpeg4"])
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(sample_fps=0.5),
+            dict(sample_fps=4.0),
+            dict(sample_fps=3.0, intervals=[(1.1, 2.3), (5.55, 7.0)]),
+            # Ranges starting one frame before a keyframe: with B-frames the
+            # seek can land on that keyframe and must be retried earlier.
+            dict(sample_fps=30.0, intervals=[(1.965, 2.2), (5.965, 6.2)]),
+        ],
+    )
+    def test_video_to_bin_seek_inter_coded(self, tmp_path, codec, kwargs):
+        """Seeking in a GOP/B-frame stream should match full decoding."""
+        video_path = tmp_path / f"gop_{codec}.mp4"
+        self._make_av_video_file(video_path, n_frames=240, codec=codec)
+
+        full = tmp_path / "full.bin"
+        sought = tmp_path / "seek.bin"
+        info_full = video_to_jpeg_bin(str(video_path), str(full), **kwargs)
+        info_seek = video_to_jpeg_bin(str(video_path), str(sought), seek=True, **kwargs)
+
+        assert info_seek == info_full
+        assert info_full["nframes"] > 1
+        assert sought.read_bytes() == full.read_bytes()
+
+    @pytest.mark.parametrize("seek", [False, True])
+    def test_video_to_bin_pipeline_matches_sequential(self, tmp_path, seek):
+        """pipeline=True should write exactly the same file."""
+        video_path = tmp_path / "pipe.avi"
+        self._make_video_file(video_path, n_frames=45, fps=30.0, width=64, height=48)
+
+        plain = tmp_path / "plain.bin"
+        piped = tmp_path / "piped.bin"
+        kwargs = dict(sample_fps=7.0, max_size=40, seek=seek)
+        info_plain = video_to_jpeg_bin(str(video_path), str(plain), **kwargs)
+        info_piped = video_to_jpeg_bin(
+            str(video_path), str(piped), pipeline=True, workers=4, **kwargs
+        )
+
+        assert info_piped == info_plain
+        assert piped.read_bytes() == plain.read_bytes()
+
+    def test_video_to_bin_pipeline_error_stops_threads(self, tmp_path, monkeypatch):
+        """An encode failure should propagate and leave no stage running."""
+        import threading
+
+        from wtools.utils import video
+
+        video_path = tmp_path / "fail.avi"
+        self._make_video_file(video_path, n_frames=30, fps=30.0, width=64, height=48)
+
+        def failing(frame, encode_param, frame_idx):
+            raise JPEGBinError("boom")
+
+        monkeypatch.setattr(video, "_encode_jpeg_frame", failing)
+        bin_path = tmp_path / "fail.bin"
+        with pytest.raises(JPEGBinError, match="boom"):
+            video_to_jpeg_bin(
+                str(video_path), str(bin_path), sample_fps=30.0, pipeline=True
+            )
+
+        assert not os.path.exists(str(bin_path))
+        assert not [t for t in threading.enumerate() if t.name == "wtools-pipeline"]
+
+    @pytest.mark.parametrize(
+        "kwargs, expected_indices, expected_duration",
+        [
+            (dict(start_time=1.0, end_time=2.0), list(range(30, 60, 3)), 1.0),
+            (dict(start_time=2.5), list(range(75, 90, 3)), 0.5),
+            (dict(end_time=0.5), list(range(0, 15, 3)), 0.5),
+            (
+                dict(intervals=[(2.0, 2.5), (0.0, 0.5), (0.4, 0.6)]),
+                list(range(0, 18, 3)) + list(range(60, 75, 3)),
+                1.1,
+            ),
+        ],
+    )
+    @pytest.mark.parametrize("seek", [False, True])
+    def test_video_to_bin_time_range(
+        self, tmp_path, kwargs, expected_indices, expected_duration, seek
+    ):
+        """Time ranges should extract the matching frames of a full pass."""
+        video_path = tmp_path / "range.avi"
+        self._make_video_file(video_path, n_frames=90, fps=30.0, width=64, height=48)
+
+        full = tmp_path / "full.bin"
+        part = tmp_path / "part.bin"
+        video_to_jpeg_bin(str(video_path), str(full), sample_fps=10.0)
+        info = video_to_jpeg_bin(
+            str(video_path), str(part), sample_fps=10.0, seek=seek, **kwargs
+        )
+
+        meta = read_jpeg_bin_metadata(str(part))
+        assert meta["frame_indices"] == expected_indices
+        assert meta["selected_duration"] == pytest.approx(expected_duration)
+        assert info["selected_duration"] == pytest.approx(expected_duration)
+        assert meta["total_num_frames"] == 90
+
+        full_video, full_meta, _ = read_jpeg_bin(str(full))
+        video, _, _ = read_jpeg_bin(str(part))
+        positions = [full_meta["frame_indices"].index(i) for i in expected_indices]
+        np.testing.assert_array_equal(video, full_video[positions])
+
+    @pytest.mark.parametrize("seek", [False, True])
+    def test_video_to_bin_open_range_unknown_length(self, tmp_path, monkeypatch, seek):
+        """An open range should get a duration even without stream.frames."""
+        video_path = tmp_path / "nolen.mkv"
+        self._make_av_video_file(video_path, n_frames=300)
+        import av
+
+        with av.open(str(video_path)) as container:
+            if container.streams.video[0].frames:
+                pytest.skip("Matroska stream reports its frame count")
+
+        # The length comes from the container's duration.
+        bin_path = str(tmp_path / "tail.bin")
+        info = video_to_jpeg_bin(
+            str(video_path), bin_path, sample_fps=10.0, start_time=9.5, seek=seek
+        )
+        meta = read_jpeg_bin_metadata(bin_path)
+        assert meta["frame_indices"] == list(range(285, 300, 3))
+        assert meta["total_num_frames"] == 300
+        assert meta["selected_duration"] == pytest.approx(0.5)
+        assert info["selected_duration"] == pytest.approx(0.5)
+
+        # Without any length, the duration follows the extracted frames.
+        class NoDuration:
+            def __init__(self, container):
+                self._container = container
+                self.duration = None
+
+            def __getattr__(self, name):
+                return getattr(self._container, name)
+
+        real_open = av.open
+        monkeypatch.setattr(av, "open", lambda *a, **k: NoDuration(real_open(*a, **k)))
+        info = video_to_jpeg_bin(
+            str(video_path),
+            bin_path,
+            sample_fps=10.0,
+            intervals=[(1.0, 2.0), (9.5, float("inf"))],
+            seek=seek,
+        )
+        meta = read_jpeg_bin_metadata(bin_path)
+        assert meta["frame_indices"][-5:] == list(range(285, 300, 3))
+        assert meta["total_num_frames"] == 0
+        assert meta["selected_duration"] == pytest.approx(1.5)
+        assert info["selected_duration"] == pytest.approx(1.5)
+
+    def test_video_to_bin_invalid_time_range(self, tmp_path):
+        """Conflicting or empty time ranges should raise ValueError."""
+        video_path = tmp_path / "bad.avi"
+        self._make_video_file(video_path, n_frames=30)
+        bin_path = str(tmp_path / "bad.bin")
+
+        with pytest.raises(ValueError, match="not both"):
+            video_to_jpeg_bin(
+                str(video_path), bin_path, start_time=0.1, intervals=[(0, 1)]
+            )
+        with pytest.raises(ValueError, match="interval"):
+            video_to_jpeg_bin(str(video_path), bin_path, start_time=1.0, end_time=0.5)
+        with pytest.raises(ValueError, match="No frames"):
+            video_to_jpeg_bin(str(video_path), bin_path, start_time=5.0)
+        assert not os.path.exists(bin_path)
+
     def test_video_to_bin_nonexistent_input(self, tmp_path):
         """A non-existent input video should raise an error."""
         bin_path = tmp_path / "out.bin"
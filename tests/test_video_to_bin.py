@@ -0,0 +1,285 @@
+"""Tests for tools/video_to_bin.py -- batch-mode input collection and skipping."""
+
+import json
+import os
+
+import click
+import cv2
+import numpy as np
+import pytest
+
+from tools.video_to_bin import (
+    _check_unique_outputs,
+    _collect_inputs,
+    _convert_one,
+    _is_journaled,
+    _load_journal,
+    _open_journal,
+    _output_path,
+    _run_batch,
+)
+from wtools.utils.video import read_jpeg_bin_metadata, write_jpeg_bin
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _make_video(path, n_frames=15, fps=30.0, width=64, height=48):
+    """Create a minimal MJPG .avi video file using OpenCV."""
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height)
+    )
+    if not writer.isOpened():
+        pytest.skip("OpenCV VideoWriter not available on this platform")
+    rng = np.random.RandomState(7)
+    for _ in range(n_frames):
+        writer.write(rng.randint(0, 256, (height, width, 3), dtype=np.uint8))
+    writer.release()
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    open(str(path), "wb").close()
+
+
+# ---------------------------------------------------------------------------
+# _collect_inputs / _output_path
+# ---------------------------------------------------------------------------
+class TestCollectInputs:
+    def test_directory(self, tmp_path):
+        """Directories are scanned recursively for video extensions only."""
+        for rel in ("a.mp4", "sub/b.MKV", "sub/deeper/c.avi", "notes.txt", "x.bin"):
+            _touch(tmp_path / rel)
+
+        inputs, root = _collect_inputs(str(tmp_path))
+        assert root == str(tmp_path)
+        assert inputs == sorted(
+            str(tmp_path / rel) for rel in ("a.mp4", "sub/b.MKV", "sub/deeper/c.avi")
+        )
+
+    def test_glob(self, tmp_path):
+        for rel in ("v/a.mp4", "v/sub/b.mp4", "v/sub/c.mkv"):
+            _touch(tmp_path / rel)
+
+        inputs, root = _collect_inputs(str(tmp_path / "v" / "**" / "*.mp4"))
+        assert inputs == [str(tmp_path / "v/a.mp4"), str(tmp_path / "v/sub/b.mp4")]
+        assert root == str(tmp_path / "v")
+
+    def test_manifest_relative_paths(self, tmp_path):
+        """Relative manifest entries resolve against the manifest's directory."""
+        _touch(tmp_path / "videos/a.mp4")
+        _touch(tmp_path / "videos/sub/b.mp4")
+        manifest = tmp_path / "list.txt"
+        manifest.write_text("videos/a.mp4\n\nvideos/sub/b.mp4\n")
+
+        inputs, root = _collect_inputs(str(manifest))
+        assert inputs == [
+            os.path.join(str(tmp_path), "videos/a.mp4"),
+            os.path.join(str(tmp_path), "videos/sub/b.mp4"),
+        ]
+        assert root == str(tmp_path / "videos")
+
+    def test_no_match(self, tmp_path):
+        assert _collect_inputs(str(tmp_path / "*.mp4")) == ([], "")
+
+
+class TestOutputPath:
+    def test_next_to_video(self, tmp_path):
+        video = str(tmp_path / "v/sub/a.mp4")
+        assert _output_path(video, str(tmp_path / "v"), None) == str(
+            tmp_path / "v/sub/a.bin"
+        )
+
+    def test_mirrors_layout(self, tmp_path):
+        video = str(tmp_path / "v/sub/a.mp4")
+        out = _output_path(video, str(tmp_path / "v"), str(tmp_path / "bins"))
+        assert out == str(tmp_path / "bins/sub/a.bin")
+
+    def test_duplicate_outputs_raise(self, tmp_path):
+        """Inputs differing only by extension must not share an output."""
+        _touch(tmp_path / "v/a.mkv")
+        _touch(tmp_path / "v/a.mp4")
+        _touch(tmp_path / "v/b.mp4")
+
+        with pytest.raises(click.UsageError, match="a.mkv, .*a.mp4"):
+            _run_batch(str(tmp_path / "v"), str(tmp_path / "bins"), False, 1, None, {})
+        assert not os.path.exists(str(tmp_path / "bins"))
+
+        _check_unique_outputs([("a.mp4", "bins/a.bin"), ("b.mp4", "bins/b.bin")])
+
+
+# ---------------------------------------------------------------------------
+# Conversion and skipping
+# ---------------------------------------------------------------------------
+class TestConvertOne:
+    def test_skips_valid_output(self, tmp_path):
+        """An existing valid bin is kept unless overwrite is set."""
+        video = tmp_path / "a.avi"
+        _make_video(video)
+        out = tmp_path / "a.bin"
+        write_jpeg_bin(str(out), [np.zeros((8, 8, 3), np.uint8)], 30.0, 2.0, 1)
+        before = out.read_bytes()
+
+        record = _convert_one((str(video), str(out)), overwrite=False)
+        assert record["status"] == "skipped"
+        assert record["output_size"] == len(before)
+        assert out.read_bytes() == before
+
+        record = _convert_one((str(video), str(out)), overwrite=True)
+        assert record["status"] == "done"
+        assert read_jpeg_bin_metadata(str(out))["width"] == 64
+
+    def test_reconverts_invalid_output(self, tmp_path):
+        video = tmp_path / "a.avi"
+        _make_video(video)
+        out = tmp_path / "a.bin"
+        out.write_bytes(b"truncated")
+
+        record = _convert_one((str(video), str(out)), overwrite=False)
+        assert record["status"] == "done"
+        assert record["nframes"] == read_jpeg_bin_metadata(str(out))["nframes"]
+
+    def test_run_batch(self, tmp_path):
+        """A batch run converts new inputs and skips them on a rerun."""
+        _make_video(tmp_path / "v/a.avi")
+        _make_video(tmp_path / "v/sub/b.avi")
+        summary = tmp_path / "summary.jsonl"
+
+        _run_batch(str(tmp_path / "v"), str(tmp_path / "bins"), False, 1, None, {})
+        assert os.path.exists(str(tmp_path / "bins/a.bin"))
+        assert os.path.exists(str(tmp_path / "bins/sub/b.bin"))
+
+        _run_batch(
+            str(tmp_path / "v"), str(tmp_path / "bins"), False, 1, str(summary), {}
+        )
+        assert summary.read_text().count('"status": "skipped"') == 2
+
+
+# ---------------------------------------------------------------------------
+# Journal and retries
+# ---------------------------------------------------------------------------
+class TestJournal:
+    def test_load_journal_keeps_last_record(self, tmp_path):
+        """The last record of each input wins; a truncated tail is ignored."""
+        journal = tmp_path / "journal.jsonl"
+        journal.write_text(
+            json.dumps({"input": "a.mp4", "status": "failed"})
+            + "\n"
+            + json.dumps({"input": "b.mp4", "status": "done"})
+            + "\n"
+            + json.dumps({"input": "a.mp4", "status": "done"})
+            + "\n"
+            + '{"input": "c.mp4", "stat'
+        )
+
+        records = _load_journal(str(journal))
+        assert sorted(records) == ["a.mp4", "b.mp4"]
+        assert records["a.mp4"]["status"] == "done"
+        assert _load_journal(str(tmp_path / "missing.jsonl")) == {}
+
+        # A restarted run appends after the last complete line.
+        with _open_journal(str(journal)) as f:
+            f.write(json.dumps({"input": "c.mp4", "status": "done"}) + "\n")
+        records = _load_journal(str(journal))
+        assert sorted(records) == ["a.mp4", "b.mp4", "c.mp4"]
+        assert journal.read_text().count("\n") == 4
+
+    def test_open_journal_truncated_only_line(self, tmp_path):
+        """A journal holding only a partial line is emptied before appending."""
+        journal = tmp_path / "journal.jsonl"
+        journal.write_text('{"input": "a.mp4", "sta')
+        with _open_journal(str(journal)) as f:
+            f.write(json.dumps({"input": "b.mp4", "status": "done"}) + "\n")
+        assert list(_load_journal(str(journal))) == ["b.mp4"]
+
+        with _open_journal(str(tmp_path / "new.jsonl")) as f:
+            f.write("")
+        assert (tmp_path / "new.jsonl").read_text() == ""
+
+    def test_is_journaled(self, tmp_path):
+        out = tmp_path / "a.bin"
+        out.write_bytes(b"x" * 10)
+        st = os.stat(str(out))
+        record = {
+            "input": "a.mp4",
+            "output": str(out),
+            "status": "done",
+            "output_size": st.st_size,
+            "output_mtime_ns": st.st_mtime_ns,
+        }
+
+        assert _is_journaled(record, str(out))
+        assert not _is_journaled(None, str(out))
+        assert not _is_journaled(dict(record, status="failed"), str(out))
+        assert not _is_journaled(record, str(tmp_path / "other.bin"))
+        os.utime(str(out), ns=(0, st.st_mtime_ns + 1))
+        assert not _is_journaled(record, str(out))
+        out.unlink()
+        assert not _is_journaled(record, str(out))
+
+    def test_retry_backoff(self, tmp_path, monkeypatch):
+        """Failures are retried with exponential backoff until one succeeds."""
+        from tools import video_to_bin
+
+        sleeps = []
+        calls = []
+
+        def flaky(input_path, output_path, **kwargs):
+            calls.append(input_path)
+            if len(calls) < 3:
+                raise OSError("transient")
+            write_jpeg_bin(output_path, [np.zeros((8, 8, 3), np.uint8)], 30.0, 2.0, 1)
+            return {"nframes": 1}
+
+        monkeypatch.setattr(video_to_bin.time, "sleep", sleeps.append)
+        monkeypatch.setattr(video_to_bin, "video_to_jpeg_bin", flaky)
+        out = str(tmp_path / "a.bin")
+
+        record = _convert_one(("a.mp4", out), False, retries=3, retry_backoff=0.5)
+        assert record["status"] == "done"
+        assert record["attempts"] == 3
+        assert "error" not in record
+        assert sleeps == [0.5, 1.0]
+
+        calls.clear()
+        sleeps.clear()
+        record = _convert_one(("a.mp4", out), True, retries=1, retry_backoff=0.5)
+        assert record["status"] == "failed"
+        assert record["attempts"] == 2
+        assert record["error"] == "OSError: transient"
+        assert sleeps == [0.5]
+
+    def test_overwrite_resumes_from_journal(self, tmp_path):
+        """An overwrite run skips what the journal records as converted."""
+        _make_video(tmp_path / "v/a.avi")
+        _make_video(tmp_path / "v/b.avi")
+        bins = str(tmp_path / "bins")
+        journal = str(tmp_path / "journal.jsonl")
+
+        _run_batch(str(tmp_path / "v"), bins, True, 1, None, {}, journal=journal)
+        stamps = {
+            name: os.stat(os.path.join(bins, name)).st_mtime_ns
+            for name in ("a.bin", "b.bin")
+        }
+
+        summary = tmp_path / "summary.jsonl"
+        _run_batch(
+            str(tmp_path / "v"), bins, True, 1, str(summary), {}, journal=journal
+        )
+        assert summary.read_text() == ""
+        for name, mtime in stamps.items():
+            assert os.stat(os.path.join(bins, name)).st_mtime_ns == mtime
+
+        # Outputs an earlier run only skipped were not written by it.
+        records = _load_journal(journal)
+        records[str(tmp_path / "v/a.avi")]["status"] = "skipped"
+        with open(journal, "w") as f:
+            for record in records.values():
+                f.write(json.dumps(record) + "\n")
+        _run_batch(
+            str(tmp_path / "v"), bins, True, 1, str(summary), {}, journal=journal
+        )
+        assert [json.loads(line)["input"] for line in open(str(summary))] == [
+            str(tmp_path / "v/a.avi")
+        ]
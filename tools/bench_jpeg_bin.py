@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import click
+import cv2
+import numpy as np
+
+from wtools.__version__ import __version__
+from wtools.utils.video import (
+    read_jpeg_bin,
+    read_jpeg_bin_metadata,
+    video_to_jpeg_bin,
+    write_jpeg_bin,
+)
+
+try:
+    import av
+except ImportError:  # pragma: no cover
+    av = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_sizes(value: str) -> List[Tuple[int, int]]:
+    """Parse ``"224x224,1280x720"`` into ``[(224, 224), (1280, 720)]``."""
+    sizes = []
+    for item in value.split(","):
+        width, _, height = item.strip().lower().partition("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def _synthetic_frames(
+    n: int, width: int, height: int, seed: int = 0
+) -> List[np.ndarray]:
+    """Generate BGR frames that compress like natural video.
+
+    Pure noise is a worst case for JPEG, so frames are a smooth colour
+    gradient with a moving disc and mild noise on top.
+    """
+    rng = np.random.RandomState(seed)
+    base = np.empty((height, width, 3), dtype=np.float32)
+    base[..., 0] = np.linspace(0, 255, width, dtype=np.float32)
+    base[..., 1] = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base[..., 2] = 128
+    frames = []
+    for i in range(n):
+        frame = base + rng.normal(0, 6, base.shape).astype(np.float32)
+        frame = np.clip(frame, 0, 255).astype(np.uint8)
+        center = (int(width * (0.2 + 0.6 * i / max(n, 1))), height // 2)
+        cv2.circle(frame, center, max(4, min(width, height) // 6), (30, 200, 60), -1)
+        frames.append(frame)
+    return frames
+
+
+def _write_video(path: str, frames: List[np.ndarray], fps: int = 30) -> None:
+    """Encode *frames* to an H.264 (or MPEG-4) video with PyAV."""
+    height, width = frames[0].shape[:2]
+    with av.open(path, mode="w") as container:
+        codec = "libx264" if "libx264" in av.codecs_available else "mpeg4"
+        stream = container.add_stream(codec, rate=fps)
+        stream.width = width - width % 2
+        stream.height = height - height % 2
+        stream.pix_fmt = "yuv420p"
+        for frame in frames:
+            vf = av.VideoFrame.from_ndarray(
+                frame[: stream.height, : stream.width], format="bgr24"
+            )
+            container.mux(stream.encode(vf))
+        container.mux(stream.encode())
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run *fn* *repeat* times and return the best and median wall time."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "median_s": statistics.median(times)}
+
+
+def _record(
+    op: str,
+    timing: Dict[str, float],
+    nframes: int,
+    nbytes: int,
+    **params: Any,
+) -> Dict[str, Any]:
+    """Build one result row; rates use the best time."""
+    best = timing["best_s"]
+    record: Dict[str, Any] = {"op": op, **params, "nframes": nframes}
+    record.update(timing)
+    record["fps"] = nframes / best if best > 0 else float("inf")
+    record["mb_per_s"] = nbytes / best / 1e6 if best > 0 else float("inf")
+    logger.info(
+        "%-14s %s: %9.1f frames/s %8.1f MB/s",
+        op,
+        " ".join(f"{k}={v}" for k, v in params.items()),
+        record["fps"],
+        record["mb_per_s"],
+    )
+    return record
+
+
+def _bench_bin(
+    tmp_dir: str,
+    width: int,
+    height: int,
+    quality: int,
+    nframes: int,
+    workers: Optional[int],
+    sample_frames: int,
+    repeat: int,
+) -> List[Dict[str, Any]]:
+    """Benchmark writing and every read mode of one synthetic bin."""
+    frames = _synthetic_frames(nframes, width, height)
+    path = os.path.join(tmp_dir, f"bench_{width}x{height}_q{quality}_{nframes}.bin")
+    params = {"width": width, "height": height, "quality": quality, "workers": workers}
+
+    def write() -> None:
+        write_jpeg_bin(
+            path,
+            frames,
+            source_fps=30.0,
+            sample_fps=30.0,
+            total_num_frames=nframes,
+            jpeg_quality=quality,
+            workers=workers,
+        )
+
+    # MB/s is measured against the encoded JPEG bytes for every operation,
+    # so rates are comparable across modes.
+    timing = _measure(write, repeat)
+    meta = read_jpeg_bin_metadata(path)
+    payload_bytes = sum(meta["jpeg_lengths"])
+    records = [_record("encode", timing, nframes, payload_bytes, **params)]
+
+    records.append(
+        _record(
+            "decode",
+            _measure(lambda: read_jpeg_bin(path, workers=workers), repeat),
+            nframes,
+            payload_bytes,
+            **params,
+        )
+    )
+    for fmt in ("base64", "bytes"):
+        records.append(
+            _record(
+                fmt,
+                _measure(lambda: read_jpeg_bin(path, return_format=fmt), repeat),
+                nframes,
+                payload_bytes,
+                **params,
+            )
+        )
+
+    # Same uniform selection as read_jpeg_bin(num_frames=nsub).
+    nsub = min(sample_frames, nframes)
+    sel = np.linspace(0, nframes - 1, num=nsub, dtype=int)
+    sub_bytes = int(np.asarray(meta["jpeg_lengths"])[sel].sum())
+    records.append(
+        _record(
+            "decode_sampled",
+            _measure(
+                lambda: read_jpeg_bin(path, num_frames=nsub, workers=workers), repeat
+            ),
+            nsub,
+            sub_bytes,
+            **params,
+        )
+    )
+    records.append(
+        _record(
+            "metadata",
+            _measure(lambda: read_jpeg_bin_metadata(path), repeat),
+            1,
+            meta["payload_offset"],
+            **params,
+        )
+    )
+    os.remove(path)
+    return records
+
+
+def _bench_video(
+    tmp_dir: str,
+    width: int,
+    height: int,
+    quality: int,
+    nframes: int,
+    workers: Optional[int],
+    sample_fps: float,
+    repeat: int,
+) -> List[Dict[str, Any]]:
+    """Benchmark video_to_jpeg_bin on a generated 30 fps video."""
+    video = os.path.join(tmp_dir, f"bench_{width}x{height}_{nframes}.mp4")
+    _write_video(video, _synthetic_frames(nframes, width, height))
+    out = os.path.join(tmp_dir, "bench_video.bin")
+    records = []
+    for seek, pipeline in ((False, False), (True, False), (False, True)):
+        timing = _measure(
+            lambda: video_to_jpeg_bin(
+                video,
+                out,
+                sample_fps=sample_fps,
+                jpeg_quality=quality,
+                hwaccel=False,
+                workers=workers,
+                seek=seek,
+                pipeline=pipeline,
+            ),
+            repeat,
+        )
+        # Rates are per source frame: that is the work being avoided.
+        records.append(
+            _record(
+                "video_to_bin",
+                timing,
+                nframes,
+                os.path.getsize(video),
+                width=width,
+                height=height,
+                quality=quality,
+                workers=workers,
+                sample_fps=sample_fps,
+                seek=seek,
+                pipeline=pipeline,
+            )
+        )
+        os.remove(out)
+    os.remove(video)
+    return records
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="224x224,448x448,1280x720",
+    show_default=True,
+    help="Comma-separated frame sizes (WIDTHxHEIGHT).",
+)
+@click.option(
+    "--qualities",
+    default="75,95",
+    show_default=True,
+    help="Comma-separated JPEG qualities.",
+)
+@click.option(
+    "--frames",
+    "frame_counts",
+    default="64,512",
+    show_default=True,
+    help="Comma-separated frame counts per bin.",
+)
+@click.option(
+    "-j",
+    "--workers",
+    type=int,
+    default=None,
+    help="Threads for encode/decode (default: serial).",
+)
+@click.option(
+    "--sample-frames",
+    type=int,
+    default=16,
+    show_default=True,
+    help="num_frames used by the sub-sampled read benchmark.",
+)
+@click.option(
+    "--repeat",
+    type=int,
+    default=3,
+    show_default=True,
+    help="Runs per measurement; the best and median are reported.",
+)
+@click.option(
+    "--video/--no-video",
+    default=True,
+    show_default=True,
+    help="Also benchmark video_to_jpeg_bin on a generated video (needs PyAV).",
+)
+@click.option(
+    "--sample-fps",
+    type=float,
+    default=2.0,
+    show_default=True,
+    help="sample_fps for the video_to_jpeg_bin benchmark.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(),
+    default=None,
+    help="Write the JSON report here instead of stdout.",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Enable verbose (DEBUG-level) logging output.",
+)
+def main(
+    sizes: str,
+    qualities: str,
+    frame_counts: str,
+    workers: Optional[int],
+    sample_frames: int,
+    repeat: int,
+    video: bool,
+    sample_fps: float,
+    output: Optional[str],
+    verbose: bool,
+) -> None:
+    """Benchmark JPEGBIN1 write/read throughput on synthetic data.
+
+    Runs offline on generated frames (and a generated video for
+    video_to_jpeg_bin) across every combination of --sizes, --qualities and
+    --frames, and reports frames/s and MB/s for encode, full decode, base64
+    and bytes reads, sub-sampled decode and metadata-only reads.  MB/s is
+    relative to the encoded JPEG bytes (the source video bytes for
+    video_to_bin).  The JSON report includes the environment, so reports
+    from different versions or machines can be diffed.
+
+    \b
+    Examples:
+        bench-jpeg-bin -o before.json
+        bench-jpeg-bin --sizes 448x448 --qualities 95 --frames 256 -j 8
+        bench-jpeg-bin --no-video --repeat 5 -o after.json
+    """
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        level=logging.DEBUG if verbose else logging.INFO,
+        stream=sys.stderr,
+    )
+    if video and av is None:
+        logger.warning("PyAV is not installed; skipping video_to_jpeg_bin")
+        video = False
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="bench_jpeg_bin_") as tmp_dir:
+        for width, height in _parse_sizes(sizes):
+            for quality in _parse_ints(qualities):
+                for nframes in _parse_ints(frame_counts):
+                    results.extend(
+                        _bench_bin(
+                            tmp_dir,
+                            width,
+                            height,
+                            quality,
+                            nframes,
+                            workers,
+                            sample_frames,
+                            repeat,
+                        )
+                    )
+                    if video:
+                        results.extend(
+                            _bench_video(
+                                tmp_dir,
+                                width,
+                                height,
+                                quality,
+                                nframes,
+                                workers,
+                                sample_fps,
+                                repeat,
+                            )
+                        )
+
+    report = {
+        "environment": {
+            "wtools": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "av": getattr(av, "__version__", None),
+        },
+        "config": {
+            "sizes": sizes,
+            "qualities": qualities,
+            "frames": frame_counts,
+            "workers": workers,
+            "sample_frames": sample_frames,
+            "repeat": repeat,
+            "sample_fps": sample_fps if video else None,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output is None:
+        click.echo(text)
+    else:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+from typing import Optional
+
+import click
+
+from wtools.utils.video import build_jpeg_bin_index
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.argument("root", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(),
+    default=None,
+    help="Index file path. Defaults to ROOT/jpeg_bin_index.npz.",
+)
+@click.option(
+    "-j",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of threads reading headers (default: min(32, CPU count + 4)).",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Enable verbose (DEBUG-level) logging output.",
+)
+def main(
+    root: str, output: Optional[str], workers: Optional[int], verbose: bool
+) -> None:
+    """Build a metadata index for a directory of JPEGBIN1 (.bin) files.
+
+    Read the header and index tables of every .bin file under ROOT once, in
+    parallel, and write them as columns to a single .npz file.  Load it with
+    wtools.utils.video.JPEGBinIndex to query metadata without opening the
+    bins.  Files that fail validation are left out of the index and make
+    the command exit with an error after the index is written.
+
+    \b
+    Examples:
+        build-jpeg-bin-index bins/
+        build-jpeg-bin-index bins/ -o bins.npz -j 64
+    """
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        level=logging.DEBUG if verbose else logging.INFO,
+    )
+
+    if output is None:
+        output = os.path.join(root, "jpeg_bin_index.npz")
+
+    logger.info("Indexing %s -> %s", root, output)
+    info = build_jpeg_bin_index(root, output, workers=workers)
+    for path, error in info["errors"].items():
+        logger.error("Skipped %s: %s", path, error)
+    logger.info("Done: %d files, %d frames", info["nfiles"], info["nframes"])
+    if info["errors"]:
+        raise click.ClickException(f"{len(info['errors'])} files could not be indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+from tqdm import tqdm
+
+from wtools.utils.video import JPEGBinError, read_jpeg_bin_metadata, repack_jpeg_bin
+
+logger = logging.getLogger(__name__)
+
+
+def _collect_jobs(input_path: str, output: str) -> List[Tuple[str, str]]:
+    """Pair every input .bin with its output path.
+
+    A directory INPUT_PATH is scanned recursively and its layout is mirrored
+    under the *output* directory.
+    """
+    if not os.path.isdir(input_path):
+        return [(input_path, output)]
+    jobs = []
+    for dirpath, _, filenames in os.walk(input_path):
+        for name in filenames:
+            if name.endswith(".bin"):
+                src = os.path.join(dirpath, name)
+                rel = os.path.relpath(src, input_path)
+                jobs.append((src, os.path.join(output, rel)))
+    return sorted(jobs)
+
+
+def _repack_one(job: Tuple[str, str], overwrite: bool, **kwargs: Any) -> Dict[str, Any]:
+    """Repack a single bin in a pool worker.
+
+    Returns:
+        A record with ``input``, ``output`` and ``status`` (``"done"``,
+        ``"skipped"`` or ``"failed"``), plus the info dict returned by
+        :func:`repack_jpeg_bin` or an ``error`` message.
+    """
+    input_path, output = job
+    record: Dict[str, Any] = {"input": input_path, "output": output}
+    if not overwrite and os.path.exists(output):
+        try:
+            read_jpeg_bin_metadata(output, validate_size=True)
+            record["status"] = "skipped"
+            return record
+        except (OSError, JPEGBinError):
+            pass
+
+    try:
+        record["input_size"] = os.path.getsize(input_path)
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        info = repack_jpeg_bin(input_path, output, **kwargs)
+    except Exception as e:
+        # repack_jpeg_bin writes atomically; there is no partial output.
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+    record["status"] = "done"
+    record.update(info)
+    return record
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(),
+    required=True,
+    help=(
+        "Output .bin file, or the output directory when INPUT_PATH is a "
+        "directory (its layout is kept)."
+    ),
+)
+@click.option(
+    "--jpeg-quality",
+    type=click.IntRange(1, 100),
+    default=None,
+    help="JPEG quality of the output (default: keep the source quality).",
+)
+@click.option(
+    "--max-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Resize frames so the longest side does not exceed this many pixels.",
+)
+@click.option(
+    "-f",
+    "--overwrite",
+    is_flag=True,
+    default=False,
+    help="Repack even if a valid output already exists.",
+)
+@click.option(
+    "-j",
+    "--workers",
+    type=int,
+    default=None,
+    help="Threads per file used to decode and encode frames (default: serial).",
+)
+@click.option(
+    "-p",
+    "--processes",
+    type=int,
+    default=None,
+    help="Number of worker processes for directories (default: CPU count).",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Enable verbose (DEBUG-level) logging output.",
+)
+def main(
+    input_path: str,
+    output: str,
+    jpeg_quality: Optional[int],
+    max_size: Optional[int],
+    overwrite: bool,
+    workers: Optional[int],
+    processes: Optional[int],
+    verbose: bool,
+) -> None:
+    """Re-encode JPEGBIN1 (.bin) files at a new quality and/or resolution.
+
+    Derive a lower-resolution or lower-quality copy of a .bin file, or of
+    every .bin file under a directory, without the source videos.  Frame
+    indices, frame rates and durations are preserved.  Files are repacked
+    in parallel on a process pool, and the frames of each file on --workers
+    threads.
+
+    \b
+    Examples:
+        repack-jpeg-bin video.bin -o video_224.bin --max-size 224
+        repack-jpeg-bin bins_448/ -o bins_224/ --max-size 224 --jpeg-quality 85
+        repack-jpeg-bin bins/ -o bins_q75/ --jpeg-quality 75 -p 32 -j 2
+    """
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        level=logging.DEBUG if verbose else logging.INFO,
+    )
+
+    jobs = _collect_jobs(input_path, output)
+    if not jobs:
+        raise click.UsageError(f"No .bin files found in {input_path!r}")
+    logger.info("Repacking %d files with %s processes", len(jobs), processes or "all")
+
+    worker = functools.partial(
+        _repack_one,
+        overwrite=overwrite,
+        jpeg_quality=jpeg_quality,
+        max_size=max_size,
+        workers=workers,
+    )
+    counts = {"done": 0, "skipped": 0, "failed": 0}
+    in_bytes = out_bytes = 0
+    with multiprocessing.Pool(processes) as pool:
+        for record in tqdm(
+            pool.imap_unordered(worker, jobs, chunksize=4),
+            total=len(jobs),
+            desc="Repacking",
+        ):
+            counts[record["status"]] += 1
+            if record["status"] == "failed":
+                logger.error("Failed %s: %s", record["input"], record["error"])
+            elif record["status"] == "done":
+                in_bytes += record["input_size"]
+                out_bytes += record["file_size"]
+
+    logger.info(
+        "Done: %d repacked (%.1f MB -> %.1f MB), %d skipped, %d failed",
+        counts["done"],
+        in_bytes / 1e6,
+        out_bytes / 1e6,
+        counts["skipped"],
+        counts["failed"],
+    )
+    if counts["failed"]:
+        raise click.ClickException(f"{counts['failed']} of {len(jobs)} files failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import json
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+from tqdm import tqdm
+
+from wtools.utils.video import JPEGBinError, verify_jpeg_bin
+
+logger = logging.getLogger(__name__)
+
+
+def _collect_bins(paths: Tuple[str, ...]) -> List[str]:
+    """Expand files and directories (scanned recursively) into .bin paths."""
+    bins = []
+    for path in paths:
+        if not os.path.isdir(path):
+            bins.append(path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            bins.extend(
+                os.path.join(dirpath, name)
+                for name in filenames
+                if name.endswith(".bin")
+            )
+    return sorted(bins)
+
+
+def _verify_one(path: str, decode: bool) -> Dict[str, Any]:
+    """Verify a single bin in a pool worker.
+
+    Returns:
+        The report of :func:`verify_jpeg_bin` with a ``status`` of
+        ``"ok"`` or ``"corrupt"``, or ``{"path", "status": "failed",
+        "error"}`` if the file could not be read or is structurally corrupt.
+    """
+    try:
+        report = verify_jpeg_bin(path, decode=decode)
+    except (OSError, JPEGBinError) as e:
+        return {"path": path, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+    report["status"] = "ok" if report["ok"] else "corrupt"
+    return report
+
+
+@click.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--decode",
+    is_flag=True,
+    default=False,
+    help="Also decode every frame (slower; catches corruption in v1 files).",
+)
+@click.option(
+    "-p",
+    "--processes",
+    type=int,
+    default=None,
+    help="Number of worker processes (default: CPU count).",
+)
+@click.option(
+    "--summary",
+    type=click.Path(),
+    default=None,
+    help="Write one JSON line per file with its status and bad frames.",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Enable verbose (DEBUG-level) logging output.",
+)
+def main(
+    paths: Tuple[str, ...],
+    decode: bool,
+    processes: Optional[int],
+    summary: Optional[str],
+    verbose: bool,
+) -> None:
+    """Verify the integrity of JPEGBIN1 (.bin) files in parallel.
+
+    Each PATH is a .bin file or a directory scanned recursively for .bin
+    files.  Every file's header, index tables and size are validated and
+    its JPEG payloads are streamed and checked against the stored CRC-32s
+    (version 2 files) and for JPEG markers.  Exits with an error if any
+    file is corrupt.
+
+    \b
+    Examples:
+        verify-jpeg-bin bins/
+        verify-jpeg-bin bins/ -p 32 --summary verify.jsonl
+        verify-jpeg-bin old_bins/ --decode
+    """
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        level=logging.DEBUG if verbose else logging.INFO,
+    )
+
+    bins = _collect_bins(paths)
+    if not bins:
+        raise click.UsageError("No .bin files found")
+    logger.info("Verifying %d files with %s processes", len(bins), processes or "all")
+
+    worker = functools.partial(_verify_one, decode=decode)
+    counts = {"ok": 0, "corrupt": 0, "failed": 0}
+    unchecked = 0
+    fsummary = open(summary, "w") if summary is not None else None
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for record in tqdm(
+                pool.imap_unordered(worker, bins, chunksize=16),
+                total=len(bins),
+                desc="Verifying",
+            ):
+                counts[record["status"]] += 1
+                if record["status"] == "failed":
+                    logger.error("Failed %s: %s", record["path"], record["error"])
+                elif record["status"] == "corrupt":
+                    logger.error(
+                        "Corrupt %s: frames %s", record["path"], record["bad_frames"]
+                    )
+                if record.get("checksummed") is False:
+                    unchecked += 1
+                if fsummary is not None:
+                    fsummary.write(json.dumps(record) + "\n")
+    finally:
+        if fsummary is not None:
+            fsummary.close()
+
+    logger.info(
+        "Done: %d ok, %d corrupt, %d failed (%d without checksums)",
+        counts["ok"],
+        counts["corrupt"],
+        counts["failed"],
+        unchecked,
+    )
+    bad = counts["corrupt"] + counts["failed"]
+    if bad:
+        raise click.ClickException(f"{bad} of {len(bins)} files failed verification")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,345 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import functools
+import glob
+import json
 import logging
+import multiprocessing
 import os
-from typing import Optional, Union
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
 
 import click
+from tqdm import tqdm
 
-from wtools.utils.video import _HWACCEL_DEVICE_MAP, video_to_jpeg_bin
+from wtools.utils.video import (
+    _HWACCEL_DEVICE_MAP,
+    JPEGBinError,
+    read_jpeg_bin_metadata,
+    video_to_jpeg_bin,
+)
 
 logger = logging.getLogger(__name__)
 
 _HWACCEL_CHOICES = ["auto"] + list(_HWACCEL_DEVICE_MAP.keys()) + ["none"]
 
+# Extensions picked up when INPUT_PATH is a directory.
+VIDEO_EXTENSIONS = {
+    ".avi",
+    ".flv",
+    ".m4v",
+    ".mkv",
+    ".mov",
+    ".mp4",
+    ".mpeg",
+    ".mpg",
+    ".ts",
+    ".webm",
+    ".wmv",
+}
+
+# Extensions that mark INPUT_PATH as a manifest (one video path per line).
+MANIFEST_EXTENSIONS = {".txt", ".lst", ".list"}
+
+
+def _collect_inputs(input_path: str) -> Tuple[List[str], str]:
+    """Resolve a batch INPUT_PATH into a sorted list of video files.
+
+    Args:
+        input_path: A directory (scanned recursively for
+            :data:`VIDEO_EXTENSIONS`), a glob pattern, or a manifest file
+            listing one video path per line (relative paths are resolved
+            against the manifest's directory).
+
+    Returns:
+        A tuple ``(inputs, root)`` where *root* is the directory that the
+        inputs' relative output paths are computed from.
+    """
+    if os.path.isdir(input_path):
+        inputs = []
+        for dirpath, _, filenames in os.walk(input_path):
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+                    inputs.append(os.path.join(dirpath, name))
+        return sorted(inputs), input_path
+
+    if os.path.isfile(input_path):
+        base_dir = os.path.dirname(input_path)
+        with open(input_path, "r") as f:
+            inputs = [
+                os.path.join(base_dir, line.strip()) for line in f if line.strip()
+            ]
+    else:
+        inputs = sorted(
+            p for p in glob.glob(input_path, recursive=True) if os.path.isfile(p)
+        )
+
+    if not inputs:
+        return [], ""
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in inputs])
+    return inputs, root
+
+
+def _output_path(input_path: str, root: str, output_dir: Optional[str]) -> str:
+    """Return the ``.bin`` path for *input_path* in batch mode."""
+    base, _ = os.path.splitext(input_path)
+    if output_dir is None:
+        return base + ".bin"
+    rel = os.path.relpath(os.path.abspath(base), os.path.abspath(root))
+    return os.path.join(output_dir, rel + ".bin")
+
+
+def _check_unique_outputs(jobs: List[Tuple[str, str]]) -> None:
+    """Fail if two inputs map to the same output, e.g. ``a.mp4`` and ``a.mkv``.
+
+    Raises:
+        click.UsageError: Listing the colliding inputs.
+    """
+    claimed: Dict[str, List[str]] = {}
+    for input_path, output in jobs:
+        claimed.setdefault(os.path.abspath(output), []).append(input_path)
+    clashes = {out: ins for out, ins in claimed.items() if len(ins) > 1}
+    if clashes:
+        lines = [f"  {out} <- {', '.join(ins)}" for out, ins in sorted(clashes.items())]
+        raise click.UsageError(
+            "Several inputs map to the same output file; rename or convert "
+            "them separately:\n" + "\n".join(lines)
+        )
+
+
+def _is_valid_bin(path: str) -> bool:
+    """Whether *path* exists and passes :func:`read_jpeg_bin_metadata`."""
+    try:
+        read_jpeg_bin_metadata(path, validate_size=True)
+    except (OSError, JPEGBinError):
+        return False
+    return True
+
+
+def _stat_output(record: Dict[str, Any]) -> None:
+    """Add the output's ``output_size`` and ``output_mtime_ns`` to *record*."""
+    st = os.stat(record["output"])
+    record["output_size"] = st.st_size
+    record["output_mtime_ns"] = st.st_mtime_ns
+
+
+def _convert_one(
+    job: Tuple[str, str],
+    overwrite: bool,
+    retries: int = 0,
+    retry_backoff: float = 1.0,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Convert a single video in a pool worker.
+
+    A failed conversion is retried up to *retries* times, waiting
+    ``retry_backoff * 2 ** n`` seconds before the n-th retry.
+
+    Returns:
+        A summary record with ``input``, ``output``, ``status``
+        (``"done"``, ``"skipped"`` or ``"failed"``) and ``attempts``, plus
+        the output's size and mtime and the info dict returned by
+        :func:`video_to_jpeg_bin`, or an ``error`` message.
+    """
+    input_path, output = job
+    record: Dict[str, Any] = {"input": input_path, "output": output, "attempts": 0}
+    if not overwrite and _is_valid_bin(output):
+        record["status"] = "skipped"
+        _stat_output(record)
+        return record
+
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(retry_backoff * 2 ** (attempt - 1))
+        record["attempts"] = attempt + 1
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            info = video_to_jpeg_bin(
+                input_path=input_path, output_path=output, **kwargs
+            )
+        except Exception as e:
+            # video_to_jpeg_bin writes atomically, so there is no partial
+            # output to clean up here.
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+            continue
+        record.pop("error", None)
+        record["status"] = "done"
+        record.update(info)
+        _stat_output(record)
+        break
+    return record
+
+
+def _load_journal(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load a conversion journal into a dict mapping input to its last record.
+
+    A truncated last line, left by a crash mid-write, is ignored.
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["input"]] = record
+    return records
+
+
+def _open_journal(path: str) -> TextIO:
+    """Open a conversion journal for appending, dropping a truncated last line.
+
+    A crash mid-write leaves a partial line with no trailing newline; a
+    record appended straight onto it would be unreadable as well.
+    """
+    if os.path.exists(path):
+        with open(path, "r+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            f.seek(max(0, end - 1))
+            if end and f.read(1) != b"\n":
+                # Scan back to the last complete line and cut after it.
+                pos = end
+                keep = 0
+                while pos > 0:
+                    start = max(0, pos - (64 << 10))
+                    f.seek(start)
+                    nl = f.read(pos - start).rfind(b"\n")
+                    if nl >= 0:
+                        keep = start + nl + 1
+                        break
+                    pos = start
+                f.truncate(keep)
+    return open(path, "a")
+
+
+def _is_journaled(record: Optional[Dict[str, Any]], output: str) -> bool:
+    """Whether a journal *record* shows *output* as finished and unchanged.
+
+    Only stats the output, so checking a file is O(1) and does not read it.
+    """
+    if record is None or record["status"] == "failed" or record["output"] != output:
+        return False
+    try:
+        st = os.stat(output)
+    except OSError:
+        return False
+    recorded = (record.get("output_size"), record.get("output_mtime_ns"))
+    return (st.st_size, st.st_mtime_ns) == recorded
+
+
+def _run_batch(
+    input_path: str,
+    output_dir: Optional[str],
+    overwrite: bool,
+    processes: Optional[int],
+    summary: Optional[str],
+    convert_kwargs: Dict[str, Any],
+    journal: Optional[str] = None,
+    retries: int = 0,
+    retry_backoff: float = 1.0,
+) -> None:
+    """Convert every video matched by *input_path* on a process pool.
+
+    With a *journal*, every finished conversion is appended to it (and
+    fsync'd) as it completes.  On a restart, inputs whose journaled output
+    still has the recorded size and mtime are skipped without being
+    submitted; failed and unfinished ones are converted again.  The
+    journal is consulted with *overwrite* too, so a restarted overwrite run
+    does not convert again what it already converted.  Only ``"done"``
+    records count then, not outputs an earlier run skipped.
+    """
+    inputs, root = _collect_inputs(input_path)
+    if not inputs:
+        raise click.UsageError(f"No input videos found for {input_path!r}")
+    jobs = [(p, _output_path(p, root, output_dir)) for p in inputs]
+    _check_unique_outputs(jobs)
+
+    counts = {"done": 0, "skipped": 0, "failed": 0}
+    if journal is not None:
+        finished = _load_journal(journal)
+        if overwrite:
+            finished = {k: r for k, r in finished.items() if r["status"] == "done"}
+        pending = [
+            (inp, out) for inp, out in jobs if not _is_journaled(finished.get(inp), out)
+        ]
+        counts["skipped"] = len(jobs) - len(pending)
+        logger.info("Journal %s: %d videos already done", journal, counts["skipped"])
+    else:
+        pending = jobs
+    logger.info(
+        "Converting %d videos with %s processes", len(pending), processes or "all"
+    )
+
+    worker = functools.partial(
+        _convert_one,
+        overwrite=overwrite,
+        retries=retries,
+        retry_backoff=retry_backoff,
+        **convert_kwargs,
+    )
+    fsummary = open(summary, "w") if summary is not None else None
+    fjournal = _open_journal(journal) if journal is not None else None
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for record in tqdm(
+                pool.imap_unordered(worker, pending, chunksize=4),
+                total=len(pending),
+                desc="Converting",
+            ):
+                counts[record["status"]] += 1
+                if record["status"] == "failed":
+                    logger.error("Failed %s: %s", record["input"], record["error"])
+                line = json.dumps(record) + "\n"
+                if fsummary is not None:
+                    fsummary.write(line)
+                if fjournal is not None:
+                    fjournal.write(line)
+                    fjournal.flush()
+                    os.fsync(fjournal.fileno())
+    finally:
+        if fsummary is not None:
+            fsummary.close()
+        if fjournal is not None:
+            fjournal.close()
+
+    logger.info(
+        "Done: %d converted, %d skipped, %d failed",
+        counts["done"],
+        counts["skipped"],
+        counts["failed"],
+    )
+    if counts["failed"]:
+        raise click.ClickException(
+            f"{counts['failed']} of {len(jobs)} conversions failed"
+        )
+
 
 @click.command()
-@click.argument("input_path", type=click.Path(exists=True))
+@click.argument("input_path", type=str)
 @click.option(
     "-o",
     "--output",
     type=click.Path(),
     default=None,
-    help="Output .bin file path. Defaults to INPUT_PATH with .bin extension.",
+    help=(
+        "Output .bin file path. Defaults to INPUT_PATH with .bin extension. "
+        "In batch mode, the output directory (relative layout is kept); "
+        "defaults to writing each .bin next to its video."
+    ),
 )
 @click.option(
     "-f",
     "--overwrite",
     is_flag=True,
     default=False,
-    help="Overwrite the output file if it already exists.",
+    help=(
+        "Overwrite the output file if it already exists. In batch mode, "
+        "reconvert even if a valid output exists."
+    ),
 )
 @click.option(
     "--sample-fps",
@@ -50,6 +361,39 @@ _HWACCEL_CHOICES = ["auto"] + list(_HWACCEL_DEVICE_MAP.keys()) + ["none"]
     default=None,
     help="Resize frames so the longest side does not exceed this many pixels.",
 )
+@click.option(
+    "--start-time",
+    type=float,
+    default=None,
+    help="Only extract frames from this time (seconds) on; seeks to it.",
+)
+@click.option(
+    "--end-time",
+    type=float,
+    default=None,
+    help="Only extract frames before this time (seconds).",
+)
+@click.option(
+    "--interval",
+    "intervals",
+    type=(float, float),
+    multiple=True,
+    help=(
+        "Extract only START END (seconds); repeat for several segments. "
+        "Cannot be combined with --start-time/--end-time."
+    ),
+)
+@click.option(
+    "--resize-backend",
+    type=click.Choice(["opencv", "ffmpeg"], case_sensitive=False),
+    default="opencv",
+    show_default=True,
+    help=(
+        "How --max-size resizing is done: 'opencv' (cv2.resize after BGR "
+        "conversion) or 'ffmpeg' (swscale scales and converts in one pass; "
+        "faster for high-resolution sources)."
+    ),
+)
 @click.option(
     "--hwaccel",
     type=click.Choice(_HWACCEL_CHOICES, case_sensitive=False),
@@ -60,6 +404,69 @@ _HWACCEL_CHOICES = ["auto"] + list(_HWACCEL_DEVICE_MAP.keys()) + ["none"]
         "'videotoolbox', 'qsv', 'vaapi', or 'none' (software only)."
     ),
 )
+@click.option(
+    "-j",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of threads used to JPEG-encode frames (default: serial).",
+)
+@click.option(
+    "--seek",
+    is_flag=True,
+    default=False,
+    help=(
+        "Seek over frames that are not sampled instead of decoding them. "
+        "Faster for sparse sampling of constant frame-rate videos."
+    ),
+)
+@click.option(
+    "--pipeline",
+    is_flag=True,
+    default=False,
+    help=(
+        "Decode, resize and encode concurrently in a pipeline of threads. "
+        "Best combined with --workers for single large videos."
+    ),
+)
+@click.option(
+    "-p",
+    "--processes",
+    type=int,
+    default=None,
+    help="Batch mode: number of worker processes (default: CPU count).",
+)
+@click.option(
+    "--summary",
+    type=click.Path(),
+    default=None,
+    help="Batch mode: write one JSON line per input with its status and info.",
+)
+@click.option(
+    "--journal",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "Batch mode: append every finished conversion to this JSONL journal. "
+        "A restarted run with the same journal skips finished inputs whose "
+        "output is unchanged and retries failed ones, also with --overwrite; "
+        "use a new journal to start over."
+    ),
+)
+@click.option(
+    "--retries",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Batch mode: retry a failed conversion this many times.",
+)
+@click.option(
+    "--retry-backoff",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Batch mode: seconds before the first retry, doubled after each.",
+)
 @click.option(
     "-v",
     "--verbose",
@@ -74,28 +481,94 @@ def main(
     sample_fps: float,
     jpeg_quality: int,
     max_size: Optional[int],
+    start_time: Optional[float],
+    end_time: Optional[float],
+    intervals: Tuple[Tuple[float, float], ...],
+    resize_backend: str,
     hwaccel: str,
+    workers: Optional[int],
+    seek: bool,
+    pipeline: bool,
+    processes: Optional[int],
+    summary: Optional[str],
+    journal: Optional[str],
+    retries: int,
+    retry_backoff: float,
     verbose: bool,
 ) -> None:
-    """Convert a video file to JPEGBIN1 (.bin) format.
+    """Convert video files to JPEGBIN1 (.bin) format.
 
     Extract frames from INPUT_PATH at the given sampling rate, JPEG-encode
     each frame, and write the result to a binary container file. This
     pre-processing step avoids decoding the video codec at training time.
 
+    INPUT_PATH is either a single video file, or -- for batch mode -- a
+    directory (scanned recursively), a quoted glob pattern, or a manifest
+    file (.txt/.lst/.list) listing one video per line. Batch mode converts
+    videos in parallel on a process pool and skips inputs whose output
+    already exists and is a valid bin.
+
     \b
     Examples:
         video-to-bin input.mp4
         video-to-bin input.mp4 -o output.bin --sample-fps 4.0 --max-size 448
+        video-to-bin 4k.mp4 --max-size 448 --resize-backend ffmpeg
+        video-to-bin movie.mp4 --start-time 600 --end-time 610
+        video-to-bin movie.mp4 --interval 600 610 --interval 3000 3012.5
         video-to-bin input.mp4 --hwaccel none
+        video-to-bin input.mp4 --workers 8
+        video-to-bin input.mp4 --pipeline --workers 8
+        video-to-bin videos/ -o bins/ -p 32 --summary summary.jsonl
+        video-to-bin videos/ -o bins/ --journal bins/journal.jsonl --retries 2
+        video-to-bin 'videos/**/*.mp4' -o bins/
+        video-to-bin manifest.txt -o bins/
     """
     logging.basicConfig(
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
         level=logging.DEBUG if verbose else logging.INFO,
     )
 
-    if not os.path.isfile(input_path):
-        raise click.UsageError(f"Input path is not a file: {input_path!r}")
+    # Translate CLI choice to the function's hwaccel parameter.
+    if hwaccel.lower() == "auto":
+        hwaccel_arg: Optional[Union[str, bool]] = None  # auto-detect
+    elif hwaccel.lower() == "none":
+        hwaccel_arg = False
+    else:
+        hwaccel_arg = hwaccel.lower()
+
+    convert_kwargs: Dict[str, Any] = {
+        "sample_fps": sample_fps,
+        "jpeg_quality": jpeg_quality,
+        "max_size": max_size,
+        "start_time": start_time,
+        "end_time": end_time,
+        "intervals": list(intervals) or None,
+        "resize_backend": resize_backend.lower(),
+        "hwaccel": hwaccel_arg,
+        "workers": workers,
+        "seek": seek,
+        "pipeline": pipeline,
+    }
+
+    is_manifest = (
+        os.path.isfile(input_path)
+        and os.path.splitext(input_path)[1].lower() in MANIFEST_EXTENSIONS
+    )
+    if not os.path.isfile(input_path) or is_manifest:
+        if not os.path.exists(input_path) and not glob.has_magic(input_path):
+            raise click.UsageError(f"Input path does not exist: {input_path!r}")
+        _run_batch(
+            input_path,
+            output,
+            overwrite,
+            processes,
+            summary,
+            convert_kwargs,
+            journal=journal,
+            retries=retries,
+            retry_backoff=retry_backoff,
+        )
+        return
 
     if output is None:
         base, _ = os.path.splitext(input_path)
@@ -107,23 +580,10 @@ def main(
             "Use --overwrite/-f to overwrite it."
         )
 
-    # Translate CLI choice to the function's hwaccel parameter.
-    if hwaccel.lower() == "auto":
-        hwaccel_arg: Optional[Union[str, bool]] = None  # auto-detect
-    elif hwaccel.lower() == "none":
-        hwaccel_arg = False
-    else:
-        hwaccel_arg = hwaccel.lower()
-
     logger.info("Converting %s -> %s", input_path, output)
     try:
         info = video_to_jpeg_bin(
-            input_path=input_path,
-            output_path=output,
-            sample_fps=sample_fps,
-            jpeg_quality=jpeg_quality,
-            max_size=max_size,
-            hwaccel=hwaccel_arg,
+            input_path=input_path, output_path=output, **convert_kwargs
         )
     except Exception:
         logger.error("Conversion failed; cleaning up partial output %s", output)
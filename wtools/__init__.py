@@ -5,15 +5,27 @@ from wtools.landmark.calculate_pose import (
     rotationMatrixToEulerAngles,
 )
 from wtools.utils import (
+    DEFAULT_MAX_GAP,
     FORMAT_VERSION,
     HEADER_SIZE,
     HEADER_STRUCT,
     LMDB,
     MAGIC,
+    SUPPORTED_VERSIONS,
+    FrameCache,
     JPEGBinError,
+    JPEGBinIndex,
+    JPEGBinReader,
+    JPEGBinShardReader,
+    JPEGBinShardWriter,
+    JPEGBinWriter,
     MemoryMonitor,
     MissingOk,
+    SharedFrameCache,
     UnknownImageFormat,
+    aread_jpeg_bin,
+    aread_jpeg_bin_metadata,
+    build_jpeg_bin_index,
     display_image_grid,
     draw_bbox,
     draw_keypoints,
@@ -32,10 +44,14 @@ from wtools.utils import (
     load_pts,
     load_yaml,
     read_jpeg_bin,
+    read_jpeg_bin_batch,
     read_jpeg_bin_metadata,
+    read_jpeg_bin_segments,
     remove_lmdbm,
+    repack_jpeg_bin,
     safe_crop,
     str2img,
+    verify_jpeg_bin,
     video_to_jpeg_bin,
     write_jpeg_bin,
 )
@@ -63,13 +79,29 @@ __all__ = [
     "safe_crop",
     "str2img",
     # video
+    "DEFAULT_MAX_GAP",
     "FORMAT_VERSION",
     "HEADER_SIZE",
     "HEADER_STRUCT",
+    "FrameCache",
     "JPEGBinError",
+    "JPEGBinIndex",
+    "JPEGBinReader",
+    "JPEGBinShardReader",
+    "JPEGBinShardWriter",
+    "JPEGBinWriter",
+    "SharedFrameCache",
+    "aread_jpeg_bin",
+    "aread_jpeg_bin_metadata",
+    "build_jpeg_bin_index",
     "MAGIC",
+    "SUPPORTED_VERSIONS",
     "read_jpeg_bin",
+    "read_jpeg_bin_batch",
     "read_jpeg_bin_metadata",
+    "read_jpeg_bin_segments",
+    "repack_jpeg_bin",
+    "verify_jpeg_bin",
     "video_to_jpeg_bin",
     "write_jpeg_bin",
     # visualization
@@ -16,13 +16,29 @@ from .io import (
 )
 from .utils import MemoryMonitor, get_mem_info, isnotebook
 from .video import (
+    DEFAULT_MAX_GAP,
     FORMAT_VERSION,
     HEADER_SIZE,
     HEADER_STRUCT,
     MAGIC,
+    SUPPORTED_VERSIONS,
+    FrameCache,
     JPEGBinError,
+    JPEGBinIndex,
+    JPEGBinReader,
+    JPEGBinShardReader,
+    JPEGBinShardWriter,
+    JPEGBinWriter,
+    SharedFrameCache,
+    aread_jpeg_bin,
+    aread_jpeg_bin_metadata,
+    build_jpeg_bin_index,
     read_jpeg_bin,
+    read_jpeg_bin_batch,
     read_jpeg_bin_metadata,
+    read_jpeg_bin_segments,
+    repack_jpeg_bin,
+    verify_jpeg_bin,
     video_to_jpeg_bin,
     write_jpeg_bin,
 )
@@ -50,13 +66,29 @@ __all__ = [
     "load_yaml",
     "remove_lmdbm",
     # video
+    "DEFAULT_MAX_GAP",
     "HEADER_SIZE",
     "HEADER_STRUCT",
     "FORMAT_VERSION",
+    "FrameCache",
     "JPEGBinError",
+    "JPEGBinIndex",
+    "JPEGBinReader",
+    "JPEGBinShardReader",
+    "JPEGBinShardWriter",
+    "JPEGBinWriter",
+    "SharedFrameCache",
+    "aread_jpeg_bin",
+    "aread_jpeg_bin_metadata",
+    "build_jpeg_bin_index",
     "MAGIC",
+    "SUPPORTED_VERSIONS",
     "read_jpeg_bin",
+    "read_jpeg_bin_batch",
     "read_jpeg_bin_metadata",
+    "read_jpeg_bin_segments",
+    "repack_jpeg_bin",
+    "verify_jpeg_bin",
     "video_to_jpeg_bin",
     "write_jpeg_bin",
     # utils
@@ -9,6 +9,19 @@ single ``.bin`` file.  It avoids the need to decode a video codec (e.g. H.264)
 at training time -- frames are individually JPEG-encoded and can be decoded with
 OpenCV alone.
 
+Many JPEGBIN1 files can additionally be packed back to back into a single
+*shard* file (see :class:`JPEGBinShardWriter`)::
+
+    +-------------------------------+ offset = 0
+    |  JPEGBIN1 file for key 0      |
+    |  JPEGBIN1 file for key 1      |
+    |  ...                          |
+    +-------------------------------+ offset = index_offset
+    |  JSON index {key: [off, len]} |  UTF-8
+    +-------------------------------+
+    |  Footer (24 bytes)            |  magic "JPEGSHD1", index_offset,
+    +-------------------------------+  index_size (uint64)
+
 File layout (all integers little-endian)::
 
     +-------------------------------+ offset = 0
@@ -17,17 +30,52 @@ File layout (all integers little-endian)::
     |  frame_indices  (N * 8 bytes) |  uint64[N]
     +-------------------------------+
     |  jpeg_lengths   (N * 8 bytes) |  uint64[N]
-    +-------------------------------+ offset = 60 + N * 16
+    +-------------------------------+
+    |  crc32          (N * 4 bytes) |  uint32[N], version >= 2 only
+    +-------------------------------+ offset = 60 + N * 20 (v1: 60 + N * 16)
     |      JPEG Payload Section     |  concatenated JPEG byte streams
     |  [jpeg_0][jpeg_1]...[jpeg_N-1]|
     +-------------------------------+
+
+Version 2 adds the CRC-32 (``zlib.crc32``) of every JPEG payload, checked by
+:func:`verify_jpeg_bin`.  Version 1 files are still read.
 """
 
-import base64
+import asyncio
+import binascii
+import functools
+import hashlib
+import io
+import itertools
+import json
+import mmap
 import os
+import queue
+import shutil
+import stat
 import struct
 import tempfile
-from typing import Any, Dict, List, Optional, Tuple, Union, overload
+import threading
+import zlib
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
 
 try:
     import av
@@ -40,7 +88,9 @@ import cv2
 import numpy as np
 
 MAGIC = b"JPEGBIN1"
-FORMAT_VERSION = 1
+FORMAT_VERSION = 2
+#: Versions that the readers accept.
+SUPPORTED_VERSIONS = (1, 2)
 MAX_NFRAMES = 10_000_000  # Safety limit to prevent OOM from malicious files
 
 # magic, version, nframes, total_num_frames, source_fps, sample_fps,
@@ -49,11 +99,146 @@ HEADER_STRUCT = struct.Struct("<8sIIQdddIII")
 #: Size of the header in bytes (60).
 HEADER_SIZE = HEADER_STRUCT.size
 
+#: Default gap tolerance of :func:`read_jpeg_bin`: selected payloads that
+#: are at most this many bytes apart are fetched with a single read.  Kept
+#: small so strided reads from local disks do not over-read; raise it for
+#: high-latency (network) filesystems.
+DEFAULT_MAX_GAP = 64 << 10
+
+# Values accepted for the return_format argument of the readers.
+_RETURN_FORMATS = ("numpy", "base64", "bytes")
+
+SHARD_MAGIC = b"JPEGSHD1"
+# magic, index_offset, index_size
+SHARD_FOOTER_STRUCT = struct.Struct("<8sQQ")
+
 
 class JPEGBinError(Exception):
     """Raised when a JPEGBIN1 file is corrupt, truncated, or unsupported."""
 
 
+_T = TypeVar("_T")
+
+
+class _SharedPool:
+    """A process-wide thread pool, created lazily and grown on demand.
+
+    The pool is grown (by replacement) when a caller asks for more workers
+    than it currently has.
+
+    Args:
+        thread_name_prefix: Name prefix of the worker threads.
+    """
+
+    def __init__(self, thread_name_prefix: str) -> None:
+        self.thread_name_prefix = thread_name_prefix
+        self.workers = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get(self, workers: int) -> ThreadPoolExecutor:
+        """Return the pool, sized for at least *workers* threads."""
+        with self._lock:
+            if self._executor is None or workers > self.workers:
+                # The previous pool is not shut down explicitly: callers that
+                # already hold it may still be submitting work.  Its idle
+                # threads exit once it is garbage-collected.
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=self.thread_name_prefix
+                )
+                self.workers = workers
+            return self._executor
+
+    def reset(self) -> None:
+        """Forget the current pool, e.g. after fork()."""
+        self._executor = None
+        self.workers = 0
+        self._lock = threading.Lock()
+
+
+# Shared thread pool for JPEG decode/encode.  OpenCV releases the GIL inside
+# ``cv2.imdecode``/``cv2.imencode``, so threads scale across cores; its size
+# follows the ``workers`` that callers of the synchronous API ask for.
+_DECODE_POOL = _SharedPool("wtools-jpegbin")
+# Separate pool for the asyncio API and index scans.  These default to many
+# more threads than there are cores (most of their time is spent waiting on
+# storage), and must not inflate the decode pool for everyone else.
+_IO_POOL = _SharedPool("wtools-io")
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    """Return the shared decode pool, sized for at least *workers* threads.
+
+    Args:
+        workers: Minimum number of worker threads required.
+
+    Returns:
+        A process-wide :class:`~concurrent.futures.ThreadPoolExecutor`.
+    """
+    return _DECODE_POOL.get(workers)
+
+
+def _imap_bounded(
+    fn: Callable[..., _T], tasks: Iterable[Tuple[Any, ...]], workers: int
+) -> Iterator[_T]:
+    """Run ``fn(*task)`` for each task on the decode pool, yielding in order.
+
+    The pool only grows, so it may have more threads than *workers* if an
+    earlier caller asked for more.  At most *workers* tasks are submitted
+    at a time, which keeps this call on *workers* threads and consumes
+    *tasks* lazily, as results are taken.
+
+    Args:
+        fn: Function to run.
+        tasks: Argument tuples, one per call.
+        workers: Maximum number of calls in flight.
+
+    Yields:
+        The results of the calls, in the order of *tasks*.
+    """
+    executor = _get_executor(workers)
+    pending: "deque[Future]" = deque()
+    try:
+        for task in tasks:
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fn, *task))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Only non-empty on error or when the caller stops early.
+        for fut in pending:
+            fut.cancel()
+
+
+def _get_io_executor(workers: int) -> ThreadPoolExecutor:
+    """Return the shared I/O pool, sized for at least *workers* threads.
+
+    Args:
+        workers: Minimum number of worker threads required.
+
+    Returns:
+        A process-wide :class:`~concurrent.futures.ThreadPoolExecutor`,
+        distinct from the decode pool of :func:`_get_executor`.
+    """
+    return _IO_POOL.get(workers)
+
+
+def _reset_executor() -> None:
+    # Worker threads do not survive fork(); a child (e.g. a DataLoader
+    # worker) must build its own pools instead of inheriting dead ones.
+    _DECODE_POOL.reset()
+    _IO_POOL.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+# Default pool size for I/O-bound work -- the asyncio API and index scans
+# (same rule as ThreadPoolExecutor).
+_DEFAULT_ASYNC_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
 # Device-type names recognised by FFmpeg's hardware decoders.
 _HWACCEL_DEVICE_MAP: Dict[str, str] = {
     "cuda": "cuda",
@@ -104,6 +289,86 @@ def _get_hwaccel(hwaccel: Union[None, str, bool]) -> Optional[Any]:
         return None
 
 
+def _unpack_header(raw_header: bytes, bin_path: str) -> Tuple[Any, ...]:
+    """Unpack and validate a JPEGBIN1 header.
+
+    Args:
+        raw_header: The first :data:`HEADER_SIZE` bytes of the file.
+        bin_path: Path to the bin file (for error messages).
+
+    Returns:
+        The tuple of header fields in :data:`HEADER_STRUCT` order.
+
+    Raises:
+        JPEGBinError: If the header is truncated, has invalid magic bytes,
+            an unsupported version, or an out-of-range frame count.
+    """
+    if len(raw_header) != HEADER_SIZE:
+        raise JPEGBinError(f"Truncated bin header: {bin_path!r}")
+
+    fields = HEADER_STRUCT.unpack(raw_header)
+    magic, version, nframes = fields[:3]
+    if magic != MAGIC:
+        raise JPEGBinError(
+            f"Invalid magic in {bin_path!r}: {magic!r} (expected {MAGIC!r})"
+        )
+    if version not in SUPPORTED_VERSIONS:
+        raise JPEGBinError(
+            f"Unsupported bin version in {bin_path!r}: "
+            f"{version} not in {SUPPORTED_VERSIONS}"
+        )
+    if nframes <= 0:
+        raise JPEGBinError(f"Invalid nframes in {bin_path!r}: {nframes}")
+    if nframes > MAX_NFRAMES:
+        raise JPEGBinError(
+            f"nframes={nframes} exceeds safety limit {MAX_NFRAMES} in {bin_path!r}"
+        )
+    return fields
+
+
+def _pack_header(
+    nframes: int,
+    total_num_frames: int,
+    source_fps: float,
+    sample_fps: float,
+    selected_duration: float,
+    width: int,
+    height: int,
+    jpeg_quality: int,
+) -> bytes:
+    """Pack a JPEGBIN1 header for the current :data:`FORMAT_VERSION`."""
+    return HEADER_STRUCT.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        nframes,
+        total_num_frames,
+        float(source_fps),
+        float(sample_fps),
+        float(selected_duration),
+        width,
+        height,
+        int(jpeg_quality),
+    )
+
+
+def _index_entry_size(version: int) -> int:
+    """Bytes of index tables per frame: indices, lengths and (v2) CRC-32."""
+    return 16 if version == 1 else 20
+
+
+def _pack_tables(
+    frame_indices: List[int], jpeg_lengths: List[int], crc32s: List[int]
+) -> bytes:
+    """Pack the index tables for the current :data:`FORMAT_VERSION`."""
+    return b"".join(
+        (
+            np.array(frame_indices, dtype="<u8").tobytes(),
+            np.array(jpeg_lengths, dtype="<u8").tobytes(),
+            np.array(crc32s, dtype="<u4").tobytes(),
+        )
+    )
+
+
 def _read_jpeg_payload(
     fin: Any, offset: int, length: int, bin_path: str, frame_idx: int
 ) -> bytes:
@@ -132,6 +397,387 @@ def _read_jpeg_payload(
     return payload
 
 
+def _check_return_format(return_format: str) -> None:
+    if return_format not in _RETURN_FORMATS:
+        raise ValueError(
+            f"return_format must be one of {_RETURN_FORMATS}, got {return_format!r}"
+        )
+
+
+def _read_payloads(
+    fin: Any,
+    offsets: np.ndarray,
+    sel: List[int],
+    bin_path: str,
+    max_gap: int = DEFAULT_MAX_GAP,
+) -> Iterator[memoryview]:
+    """Read the payloads of *sel* with as few reads as possible.
+
+    Payloads are stored back to back, so the selected frames are sorted and
+    grouped into runs whose payloads are at most *max_gap* bytes apart.
+    Each run is read with a single read, gap bytes included, and sliced
+    into per-frame views.  Runs are read lazily, when the first of their
+    frames is reached in *sel*, so decoding can start while later runs are
+    still being read.
+
+    Args:
+        fin: Open binary file handle.
+        offsets: Absolute payload offsets, with a trailing end offset.
+        sel: Selected stored-frame indices, in any order and possibly
+            repeated.
+        bin_path: Path to the bin file (for error messages).
+        max_gap: Largest number of unselected bytes between two selected
+            payloads that are still read together.
+
+    Yields:
+        One ``memoryview`` per entry of *sel*, in order.
+
+    Raises:
+        JPEGBinError: If a run is truncated.
+    """
+    order = sorted(set(sel))
+    runs: Dict[int, List[int]] = {}
+    run: List[int] = []
+    for j, idx in enumerate(order):
+        if j and offsets[idx] - offsets[order[j - 1] + 1] > max_gap:
+            run = []
+        run.append(idx)
+        runs[idx] = run
+
+    views: Dict[int, memoryview] = {}
+    for idx in sel:
+        if idx not in views:
+            members = runs[idx]
+            start = int(offsets[members[0]])
+            length = int(offsets[members[-1] + 1]) - start
+            buf = memoryview(
+                _read_jpeg_payload(fin, start, length, bin_path, members[0])
+            )
+            for i in members:
+                views[i] = buf[int(offsets[i]) - start : int(offsets[i + 1]) - start]
+        yield views[idx]
+
+
+def _encode_base64(payloads: Iterable[Any]) -> List[str]:
+    """Base64-encode buffers without copying them to ``bytes`` first."""
+    b2a = binascii.b2a_base64
+    return [b2a(payload, newline=False).decode("ascii") for payload in payloads]
+
+
+# libjpeg DCT-domain downscaling, largest factor first.
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def _reduced_decode_flag(
+    width: int, height: int, target_size: Optional[Tuple[int, int]]
+) -> int:
+    """Pick the cheapest ``cv2.imdecode`` flag for decoding to *target_size*.
+
+    Returns the ``IMREAD_REDUCED_COLOR_*`` flag with the largest scale factor
+    whose output (``ceil(width / factor)`` by ``ceil(height / factor)``, as
+    produced by libjpeg) is still at least *target_size* in both dimensions,
+    or ``cv2.IMREAD_COLOR`` if no reduction is possible.
+
+    Args:
+        width: Stored frame width.
+        height: Stored frame height.
+        target_size: Requested ``(width, height)``, or ``None``.
+    """
+    if target_size is None:
+        return cv2.IMREAD_COLOR
+    target_w, target_h = target_size
+    for factor, flag in _REDUCED_DECODE_FLAGS:
+        if -(-width // factor) >= target_w and -(-height // factor) >= target_h:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def _check_target_size(target_size: Optional[Tuple[int, int]]) -> None:
+    if target_size is not None and (len(target_size) != 2 or min(target_size) < 1):
+        raise ValueError(
+            f"target_size must be a (width, height) pair of positive ints, "
+            f"got {target_size!r}"
+        )
+
+
+def _decode_jpeg_payload(
+    payload: Any,
+    bin_path: str,
+    frame_idx: int,
+    out: Optional[np.ndarray] = None,
+    flags: int = cv2.IMREAD_COLOR,
+    resize: bool = False,
+    rgb: bool = True,
+) -> np.ndarray:
+    """Decode a single JPEG payload into an RGB image.
+
+    Args:
+        payload: JPEG bytes, or any object exposing the buffer protocol
+            (e.g. a ``memoryview`` slice of a memory map).
+        bin_path: Path to the bin file (for error messages).
+        frame_idx: Frame index (for error messages).
+        out: Optional C-contiguous ``(H, W, 3)`` ``uint8`` array that
+            receives the RGB image in place.
+        flags: ``cv2.imdecode`` flags, e.g. an ``IMREAD_REDUCED_COLOR_*``
+            value (see :func:`_reduced_decode_flag`).
+        resize: If ``True``, resize the decoded image to the shape of
+            *out* (``cv2.INTER_AREA``) instead of requiring an exact match.
+        rgb: If ``False``, keep OpenCV's BGR channel order, e.g. to
+            re-encode the frame.
+
+    Returns:
+        An RGB (or BGR) ``np.ndarray`` of shape ``(H, W, 3)`` and dtype
+        ``uint8`` (*out* itself when given).
+
+    Raises:
+        JPEGBinError: If the payload cannot be decoded, or the decoded
+            image does not match the shape of *out*.
+    """
+    bgr = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), flags)
+    if bgr is None:
+        raise JPEGBinError(f"JPEG decode failed at frame {frame_idx} in {bin_path!r}")
+    if out is None:
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB) if rgb else bgr
+    if resize and bgr.shape != out.shape:
+        bgr = cv2.resize(
+            bgr, (out.shape[1], out.shape[0]), interpolation=cv2.INTER_AREA
+        )
+    if bgr.shape != out.shape:
+        raise JPEGBinError(
+            f"Decoded frame {frame_idx} in {bin_path!r} has shape {bgr.shape}, "
+            f"expected {out.shape}"
+        )
+    if rgb:
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=out)
+    else:
+        np.copyto(out, bgr)
+    return out
+
+
+def _decode_into(
+    payloads: Iterable[Tuple[int, Any]],
+    out: np.ndarray,
+    bin_path: str,
+    workers: Optional[int] = None,
+    flags: int = cv2.IMREAD_COLOR,
+    resize: bool = False,
+) -> np.ndarray:
+    """Decode a sequence of JPEG payloads into a preallocated clip array.
+
+    Args:
+        payloads: Iterable of ``(frame_idx, payload)`` pairs; the i-th pair
+            is decoded into ``out[i]``.  It is consumed on the calling
+            thread, so payload I/O overlaps with decoding.
+        out: Destination array of shape ``(T, H, W, 3)``.
+        bin_path: Path to the bin file (for error messages).
+        workers: Number of decode threads.  ``None`` or ``1`` decodes
+            serially on the calling thread.
+        flags: ``cv2.imdecode`` flags (see :func:`_decode_jpeg_payload`).
+        resize: Resize decoded frames to fit *out*.
+
+    Returns:
+        *out*.
+
+    Raises:
+        JPEGBinError: If any payload cannot be decoded.
+    """
+    if workers is None or workers <= 1:
+        for i, (idx, payload) in enumerate(payloads):
+            _decode_jpeg_payload(payload, bin_path, idx, out[i], flags, resize)
+        return out
+
+    tasks = (
+        (payload, bin_path, idx, out[i], flags, resize)
+        for i, (idx, payload) in enumerate(payloads)
+    )
+    for _ in _imap_bounded(_decode_jpeg_payload, tasks, workers):
+        pass
+    return out
+
+
+def _clip_buffer(
+    out: Optional[np.ndarray], nframes: int, height: int, width: int
+) -> np.ndarray:
+    """Return a ``(T, H, W, 3)`` ``uint8`` destination array.
+
+    Args:
+        out: Caller-provided buffer to decode into, or ``None`` to allocate
+            a new one.
+        nframes: Number of frames ``T``.
+        height: Frame height ``H``.
+        width: Frame width ``W``.
+
+    Returns:
+        *out* itself, or a freshly allocated array.
+
+    Raises:
+        ValueError: If *out* has the wrong shape or dtype, or is not
+            C-contiguous.
+    """
+    return _check_buffer(out, (nframes, height, width, 3))
+
+
+def _check_buffer(out: Optional[np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+    """Validate a caller-provided ``uint8`` buffer, or allocate one.
+
+    Raises:
+        ValueError: If *out* does not have *shape*, is not ``uint8`` or is
+            not C-contiguous.
+    """
+    if out is None:
+        return np.empty(shape, dtype=np.uint8)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    if out.dtype != np.uint8:
+        raise ValueError(f"out must have dtype uint8, got {out.dtype}")
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    return out
+
+
+def _encode_jpeg_frame(
+    frame: np.ndarray, encode_param: List[int], frame_idx: int
+) -> bytes:
+    """JPEG-encode a single BGR frame.
+
+    Args:
+        frame: BGR image as produced by OpenCV.
+        encode_param: ``cv2.imencode`` parameter list.
+        frame_idx: Frame index (for error messages).
+
+    Returns:
+        The JPEG byte stream.
+
+    Raises:
+        JPEGBinError: If encoding fails.
+    """
+    ok, buf = cv2.imencode(".jpg", frame, encode_param)
+    if not ok:
+        raise JPEGBinError(f"JPEG encoding failed for frame {frame_idx}")
+    return buf.tobytes()
+
+
+def _select_frames(
+    total_stored: int,
+    num_frames: Optional[int] = None,
+    frame_interval: Optional[int] = None,
+    start_frame: Optional[int] = None,
+    end_frame: Optional[int] = None,
+) -> List[int]:
+    """Resolve the sub-sampling parameters of :func:`read_jpeg_bin`.
+
+    Args:
+        total_stored: Number of frames stored in the bin file.
+        num_frames: Uniformly re-sample to this many frames.
+        frame_interval: Stride applied after range clipping.
+        start_frame: First stored-frame index to include.
+        end_frame: Stored-frame index after the last one to include.
+
+    Returns:
+        The list of selected stored-frame indices, in ascending order.
+
+    Raises:
+        ValueError: If the range is empty, *frame_interval* is < 1, or
+            *num_frames* is out of range.
+    """
+    s = 0 if start_frame is None else max(0, start_frame)
+    e = total_stored if end_frame is None else min(end_frame, total_stored)
+    if s >= e:
+        raise ValueError(
+            f"Empty frame range: start_frame={s} >= end_frame={e} "
+            f"(total stored={total_stored})"
+        )
+
+    sel = list(range(s, e))
+
+    if frame_interval is not None:
+        if frame_interval < 1:
+            raise ValueError(f"frame_interval must be >= 1, got {frame_interval}")
+        sel = sel[::frame_interval]
+
+    if num_frames is not None:
+        if num_frames < 1:
+            raise ValueError(f"num_frames must be >= 1, got {num_frames}")
+        if num_frames > len(sel):
+            raise ValueError(
+                f"num_frames={num_frames} exceeds available frames "
+                f"({len(sel)}) after clipping/striding"
+            )
+        if num_frames < len(sel):
+            positions = np.linspace(0, len(sel) - 1, num=num_frames, dtype=int)
+            sel = [sel[i] for i in positions]
+    return sel
+
+
+def _effective_sample_fps(
+    metadata: Dict[str, Any], nselected: int, sub_sampled: bool
+) -> float:
+    """Compute the effective sampling rate of a frame selection.
+
+    If no sub-sampling was requested, the stored ``sample_fps`` is kept;
+    otherwise it is recalculated from the selected frame count over the
+    source video duration.
+    """
+    if sub_sampled:
+        original_fps = metadata["source_fps"]
+        total_num_frames = metadata["total_num_frames"]
+        if total_num_frames > 0 and original_fps > 0:
+            video_duration = total_num_frames / original_fps
+            return nselected / video_duration if video_duration > 0 else 0.0
+    return float(metadata["sample_fps"])
+
+
+def _select_segments(
+    total_stored: int, segments: Sequence[Dict[str, Optional[int]]]
+) -> Tuple[List[List[int]], List[int]]:
+    """Resolve the segments of :func:`read_jpeg_bin_segments`.
+
+    Returns:
+        ``(sels, unique)``: the stored-frame indices of every segment and
+        the sorted union of all of them, i.e. the frames to decode.
+
+    Raises:
+        ValueError: If *segments* is empty or a segment's selection is
+            invalid (see :func:`_select_frames`).
+        TypeError: If a segment has a key other than ``num_frames``,
+            ``frame_interval``, ``start_frame`` or ``end_frame``.
+    """
+    if not segments:
+        raise ValueError("segments must not be empty")
+    sels = [_select_frames(total_stored, **segment) for segment in segments]
+    unique = sorted(set().union(*sels))
+    return sels, unique
+
+
+def _split_segments(
+    decoded: np.ndarray,
+    unique: List[int],
+    sels: List[List[int]],
+    segments: Sequence[Dict[str, Optional[int]]],
+    metadata: Dict[str, Any],
+) -> List[Tuple[np.ndarray, Dict[str, Any], float]]:
+    """Gather each segment's clip out of the deduplicated *decoded* frames.
+
+    *metadata* must hold the stored ``frame_indices`` of the whole file.
+    """
+    frame_indices = metadata["frame_indices"]
+    results = []
+    for sel, segment in zip(sels, segments):
+        clip = decoded[np.searchsorted(unique, sel)]
+        seg_meta = dict(metadata)
+        seg_meta["frame_indices"] = [int(frame_indices[i]) for i in sel]
+        seg_meta["nframes"] = len(sel)
+        sub_sampled = any(v is not None for v in segment.values())
+        results.append(
+            (clip, seg_meta, _effective_sample_fps(seg_meta, len(sel), sub_sampled))
+        )
+    return results
+
+
 def write_jpeg_bin(
     output_path: str,
     frames: List[np.ndarray],
@@ -141,11 +787,13 @@ def write_jpeg_bin(
     frame_indices: Optional[List[int]] = None,
     selected_duration: Optional[float] = None,
     jpeg_quality: int = 95,
+    workers: Optional[int] = None,
 ) -> None:
     """Write a list of frames to a JPEGBIN1 ``.bin`` file.
 
     Each frame is JPEG-encoded and packed together with a 60-byte header and
-    two uint64 index arrays (frame indices and JPEG byte lengths).
+    the index arrays (uint64 frame indices, uint64 JPEG byte lengths and
+    uint32 payload CRC-32s).
 
     Args:
         output_path: Destination file path.
@@ -160,6 +808,9 @@ def write_jpeg_bin(
             If ``None``, defaults to ``total_num_frames / source_fps``.
         jpeg_quality: JPEG encoding quality (1-100).  Higher values produce
             larger files with less compression artifacts.
+        workers: Number of threads used to JPEG-encode frames.  ``None``
+            (default) or ``1`` encodes serially; larger values encode
+            concurrently on the shared thread pool, preserving frame order.
 
     Raises:
         ValueError: If *frames* is empty or frames have inconsistent shapes.
@@ -194,60 +845,569 @@ def write_jpeg_bin(
             raise ValueError("source_fps must not be zero when selected_duration is None")
         selected_duration = total_num_frames / source_fps
 
-    # JPEG-encode all frames
-    jpeg_data_list: List[bytes] = []
+    # JPEG-encode all frames (order preserved, optionally on a thread pool)
     encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
-    for i, frame in enumerate(frames):
-        ok, buf = cv2.imencode(".jpg", frame, encode_param)
-        if not ok:
-            raise JPEGBinError(f"JPEG encoding failed for frame {i}")
-        jpeg_data_list.append(buf.tobytes())
+    if workers is None or workers <= 1:
+        jpeg_data_list = [
+            _encode_jpeg_frame(frame, encode_param, i) for i, frame in enumerate(frames)
+        ]
+    else:
+        jpeg_data_list = list(
+            _imap_bounded(
+                _encode_jpeg_frame,
+                ((frame, encode_param, i) for i, frame in enumerate(frames)),
+                workers,
+            )
+        )
 
     jpeg_lengths = [len(j) for j in jpeg_data_list]
 
-    # Build header
-    header = HEADER_STRUCT.pack(
-        MAGIC,
-        FORMAT_VERSION,
+    # Build header and index arrays
+    header = _pack_header(
         nframes,
         total_num_frames,
-        float(source_fps),
-        float(sample_fps),
-        float(selected_duration),
+        source_fps,
+        sample_fps,
+        selected_duration,
         width,
         height,
-        int(jpeg_quality),
+        jpeg_quality,
+    )
+    tables = _pack_tables(
+        frame_indices, jpeg_lengths, [zlib.crc32(j) for j in jpeg_data_list]
     )
-
-    # Build index arrays
-    indices_array = np.array(frame_indices, dtype="<u8").tobytes()
-    lengths_array = np.array(jpeg_lengths, dtype="<u8").tobytes()
 
     # Write file atomically: write to a temp file then os.replace()
     dir_name = os.path.dirname(os.path.abspath(output_path))
     with tempfile.NamedTemporaryFile(dir=dir_name, delete=False, suffix=".tmp") as ftmp:
         ftmp.write(header)
-        ftmp.write(indices_array)
-        ftmp.write(lengths_array)
+        ftmp.write(tables)
         for jd in jpeg_data_list:
             ftmp.write(jd)
         tmp_path = ftmp.name
     os.replace(tmp_path, output_path)
 
 
-def video_to_jpeg_bin(
-    input_path: str,
-    output_path: str,
-    sample_fps: float = 2.0,
-    jpeg_quality: int = 95,
-    max_size: Optional[int] = None,
-    hwaccel: Union[None, str, bool] = None,
-) -> Dict[str, Any]:
-    """Extract frames from a video file and write a JPEGBIN1 ``.bin`` file.
+class JPEGBinWriter:
+    """Incrementally write a JPEGBIN1 ``.bin`` file, one frame at a time.
 
-    Opens *input_path* with PyAV (FFmpeg), samples frames at *sample_fps*,
-    optionally resizes so the longest side does not exceed *max_size*,
-    JPEG-encodes each frame, and writes the result to *output_path*.
+    Unlike :func:`write_jpeg_bin`, frames do not need to be held in memory:
+    each appended frame is JPEG-encoded and its payload written to a
+    temporary file immediately.  Only the index tables (20 bytes per frame)
+    are kept in memory; they are backfilled together with the header
+    when the writer is closed, and the finished file is moved into place
+    atomically with ``os.replace()``.
+
+    If *expected_nframes* is given, room for the header and index tables is
+    reserved at the start of the temporary file, so the tables are written
+    in place when the final count matches.  Otherwise (or on a mismatch)
+    the payloads are copied once behind the finished tables.
+
+    Used as a context manager, the file is committed on a clean exit and
+    discarded if the block raises.
+
+    Args:
+        output_path: Destination file path.
+        source_fps: Frame rate of the original source video.
+        sample_fps: Sampling frame rate used to extract the frames.
+        total_num_frames: Total number of frames in the original source video.
+        selected_duration: Duration of the selected segment in seconds.
+            If ``None``, defaults to ``total_num_frames / source_fps``.
+        jpeg_quality: JPEG encoding quality (1-100).
+        expected_nframes: Optional estimate of the number of frames that
+            will be appended.
+        workers: Number of threads used to JPEG-encode frames.  ``None``
+            (default) or ``1`` encodes synchronously inside :meth:`append`;
+            larger values encode on the shared thread pool with a bounded
+            number of frames in flight, writing payloads in order.
+
+    Attributes:
+        total_num_frames: May be updated before :meth:`close`.
+        selected_duration: May be updated before :meth:`close`.
+        width: Frame width in pixels (0 until the first frame is appended).
+        height: Frame height in pixels (0 until the first frame is appended).
+
+    Examples:
+        >>> with JPEGBinWriter("video.bin", source_fps=30.0, sample_fps=2.0,
+        ...                    total_num_frames=300) as writer:
+        ...     for idx, frame in sampled_frames:
+        ...         writer.append(frame, idx)
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        source_fps: float,
+        sample_fps: float,
+        total_num_frames: int,
+        selected_duration: Optional[float] = None,
+        jpeg_quality: int = 95,
+        expected_nframes: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.output_path = output_path
+        self.source_fps = float(source_fps)
+        self.sample_fps = float(sample_fps)
+        self.total_num_frames = total_num_frames
+        self.selected_duration = selected_duration
+        self.jpeg_quality = int(jpeg_quality)
+        self.width = self.height = 0
+        self._encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
+        self._frame_indices: List[int] = []
+        self._jpeg_lengths: List[int] = []
+        self._crc32s: List[int] = []
+        self._workers = workers if workers is not None and workers > 1 else 0
+        self._pending: "deque[Tuple[Future, int]]" = deque()
+        self._nappended = 0
+
+        self._reserved = expected_nframes or 0
+        dir_name = os.path.dirname(os.path.abspath(output_path))
+        self._ftmp: Optional[Any] = tempfile.NamedTemporaryFile(
+            dir=dir_name, delete=False, suffix=".tmp"
+        )
+        self._payload_start = HEADER_SIZE + self._reserved * _index_entry_size(
+            FORMAT_VERSION
+        )
+        self._ftmp.seek(self._payload_start)
+
+    def append(self, frame: np.ndarray, frame_index: Optional[int] = None) -> None:
+        """JPEG-encode *frame* and write its payload.
+
+        Args:
+            frame: BGR image (as produced by OpenCV).  All frames must have
+                the same height and width.
+            frame_index: Original frame index of *frame*.  Defaults to the
+                number of frames appended so far.
+
+        Raises:
+            ValueError: If the writer is closed or *frame* has a different
+                shape from the first frame.
+            JPEGBinError: If JPEG encoding fails.
+        """
+        i = self._nappended
+        self._check_frame(frame.shape[:2], i)
+        self._nappended += 1
+        if frame_index is None:
+            frame_index = i
+        if not self._workers:
+            self._append_payload(
+                _encode_jpeg_frame(frame, self._encode_param, i), frame_index
+            )
+            return
+
+        future = _get_executor(self._workers).submit(
+            _encode_jpeg_frame, frame, self._encode_param, i
+        )
+        self._pending.append((future, frame_index))
+        # Bound the frames held in memory and the encodes in flight: the
+        # shared pool may have more threads than this writer's workers.
+        while len(self._pending) >= self._workers:
+            self._drain_one()
+
+    def _drain_one(self) -> None:
+        future, frame_index = self._pending.popleft()
+        self._append_payload(future.result(), frame_index)
+
+    def _check_frame(self, shape: Tuple[int, ...], i: int) -> None:
+        if self._ftmp is None:
+            raise ValueError("JPEGBinWriter is closed")
+        if self.width == 0:
+            self.height, self.width = shape
+        elif shape != (self.height, self.width):
+            raise ValueError(
+                f"Frame {i} has shape {shape}, expected ({self.height}, {self.width})"
+            )
+
+    def _append_payload(self, payload: bytes, frame_index: int) -> None:
+        assert self._ftmp is not None
+        self._ftmp.write(payload)
+        self._frame_indices.append(frame_index)
+        self._jpeg_lengths.append(len(payload))
+        self._crc32s.append(zlib.crc32(payload))
+
+    def __len__(self) -> int:
+        return self._nappended
+
+    def close(self) -> None:
+        """Write the header and index tables and move the file into place.
+
+        Raises:
+            ValueError: If no frames were appended, or *selected_duration*
+                is ``None`` and *source_fps* is zero.
+        """
+        if self._ftmp is None:
+            return
+        try:
+            self._commit()
+        except BaseException:
+            self.abort()
+            raise
+
+    def _commit(self) -> None:
+        while self._pending:
+            self._drain_one()
+        nframes = len(self._jpeg_lengths)
+        if nframes == 0:
+            raise ValueError("frames must not be empty")
+        selected_duration = self.selected_duration
+        if selected_duration is None:
+            if self.source_fps == 0:
+                raise ValueError(
+                    "source_fps must not be zero when selected_duration is None"
+                )
+            selected_duration = self.total_num_frames / self.source_fps
+
+        tables = b"".join(
+            (
+                _pack_header(
+                    nframes,
+                    self.total_num_frames,
+                    self.source_fps,
+                    self.sample_fps,
+                    selected_duration,
+                    self.width,
+                    self.height,
+                    self.jpeg_quality,
+                ),
+                _pack_tables(self._frame_indices, self._jpeg_lengths, self._crc32s),
+            )
+        )
+
+        ftmp = self._ftmp
+        assert ftmp is not None
+        if nframes == self._reserved:
+            # Backfill the reserved space in place.
+            ftmp.seek(0)
+            ftmp.write(tables)
+            ftmp.close()
+            tmp_path = ftmp.name
+        else:
+            # Copy the payloads once behind correctly sized tables.
+            ftmp.flush()
+            ftmp.seek(self._payload_start)
+            dir_name = os.path.dirname(os.path.abspath(self.output_path))
+            with tempfile.NamedTemporaryFile(
+                dir=dir_name, delete=False, suffix=".tmp"
+            ) as fout:
+                tmp_path = fout.name
+                try:
+                    fout.write(tables)
+                    shutil.copyfileobj(ftmp, fout, 1 << 20)
+                except BaseException:
+                    fout.close()
+                    os.remove(tmp_path)
+                    raise
+            ftmp.close()
+            os.remove(ftmp.name)
+        self._ftmp = None
+        os.replace(tmp_path, self.output_path)
+
+    def abort(self) -> None:
+        """Discard everything written so far without touching *output_path*."""
+        ftmp = self._ftmp
+        if ftmp is None:
+            return
+        self._ftmp = None
+        for future, _ in self._pending:
+            future.cancel()
+        self._pending.clear()
+        ftmp.close()
+        if os.path.exists(ftmp.name):
+            os.remove(ftmp.name)
+
+    def __enter__(self) -> "JPEGBinWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        exc_value: Optional[BaseException],
+        traceback: Optional[Any],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _pts_to_index(pts: int, stream: Any, source_fps: float) -> int:
+    """Convert a presentation timestamp to a (constant-rate) frame index."""
+    start = stream.start_time or 0
+    return int(round(float((pts - start) * stream.time_base) * source_fps))
+
+
+def _index_to_pts(frame_idx: int, stream: Any, source_fps: float) -> int:
+    """Convert a frame index to a presentation timestamp in stream units."""
+    start = stream.start_time or 0
+    return start + int(frame_idx / (source_fps * stream.time_base))
+
+
+def _iter_every_nth_frame(
+    container: Any, stream: Any, frame_interval: int
+) -> Iterable[Tuple[int, Any]]:
+    """Decode every frame and yield ``(frame_idx, frame)`` for sampled ones."""
+    for frame_idx, frame in enumerate(container.decode(stream)):
+        if frame_idx % frame_interval == 0:
+            yield frame_idx, frame
+
+
+def _seek_decode(
+    container: Any, stream: Any, target: int, source_fps: float
+) -> Iterable[Any]:
+    """Seek so that decoding resumes at or before frame *target*.
+
+    FFmpeg seeks by decode timestamp, so with B-frames the keyframe it lands
+    on can be presented after *target*.  In that case the seek is retried
+    from progressively earlier positions.
+
+    Returns:
+        An iterator over decoded frames starting at the landing keyframe.
+    """
+    margin = 0
+    while True:
+        pos = max(0, target - margin)
+        container.seek(
+            _index_to_pts(pos, stream, source_fps), stream=stream, backward=True
+        )
+        decoded = container.decode(stream)
+        first = next(decoded, None)
+        if first is None:
+            return iter(())
+        if (
+            pos == 0
+            or first.pts is None
+            or _pts_to_index(first.pts, stream, source_fps) <= target
+        ):
+            return itertools.chain([first], decoded)
+        overshoot = _pts_to_index(first.pts, stream, source_fps) - target
+        margin = max(2 * margin, margin + overshoot + 1)
+
+
+def _iter_seek_sampled_frames(
+    container: Any,
+    stream: Any,
+    frame_interval: int,
+    source_fps: float,
+    start: int = 0,
+    end: Optional[int] = None,
+    seek_gaps: bool = True,
+) -> Iterable[Tuple[int, Any]]:
+    """Yield ``(frame_idx, frame)`` for sampled frames, seeking over gaps.
+
+    Frame indices are derived from each frame's PTS, assuming a constant
+    frame rate.  Frames are decoded sequentially while the next sampled
+    frame is within one GOP (the largest keyframe distance seen so far);
+    beyond that, the container is seeked to the keyframe preceding it, so
+    the frames in between are never decoded.
+
+    Only frames in ``[start, end)`` are sampled, on the same
+    every-*frame_interval* grid as a full pass.  A positive *start* is
+    reached by seeking, and decoding stops at *end*.  With *seek_gaps*
+    ``False``, frames within the range are decoded sequentially.
+    """
+    target = -(-start // frame_interval) * frame_interval
+    if end is not None and target >= end:
+        return
+    decoded: Optional[Iterable[Any]]
+    if target > 0:
+        decoded = _seek_decode(container, stream, target, source_fps)
+    else:
+        decoded = container.decode(stream)
+    last_idx = -1
+    last_key: Optional[int] = None
+    gop = 0
+    while True:
+        if seek_gaps and gop and target - last_idx > gop:
+            decoded = _seek_decode(container, stream, target, source_fps)
+            last_key = None
+        assert decoded is not None
+        for frame in decoded:
+            if frame.pts is None:
+                raise ValueError("seek sampling requires frames with timestamps")
+            idx = _pts_to_index(frame.pts, stream, source_fps)
+            if end is not None and idx >= end:
+                return
+            if frame.key_frame:
+                if last_key is not None and idx > last_key:
+                    gop = max(gop, idx - last_key)
+                last_key = idx
+            last_idx = idx
+            if idx >= target:
+                yield idx, frame
+                target = (idx // frame_interval + 1) * frame_interval
+                if end is not None and target >= end:
+                    return
+                break
+        else:
+            return
+
+
+def _time_ranges(
+    start_time: Optional[float],
+    end_time: Optional[float],
+    intervals: Optional[Sequence[Tuple[float, float]]],
+    source_fps: float,
+) -> Optional[List[Tuple[int, Optional[int]]]]:
+    """Convert time intervals to sorted, merged ``[start, end)`` frame ranges.
+
+    A frame is included when its presentation time ``idx / source_fps``
+    lies in ``[start, end)`` of some interval.
+
+    Returns:
+        The frame ranges, with ``end=None`` for a range open to the end of
+        the video, or ``None`` if no time range was requested.
+
+    Raises:
+        ValueError: If both *intervals* and *start_time*/*end_time* are
+            given, or an interval is empty or starts before zero.
+    """
+    if intervals is None:
+        if start_time is None and end_time is None:
+            return None
+        intervals = [
+            (start_time or 0.0, float("inf") if end_time is None else end_time)
+        ]
+    elif start_time is not None or end_time is not None:
+        raise ValueError("Pass either intervals or start_time/end_time, not both")
+    if not intervals:
+        raise ValueError("intervals must not be empty")
+
+    ranges: List[Tuple[int, Optional[int]]] = []
+    for start, end in sorted(intervals):
+        if start < 0 or end <= start:
+            raise ValueError(f"Invalid time interval ({start}, {end})")
+        # The epsilon keeps e.g. 0.1 * 30 from rounding up to frame 4.
+        first = int(np.ceil(start * source_fps - 1e-6))
+        stop = None if np.isinf(end) else int(np.ceil(end * source_fps - 1e-6))
+        if ranges:
+            prev_first, prev_stop = ranges[-1]
+            if prev_stop is None or first <= prev_stop:
+                if prev_stop is not None:
+                    prev_stop = None if stop is None else max(prev_stop, stop)
+                ranges[-1] = (prev_first, prev_stop)
+                continue
+        ranges.append((first, stop))
+    return ranges
+
+
+def _iter_range_sampled_frames(
+    container: Any,
+    stream: Any,
+    frame_interval: int,
+    source_fps: float,
+    ranges: List[Tuple[int, Optional[int]]],
+    seek: bool,
+) -> Iterable[Tuple[int, Any]]:
+    """Yield sampled ``(frame_idx, frame)`` pairs from each frame range."""
+    for start, end in ranges:
+        yield from _iter_seek_sampled_frames(
+            container, stream, frame_interval, source_fps, start, end, seek
+        )
+
+
+_RESIZE_BACKENDS = ("opencv", "ffmpeg")
+
+
+def _frame_to_bgr(
+    frame: Any, max_size: Optional[int], resize_backend: str = "opencv"
+) -> np.ndarray:
+    """Convert a decoded frame to BGR, shrinking it to fit *max_size*.
+
+    With the ``"ffmpeg"`` backend, scaling and pixel-format conversion are
+    done by swscale in a single pass, so the full-resolution BGR image is
+    never materialised.
+    """
+    size = None
+    if max_size is not None and max(frame.height, frame.width) > max_size:
+        scale = max_size / max(frame.height, frame.width)
+        size = (int(frame.width * scale), int(frame.height * scale))
+    img: np.ndarray
+    if size is not None and resize_backend == "ffmpeg":
+        img = frame.reformat(
+            width=size[0], height=size[1], format="bgr24", interpolation="AREA"
+        ).to_ndarray()
+        return img
+    img = frame.to_ndarray(format="bgr24")
+    if size is not None:
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    return img
+
+
+# Items buffered between two stages of the video_to_jpeg_bin pipeline.
+_PIPELINE_QUEUE_SIZE = 16
+
+
+def _prefetch(
+    items: Iterator[_T], maxsize: int = _PIPELINE_QUEUE_SIZE
+) -> Generator[_T, None, None]:
+    """Run the iterator *items* on a background thread.
+
+    Items are handed over through a queue holding at most *maxsize* of
+    them, so the producer runs ahead of the consumer by a bounded amount.
+    Exceptions raised by *items* are re-raised in the consumer.  Closing the
+    returned generator stops the producer, closes *items* and waits for the
+    thread to exit, so *items* is never used after the generator is closed.
+    """
+    buf: "queue.Queue[Tuple[bool, Any]]" = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(entry: Tuple[bool, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                buf.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except BaseException as e:
+            put((False, e))
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="wtools-pipeline", daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, item = buf.get()
+            if not ok:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def video_to_jpeg_bin(
+    input_path: str,
+    output_path: str,
+    sample_fps: float = 2.0,
+    jpeg_quality: int = 95,
+    max_size: Optional[int] = None,
+    hwaccel: Union[None, str, bool] = None,
+    workers: Optional[int] = None,
+    seek: bool = False,
+    pipeline: bool = False,
+    resize_backend: str = "opencv",
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    intervals: Optional[Sequence[Tuple[float, float]]] = None,
+) -> Dict[str, Any]:
+    """Extract frames from a video file and write a JPEGBIN1 ``.bin`` file.
+
+    Opens *input_path* with PyAV (FFmpeg), samples frames at *sample_fps*,
+    optionally resizes so the longest side does not exceed *max_size*,
+    JPEG-encodes each frame, and writes the result to *output_path*.
 
     Args:
         input_path: Path to the input video (any format supported by
@@ -265,14 +1425,58 @@ def video_to_jpeg_bin(
             - ``False`` -- disable hardware decoding entirely.
             - ``"cuda"``, ``"videotoolbox"``, ``"qsv"``, ``"vaapi"`` --
               request a specific hardware decoder.
+        workers: Number of threads used to JPEG-encode frames (see
+            :class:`JPEGBinWriter`).
+        seek: If ``True``, avoid decoding frames that are not sampled.
+            Frame indices are derived from the stream's timestamps, and
+            whenever the next sampled frame lies more than one GOP ahead
+            the container is seeked to the keyframe preceding it.  Records
+            the same frame indices as the default path for constant
+            frame-rate sources, while decode time drops roughly in
+            proportion to the sampling ratio when frames are sampled more
+            sparsely than keyframes occur.
+        pipeline: If ``True``, run the conversion as a pipeline of
+            concurrent stages connected by bounded queues: demuxing and
+            decoding on one thread, BGR conversion and resizing on a
+            second, and JPEG encoding (on *workers* threads) and writing on
+            the calling thread.  Throughput then approaches that of the
+            slowest stage instead of the sum of all of them.  The output is
+            identical to the sequential path.
+        resize_backend: How frames are shrunk to *max_size*:
+
+            - ``"opencv"`` (default) -- convert to full-resolution BGR, then
+              ``cv2.resize`` with ``cv2.INTER_AREA``.
+            - ``"ffmpeg"`` -- let FFmpeg's swscale scale (area averaging)
+              and convert to BGR in one pass with ``VideoFrame.reformat``.
+              Much cheaper for high-resolution sources; pixel values differ
+              slightly from the OpenCV path.
+
+        start_time: Only extract frames presented at or after this many
+            seconds.  The container is seeked to the keyframe preceding it
+            instead of decoding from the start.
+        end_time: Only extract frames presented before this many seconds;
+            decoding stops there instead of running to the end of the file.
+        intervals: Alternatively to *start_time*/*end_time*, a list of
+            ``(start, end)`` times in seconds.  Each interval is reached by
+            seeking and decoded only up to its end; overlapping intervals
+            are merged.
+
+            With a time range, frames are sampled on the same grid as a
+            full extraction (every ``round(source_fps / sample_fps)``-th
+            source frame), frame indices are derived from timestamps as
+            with *seek*, ``total_num_frames`` still describes the whole
+            source and the header's ``selected_duration`` is the total
+            length of the extracted ranges.
 
     Returns:
         A dictionary with keys: ``nframes``, ``width``, ``height``,
         ``source_fps``, ``sample_fps``, ``total_num_frames``,
-        ``file_size``.
+        ``selected_duration``, ``file_size``.
 
     Raises:
-        ValueError: If the video cannot be opened or contains no frames.
+        ValueError: If the video cannot be opened or contains no frames
+            (in the requested range), *resize_backend* is invalid, or the
+            time range is invalid.
         JPEGBinError: If JPEG encoding fails.
 
     Examples:
@@ -280,6 +1484,10 @@ def video_to_jpeg_bin(
         ...                         sample_fps=2.0, jpeg_quality=95,
         ...                         max_size=448)
         >>> print(meta["nframes"], meta["width"], meta["height"])
+
+        >>> # Two annotated segments of a long video, in seconds
+        >>> meta = video_to_jpeg_bin("movie.mp4", "segments.bin",
+        ...                         intervals=[(600, 610), (3000, 3012.5)])
     """
     if av is None:
         raise ImportError(
@@ -287,6 +1495,11 @@ def video_to_jpeg_bin(
             "Install it with: pip install av"
         )
 
+    if resize_backend not in _RESIZE_BACKENDS:
+        raise ValueError(
+            f"resize_backend must be one of {_RESIZE_BACKENDS}, "
+            f"got {resize_backend!r}"
+        )
     hwaccel_obj = _get_hwaccel(hwaccel)
 
     container = av.open(input_path)
@@ -308,70 +1521,507 @@ def video_to_jpeg_bin(
             duration = (
                 float(stream.duration * stream.time_base) if stream.duration else 0.0
             )
+            if duration <= 0 and container.duration:
+                # e.g. Matroska records the length only for the container.
+                duration = container.duration / av.time_base
             if duration > 0 and source_fps > 0:
                 total_num_frames = int(duration * source_fps)
 
         frame_interval = max(1, round(source_fps / sample_fps))
-
-        frames: List[np.ndarray] = []
-        frame_indices: List[int] = []
-        width = height = 0
+        ranges = _time_ranges(start_time, end_time, intervals, source_fps)
+        selected_duration: Optional[float] = None
+        expected_nframes = -(-total_num_frames // frame_interval)
+        if ranges is not None:
+            # Open or overlong ranges end with the video, when its length
+            # is known; otherwise the size of the selection is unknown.
+            clipped: List[Tuple[int, int]] = []
+            for s, e in ranges:
+                if total_num_frames > 0:
+                    e = total_num_frames if e is None else min(e, total_num_frames)
+                if e is not None:
+                    clipped.append((s, e))
+            if len(clipped) == len(ranges):
+                selected_duration = sum(max(0, e - s) for s, e in clipped) / source_fps
+                expected_nframes = sum(
+                    max(0, -(-e // frame_interval) - -(-s // frame_interval))
+                    for s, e in clipped
+                )
 
         decode_kwargs: Dict[str, Any] = {}
         if hwaccel_obj is not None:
             decode_kwargs["hwaccel"] = hwaccel_obj
 
-        frame_idx = 0
-        for frame in container.decode(stream):
-            if frame_idx % frame_interval == 0:
-                img = frame.to_ndarray(format="bgr24")
-
-                if max_size is not None and max(img.shape[:2]) > max_size:
-                    scale = max_size / max(img.shape[:2])
-                    new_w = int(img.shape[1] * scale)
-                    new_h = int(img.shape[0] * scale)
-                    img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-                if width == 0:
-                    height, width = img.shape[:2]
-
-                frames.append(img)
-                frame_indices.append(frame_idx)
-
-            frame_idx += 1
+        # Frames are streamed to disk as they are decoded, so memory use does
+        # not grow with the length of the video.
+        writer = JPEGBinWriter(
+            output_path,
+            source_fps=source_fps,
+            sample_fps=sample_fps,
+            total_num_frames=total_num_frames,
+            selected_duration=selected_duration,
+            jpeg_quality=jpeg_quality,
+            expected_nframes=expected_nframes,
+            workers=workers,
+        )
+        if ranges is not None:
+            sampled = _iter_range_sampled_frames(
+                container, stream, frame_interval, source_fps, ranges, seek
+            )
+        elif seek:
+            sampled = _iter_seek_sampled_frames(
+                container, stream, frame_interval, source_fps
+            )
+        else:
+            sampled = _iter_every_nth_frame(container, stream, frame_interval)
+
+        stages: List[Generator[Any, None, None]] = []
+        if pipeline:
+            stages.append(_prefetch(iter(sampled)))
+            sampled = stages[-1]
+        images = (
+            (idx, _frame_to_bgr(frame, max_size, resize_backend))
+            for idx, frame in sampled
+        )
+        if pipeline:
+            stages.append(_prefetch(images))
+            images = stages[-1]
+
+        try:
+            with writer:
+                last_idx = -1
+                for frame_idx, img in images:
+                    writer.append(img, frame_idx)
+                    last_idx = frame_idx
+
+                if len(writer) == 0:
+                    raise ValueError(f"No frames extracted from {input_path!r}")
+                if ranges is not None and selected_duration is None:
+                    # The video's length is unknown, so the open last range
+                    # ends with the frames actually extracted, each standing
+                    # for frame_interval source frames.
+                    open_start = ranges[-1][0]
+                    stop = max(open_start, last_idx + frame_interval)
+                    selected_duration = (
+                        sum(max(0, e - s) for s, e in clipped) + stop - open_start
+                    ) / source_fps
+                    writer.selected_duration = selected_duration
+        finally:
+            # Stop the pipeline threads, last stage first, before the
+            # container they decode from is closed.
+            for stage in reversed(stages):
+                stage.close()
     finally:
         container.close()
 
-    if not frames:
-        raise ValueError(f"No frames extracted from {input_path!r}")
-
-    write_jpeg_bin(
-        output_path=output_path,
-        frames=frames,
-        source_fps=float(source_fps),
-        sample_fps=sample_fps,
-        total_num_frames=total_num_frames,
-        frame_indices=frame_indices,
-        jpeg_quality=jpeg_quality,
-    )
-
     file_size = os.path.getsize(output_path)
     return {
-        "nframes": len(frames),
-        "width": width,
-        "height": height,
+        "nframes": len(writer),
+        "width": writer.width,
+        "height": writer.height,
         "source_fps": float(source_fps),
         "sample_fps": sample_fps,
         "total_num_frames": total_num_frames,
+        "selected_duration": (
+            selected_duration
+            if selected_duration is not None
+            else total_num_frames / source_fps
+        ),
         "file_size": file_size,
     }
 
 
+class FrameCache:
+    """Bounded in-process LRU cache of decoded JPEGBIN frames.
+
+    Frames are keyed by ``(bin_path, frame_idx, target_size)`` and evicted
+    least-recently-used first once their total size exceeds *max_bytes*.
+    Every lookup passes the file's ``(st_mtime_ns, st_size)`` stamp; when it
+    differs from the stamp the file's frames were cached under, all of that
+    file's entries are dropped, so a rewritten ``.bin`` is never served
+    stale.  The cache is thread-safe and can be shared between readers.
+
+    Cached frames are stored read-only; :func:`read_jpeg_bin` copies them
+    into the clip it returns.
+
+    Args:
+        max_bytes: Budget for the cached frame data, in bytes.
+
+    Attributes:
+        max_bytes: The byte budget.
+        hits: Number of frames served from the cache.
+        misses: Number of frames that had to be decoded.
+        evictions: Number of frames evicted to stay within the budget.
+
+    Examples:
+        >>> cache = FrameCache(max_bytes=2 << 30)
+        >>> for epoch in range(epochs):
+        ...     video, meta, fps = read_jpeg_bin("video.bin", cache=cache)
+        >>> cache.stats()["hits"]
+    """
+
+    def __init__(self, max_bytes: int = 1 << 30) -> None:
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be >= 0, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nbytes = 0
+        self._frames: "OrderedDict[Tuple[Any, ...], np.ndarray]" = OrderedDict()
+        # bin path -> (stamp, keys cached under that stamp)
+        self._files: Dict[str, Tuple[Tuple[int, int], set]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def stamp(bin_path: str) -> Tuple[int, int]:
+        """Return the ``(st_mtime_ns, st_size)`` stamp of *bin_path*."""
+        st = os.stat(bin_path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(
+        self,
+        bin_path: str,
+        frame_idx: int,
+        stamp: Tuple[int, int],
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> Optional[np.ndarray]:
+        """Look up a decoded frame, counting a hit or a miss.
+
+        Args:
+            bin_path: Path of the ``.bin`` file.
+            frame_idx: Zero-based stored-frame index.
+            stamp: Current stamp of the file, from :meth:`stamp`.
+            target_size: The ``target_size`` the frame was decoded at.
+
+        Returns:
+            The cached read-only ``(H, W, 3)`` frame, or ``None``.
+        """
+        key = (bin_path, frame_idx, target_size)
+        with self._lock:
+            self._validate(bin_path, stamp)
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(
+        self,
+        bin_path: str,
+        frame_idx: int,
+        stamp: Tuple[int, int],
+        frame: np.ndarray,
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """Insert a copy of a decoded frame, evicting LRU entries as needed.
+
+        Frames larger than the whole budget are not cached.
+        """
+        if frame.nbytes > self.max_bytes:
+            return
+        frame = frame.copy()
+        frame.setflags(write=False)
+        key = (bin_path, frame_idx, target_size)
+        with self._lock:
+            self._validate(bin_path, stamp)
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._frames[key] = frame
+            self._files.setdefault(bin_path, (stamp, set()))[1].add(key)
+            self._nbytes += frame.nbytes
+            while self._nbytes > self.max_bytes:
+                self._evict()
+
+    def _validate(self, bin_path: str, stamp: Tuple[int, int]) -> None:
+        entry = self._files.get(bin_path)
+        if entry is not None and entry[0] != stamp:
+            for key in entry[1]:
+                self._nbytes -= self._frames.pop(key).nbytes
+            del self._files[bin_path]
+
+    def _evict(self) -> None:
+        key, frame = self._frames.popitem(last=False)
+        self._nbytes -= frame.nbytes
+        keys = self._files[key[0]][1]
+        keys.discard(key)
+        if not keys:
+            del self._files[key[0]]
+        self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached frames, in bytes."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the counters and current size, e.g. for monitoring."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._frames),
+                "nbytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """Drop every cached frame.  The counters are kept."""
+        with self._lock:
+            self._frames.clear()
+            self._files.clear()
+            self._nbytes = 0
+
+
+def _default_shared_cache_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    # /dev/shm is shared by all users: each gets a directory of their own.
+    if hasattr(os, "getuid"):
+        return os.path.join(base, f"wtools-frames-{os.getuid()}")
+    return os.path.join(base, "wtools-frames")
+
+
+def _make_private_dir(path: str) -> None:
+    """Create *path* with mode ``0o700``, or check that an existing one is ours.
+
+    Cache file names can be computed by anyone, so a directory another
+    user can write to would let them plant frames that are served as ours.
+
+    Raises:
+        PermissionError: If *path* is not a directory owned by the current
+            user (e.g. a symlink, or created first by someone else).
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or (
+        hasattr(os, "getuid") and st.st_uid != os.getuid()
+    ):
+        raise PermissionError(
+            f"Cache directory {path!r} is not a directory owned by the current user"
+        )
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+class SharedFrameCache:
+    """Decoded-frame cache shared between processes through memory-mapped files.
+
+    Each cached frame is one ``.npy`` file under *cache_dir* (``/dev/shm``
+    by default, i.e. RAM-backed), written atomically with ``os.replace()``
+    and read back with ``np.load(mmap_mode="r")``.  All processes using the
+    same *cache_dir* -- e.g. the workers of a multi-process DataLoader --
+    map the same page-cache pages, so a clip decoded by one worker is held
+    in memory once and is not decoded again by the others.  Because the
+    frames are file-backed shared mappings, :func:`~wtools.utils.get_mem_info`
+    attributes them to ``shared``/``shared_file`` rather than ``uss``.
+
+    The file name hashes ``(bin_path, frame_idx, target_size)`` together
+    with the ``.bin`` file's ``(st_mtime_ns, st_size)`` stamp, so frames of
+    a rewritten file are never served; their stale files are removed by
+    :meth:`prune` like any other old entry.
+
+    It exposes the same ``stamp``/``get``/``put`` interface as
+    :class:`FrameCache` and can be passed to :func:`read_jpeg_bin` as
+    *cache*.
+
+    Args:
+        cache_dir: Directory holding the frame files.  Defaults to
+            ``/dev/shm/wtools-frames-<uid>`` (or the temp directory when
+            ``/dev/shm`` does not exist), created with mode ``0o700``; the
+            default directory must be owned by the current user.
+        max_bytes: Budget for the files in *cache_dir*, in bytes; they
+            live in RAM under ``/dev/shm``.  Once a process has written
+            about a sixteenth of the budget, it calls :meth:`prune`, which
+            deletes the oldest-written frames.  Defaults to 1 GiB.
+
+    Attributes:
+        cache_dir: The cache directory.
+        max_bytes: The byte budget.
+        hits: Number of frames this process served from the cache.
+        misses: Number of lookups in this process that missed.
+        write_errors: Number of frames this process failed to cache, e.g.
+            because *cache_dir* was full.  The frame is still returned.
+
+    Examples:
+        >>> cache = SharedFrameCache(max_bytes=8 << 30)   # before forking
+        >>> video, meta, fps = read_jpeg_bin("video.bin", cache=cache)
+        >>> cache.footprint()
+        {'files': 64, 'nbytes': 38535168}
+    """
+
+    def __init__(
+        self, cache_dir: Optional[str] = None, max_bytes: int = 1 << 30
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be >= 0, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.write_errors = 0
+        self._written = 0
+        if cache_dir is None:
+            self.cache_dir = _default_shared_cache_dir()
+            _make_private_dir(self.cache_dir)
+        else:
+            self.cache_dir = cache_dir
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    stamp = staticmethod(FrameCache.stamp)
+
+    def _path(
+        self,
+        bin_path: str,
+        frame_idx: int,
+        stamp: Tuple[int, int],
+        target_size: Optional[Tuple[int, int]],
+    ) -> str:
+        key = repr((bin_path, stamp, frame_idx, target_size)).encode("utf-8")
+        digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".npy")
+
+    def get(
+        self,
+        bin_path: str,
+        frame_idx: int,
+        stamp: Tuple[int, int],
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> Optional[np.ndarray]:
+        """Look up a decoded frame, counting a hit or a miss.
+
+        Args:
+            bin_path: Path of the ``.bin`` file.
+            frame_idx: Zero-based stored-frame index.
+            stamp: Current stamp of the file, from :meth:`stamp`.
+            target_size: The ``target_size`` the frame was decoded at.
+
+        Returns:
+            A read-only memory-mapped ``(H, W, 3)`` frame, or ``None``.
+        """
+        try:
+            frame: np.ndarray = np.load(
+                self._path(bin_path, frame_idx, stamp, target_size), mmap_mode="r"
+            )
+        except (OSError, ValueError):
+            # Missing, or pruned by another process between lookup and open.
+            self.misses += 1
+            return None
+        self.hits += 1
+        return frame
+
+    def put(
+        self,
+        bin_path: str,
+        frame_idx: int,
+        stamp: Tuple[int, int],
+        frame: np.ndarray,
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """Write a decoded frame to the cache atomically.
+
+        A failed write (e.g. ``ENOSPC`` on a full ``/dev/shm``) is counted
+        in :attr:`write_errors` instead of raised: the frame was decoded
+        and the read that produced it must not fail.
+        """
+        path = self._path(bin_path, frame_idx, stamp, target_size)
+        dir_name = os.path.dirname(path)
+        try:
+            os.makedirs(dir_name, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=dir_name, delete=False, suffix=".tmp"
+            ) as ftmp:
+                try:
+                    np.save(ftmp, np.ascontiguousarray(frame))
+                except BaseException:
+                    os.remove(ftmp.name)
+                    raise
+            os.replace(ftmp.name, path)
+        except OSError:
+            self.write_errors += 1
+            return
+
+        self._written += frame.nbytes
+        if self._written * 16 >= self.max_bytes:
+            self._written = 0
+            self.prune()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if not entry.name.endswith(".npy"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Delete the oldest-written frames until the cache fits a budget.
+
+        Frames still mapped by a reader stay valid until it drops them.
+
+        Args:
+            max_bytes: Budget to prune to.  Defaults to :attr:`max_bytes`.
+
+        Returns:
+            The number of deleted frame files.
+        """
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= budget:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def footprint(self) -> Dict[str, int]:
+        """Return the number of cached frame files and their total size.
+
+        The same bytes show up as ``shared``/``shared_file`` in
+        :func:`~wtools.utils.get_mem_info` for every process that has
+        mapped them.
+        """
+        entries = self._entries()
+        return {
+            "files": len(entries),
+            "nbytes": sum(size for _, size, _ in entries),
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Return this process's counters together with :meth:`footprint`."""
+        return {"hits": self.hits, "misses": self.misses, **self.footprint()}
+
+    def clear(self) -> None:
+        """Delete every cached frame.  The counters are kept."""
+        self.prune(0)
+
+
 def read_jpeg_bin_metadata(bin_path: str, validate_size: bool = True) -> Dict[str, Any]:
     """Read metadata from a JPEGBIN1 file without decoding JPEG frames.
 
-    Only the 60-byte header and the two uint64 index arrays are read; the
-    JPEG payloads are skipped entirely.  This is useful for quickly inspecting
+    Only the 60-byte header and the index tables (the uint64 frame indices
+    and JPEG lengths, plus the uint32 CRC-32 table in version 2 files) are
+    read; the JPEG payloads are skipped entirely.  This is useful for quickly inspecting
     a file's properties or validating integrity.
 
     Args:
@@ -393,6 +2043,8 @@ def read_jpeg_bin_metadata(bin_path: str, validate_size: bool = True) -> Dict[st
         - ``jpeg_quality`` (int): JPEG quality used during encoding.
         - ``nframes`` (int): Number of frames stored.
         - ``jpeg_lengths`` (list[int]): Byte length of each JPEG payload.
+        - ``crc32`` (list[int] or None): CRC-32 of each JPEG payload, or
+          ``None`` for version 1 files, which carry no checksums.
         - ``payload_offset`` (int): Byte offset where JPEG data starts.
 
     Raises:
@@ -407,11 +2059,9 @@ def read_jpeg_bin_metadata(bin_path: str, validate_size: bool = True) -> Dict[st
     """
     with open(bin_path, "rb") as fin:
         raw_header = fin.read(HEADER_SIZE)
-        if len(raw_header) != HEADER_SIZE:
-            raise JPEGBinError(f"Truncated bin header: {bin_path!r}")
 
         (
-            magic,
+            _,
             version,
             nframes,
             total_num_frames,
@@ -421,39 +2071,29 @@ def read_jpeg_bin_metadata(bin_path: str, validate_size: bool = True) -> Dict[st
             width,
             height,
             jpeg_quality,
-        ) = HEADER_STRUCT.unpack(raw_header)
-
-        if magic != MAGIC:
-            raise JPEGBinError(
-                f"Invalid magic in {bin_path!r}: {magic!r} (expected {MAGIC!r})"
-            )
-        if version != FORMAT_VERSION:
-            raise JPEGBinError(
-                f"Unsupported bin version in {bin_path!r}: "
-                f"{version} != {FORMAT_VERSION}"
-            )
-        if nframes <= 0:
-            raise JPEGBinError(f"Invalid nframes in {bin_path!r}: {nframes}")
-        if nframes > MAX_NFRAMES:
-            raise JPEGBinError(
-                f"nframes={nframes} exceeds safety limit {MAX_NFRAMES} in {bin_path!r}"
-            )
+        ) = _unpack_header(raw_header, bin_path)
         # Verify file is large enough to contain the declared index tables
-        min_expected = HEADER_SIZE + nframes * 16
+        payload_offset = HEADER_SIZE + nframes * _index_entry_size(version)
+        min_expected = payload_offset
         if os.path.getsize(bin_path) < min_expected:
             raise JPEGBinError(
                 f"File too small for {nframes} frames in {bin_path!r}: "
                 f"need at least {min_expected} bytes"
             )
 
-        indices_raw = fin.read(nframes * 8)
-        lengths_raw = fin.read(nframes * 8)
-        if len(indices_raw) != nframes * 8 or len(lengths_raw) != nframes * 8:
+        tables_raw = fin.read(payload_offset - HEADER_SIZE)
+        if len(tables_raw) != payload_offset - HEADER_SIZE:
             raise JPEGBinError(f"Truncated bin index table: {bin_path!r}")
 
-        frame_indices = np.frombuffer(indices_raw, dtype="<u8").tolist()
-        jpeg_lengths = np.frombuffer(lengths_raw, dtype="<u8").tolist()
-        payload_offset = HEADER_SIZE + nframes * 16
+        frame_indices = np.frombuffer(tables_raw, dtype="<u8", count=nframes).tolist()
+        jpeg_lengths = np.frombuffer(
+            tables_raw, dtype="<u8", count=nframes, offset=nframes * 8
+        ).tolist()
+        crc32s = None
+        if version >= 2:
+            crc32s = np.frombuffer(
+                tables_raw, dtype="<u4", count=nframes, offset=nframes * 16
+            ).tolist()
 
     if validate_size:
         expected_size = payload_offset + sum(jpeg_lengths)
@@ -476,10 +2116,82 @@ def read_jpeg_bin_metadata(bin_path: str, validate_size: bool = True) -> Dict[st
         "jpeg_quality": int(jpeg_quality),
         "nframes": int(nframes),
         "jpeg_lengths": jpeg_lengths,
+        "crc32": crc32s,
         "payload_offset": payload_offset,
     }
 
 
+def verify_jpeg_bin(bin_path: str, decode: bool = False) -> Dict[str, Any]:
+    """Check the integrity of every JPEG payload in a JPEGBIN1 file.
+
+    The header, index tables and file size are validated as in
+    :func:`read_jpeg_bin_metadata`, then the payloads are streamed through
+    a single reusable buffer in file order -- sequential, large reads at
+    disk bandwidth -- and each one is checked:
+
+    - against its stored CRC-32 (version 2 files);
+    - for the JPEG start/end-of-image markers (all versions, the only
+      payload check available for version 1 files);
+    - optionally, by decoding it with ``cv2.imdecode``.
+
+    Args:
+        bin_path: Path to the ``.bin`` file.
+        decode: Also decode every payload (at 1/8 scale, which still
+            entropy-decodes the whole stream).  Much slower, but catches
+            corruption in version 1 files.
+
+    Returns:
+        A dict with ``path``, ``nframes``, ``checksummed`` (whether the file
+        stores CRC-32s), ``bad_frames`` (stored-frame indices that failed a
+        check) and ``ok`` (``True`` if *bad_frames* is empty).
+
+    Raises:
+        JPEGBinError: If the header, index tables or file size are corrupt.
+        FileNotFoundError: If *bin_path* does not exist.
+
+    Examples:
+        >>> report = verify_jpeg_bin("video.bin")
+        >>> report["ok"], report["bad_frames"]
+        (True, [])
+    """
+    meta = read_jpeg_bin_metadata(bin_path, validate_size=True)
+    jpeg_lengths = meta["jpeg_lengths"]
+    crc32s = meta["crc32"]
+
+    bad_frames: List[int] = []
+    buf = memoryview(bytearray(max(jpeg_lengths)))
+    with cast(io.BufferedReader, open(bin_path, "rb", buffering=8 << 20)) as fin:
+        fin.seek(meta["payload_offset"])
+        for i, length in enumerate(jpeg_lengths):
+            payload = buf[:length]
+            if fin.readinto(payload) != length:
+                raise JPEGBinError(
+                    f"Truncated JPEG payload at frame {i} in {bin_path!r}"
+                )
+            if (
+                (crc32s is not None and zlib.crc32(payload) != crc32s[i])
+                or payload[:2] != b"\xff\xd8"
+                or payload[-2:] != b"\xff\xd9"
+                or (
+                    decode
+                    and cv2.imdecode(
+                        np.frombuffer(payload, dtype=np.uint8),
+                        cv2.IMREAD_REDUCED_COLOR_8,
+                    )
+                    is None
+                )
+            ):
+                bad_frames.append(i)
+
+    return {
+        "path": bin_path,
+        "nframes": meta["nframes"],
+        "checksummed": crc32s is not None,
+        "bad_frames": bad_frames,
+        "ok": not bad_frames,
+    }
+
+
 @overload
 def read_jpeg_bin(
     bin_path: str,
@@ -488,6 +2200,11 @@ def read_jpeg_bin(
     frame_interval: Optional[int] = None,
     start_frame: Optional[int] = None,
     end_frame: Optional[int] = None,
+    workers: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    target_size: Optional[Tuple[int, int]] = None,
+    max_gap: int = DEFAULT_MAX_GAP,
+    cache: Optional[Union[FrameCache, SharedFrameCache]] = None,
 ) -> Tuple[np.ndarray, Dict[str, Any], float]:
     ...
 
@@ -501,6 +2218,11 @@ def read_jpeg_bin(
     frame_interval: Optional[int] = None,
     start_frame: Optional[int] = None,
     end_frame: Optional[int] = None,
+    workers: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    target_size: Optional[Tuple[int, int]] = None,
+    max_gap: int = DEFAULT_MAX_GAP,
+    cache: Optional[Union[FrameCache, SharedFrameCache]] = None,
 ) -> Tuple[List[str], Dict[str, Any], float]:
     ...
 
@@ -512,12 +2234,17 @@ def read_jpeg_bin(
     frame_interval: Optional[int] = None,
     start_frame: Optional[int] = None,
     end_frame: Optional[int] = None,
-) -> Tuple[Union[np.ndarray, List[str]], Dict[str, Any], float]:
+    workers: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    target_size: Optional[Tuple[int, int]] = None,
+    max_gap: int = DEFAULT_MAX_GAP,
+    cache: Optional[Union[FrameCache, SharedFrameCache]] = None,
+) -> Tuple[Union[np.ndarray, List[str], List[memoryview]], Dict[str, Any], float]:
     """Decode a JPEGBIN1 file into frames, with optional sub-sampling.
 
     Reads the header and index tables via :func:`read_jpeg_bin_metadata`,
     then either decodes each JPEG payload into an RGB NumPy array or
-    returns the raw JPEG bytes as base64-encoded strings.
+    returns the raw JPEG bytes, as-is or base64-encoded.
 
     Sub-sampling is controlled by three mutually-composable parameters
     (applied in the order: *start_frame/end_frame* clipping ->
@@ -534,6 +2261,8 @@ def read_jpeg_bin(
               base64-encoded ``str`` objects, one per frame.  No image
               decoding is performed, making this faster and free of
               OpenCV decode overhead.
+            - ``"bytes"`` -- Return raw JPEG payloads as a list of
+              read-only ``memoryview`` objects, one per frame.
 
         num_frames: If given, uniformly sub-sample to exactly this many
             frames via ``np.linspace``.  Must be >= 1 and <= the number
@@ -548,14 +2277,46 @@ def read_jpeg_bin(
         end_frame: Zero-based index **after** the last frame to include
             (Python slice semantics).  Defaults to the total frame
             count (i.e. include all remaining frames).
+        workers: Number of threads used to decode JPEG payloads in
+            ``"numpy"`` mode.  ``None`` (default) or ``1`` decodes serially.
+            Larger values decode frames concurrently on a shared, reusable
+            thread pool (OpenCV releases the GIL while decoding).  Ignored
+            in ``"base64"`` mode.
+        out: Optional preallocated ``uint8`` array of shape
+            ``(T, H, W, 3)`` that the frames are decoded into, e.g. a pinned
+            buffer reused across batches.  ``T`` must equal the number of
+            selected frames.  It is returned as *video*.  Ignored in
+            ``"base64"`` mode.
+        target_size: Optional ``(width, height)`` to return frames at.
+            The stored ``width``/``height`` are used to pick the largest
+            libjpeg DCT scaling factor (``cv2.IMREAD_REDUCED_COLOR_2/4/8``)
+            that does not go below *target_size*, which is much cheaper
+            than a full-resolution decode; frames are then resized to
+            exactly *target_size* with ``cv2.INTER_AREA``.  The returned
+            ``width``/``height`` metadata keep describing the stored
+            frames.  Ignored in ``"base64"`` mode.
+        max_gap: Gap tolerance, in bytes, for coalescing payload reads.
+            Payloads are stored back to back, so selected frames whose
+            payloads are at most *max_gap* bytes apart are fetched with a
+            single read and sliced, trading some over-read for far fewer
+            syscalls (one round trip each on network filesystems).  ``0``
+            only merges adjacent payloads.  Defaults to
+            :data:`DEFAULT_MAX_GAP` (64 KiB); raise it on network
+            filesystems.
+        cache: Optional :class:`FrameCache` or :class:`SharedFrameCache`
+            consulted before decoding in ``"numpy"`` mode.  Cached frames
+            are copied into the clip and only the missing frames are read
+            and decoded, then added to the cache.  Ignored in the
+            ``"base64"`` and ``"bytes"`` modes.
 
     Returns:
         A tuple ``(video, metadata, sample_fps)`` where:
 
         - **video** is either a ``np.ndarray`` of shape ``(T, H, W, 3)``
-          (when *return_format* is ``"numpy"``) or a ``list[str]`` of
+          (when *return_format* is ``"numpy"``), a ``list[str]`` of
           base64-encoded JPEG strings (when *return_format* is
-          ``"base64"``).  ``T`` equals the number of selected frames
+          ``"base64"``) or a ``list[memoryview]`` of JPEG payloads (when
+          *return_format* is ``"bytes"``).  ``T`` equals the number of selected frames
           after sub-sampling.
         - **metadata** is the dictionary from
           :func:`read_jpeg_bin_metadata` minus the ``jpeg_lengths`` and
@@ -569,7 +2330,8 @@ def read_jpeg_bin(
         JPEGBinError: If the file is corrupt or a JPEG payload cannot be
             decoded (only applies to ``"numpy"`` mode).
         ValueError: If *return_format* is invalid, *num_frames* is out
-            of range, or *frame_interval* is < 1.
+            of range, *frame_interval* is < 1, or *out* does not match the
+            selection.
 
     Examples:
         >>> # Default: decode all frames to NumPy array
@@ -582,47 +2344,44 @@ def read_jpeg_bin(
         >>> # Take every 3rd frame
         >>> video, meta, fps = read_jpeg_bin("video.bin", frame_interval=3)
 
+        >>> # Decode 64 frames on 8 threads
+        >>> video, meta, fps = read_jpeg_bin("video.bin", num_frames=64, workers=8)
+
+        >>> # Decode into a reusable buffer
+        >>> buf = np.empty((16, meta["height"], meta["width"], 3), np.uint8)
+        >>> video, meta, fps = read_jpeg_bin("video.bin", num_frames=16, out=buf)
+
+        >>> # Decode 448px frames directly to 224x224
+        >>> video, meta, fps = read_jpeg_bin("video.bin", target_size=(224, 224))
+
+        >>> # Reuse decoded frames across epochs
+        >>> cache = FrameCache(max_bytes=4 << 30)
+        >>> video, meta, fps = read_jpeg_bin("video.bin", cache=cache)
+
         >>> # Frames 10..50 only, as base64 strings
         >>> b64, meta, fps = read_jpeg_bin("video.bin", return_format="base64",
         ...                                start_frame=10, end_frame=50)
+
+        >>> # Raw JPEG bytes, e.g. to write frames out unchanged
+        >>> frames, meta, fps = read_jpeg_bin("video.bin", return_format="bytes")
+        >>> bytes(frames[0])[:2]
+        b'\\xff\\xd8'
     """
-    if return_format not in ("numpy", "base64"):
-        raise ValueError(
-            f"return_format must be 'numpy' or 'base64', got {return_format!r}"
-        )
+    _check_return_format(return_format)
+    _check_target_size(target_size)
+    if max_gap < 0:
+        raise ValueError(f"max_gap must be >= 0, got {max_gap}")
 
     metadata = read_jpeg_bin_metadata(bin_path, validate_size=True)
     jpeg_lengths = metadata.pop("jpeg_lengths")
     payload_offset = metadata.pop("payload_offset")
+    metadata.pop("crc32")
     total_stored = metadata["nframes"]
 
     # --- determine which stored-frame indices to read ---
-    s = 0 if start_frame is None else max(0, start_frame)
-    e = total_stored if end_frame is None else min(end_frame, total_stored)
-    if s >= e:
-        raise ValueError(
-            f"Empty frame range: start_frame={s} >= end_frame={e} "
-            f"(total stored={total_stored})"
-        )
-
-    sel = list(range(s, e))
-
-    if frame_interval is not None:
-        if frame_interval < 1:
-            raise ValueError(f"frame_interval must be >= 1, got {frame_interval}")
-        sel = sel[::frame_interval]
-
-    if num_frames is not None:
-        if num_frames < 1:
-            raise ValueError(f"num_frames must be >= 1, got {num_frames}")
-        if num_frames > len(sel):
-            raise ValueError(
-                f"num_frames={num_frames} exceeds available frames "
-                f"({len(sel)}) after clipping/striding"
-            )
-        if num_frames < len(sel):
-            positions = np.linspace(0, len(sel) - 1, num=num_frames, dtype=int)
-            sel = [sel[i] for i in positions]
+    sel = _select_frames(
+        total_stored, num_frames, frame_interval, start_frame, end_frame
+    )
 
     # --- read selected JPEG payloads ---
     # Build cumulative offset table via np.cumsum (vectorized)
@@ -632,31 +2391,47 @@ def read_jpeg_bin(
     np.cumsum(jpeg_lengths, out=cumlen[1:], dtype=np.int64)
     offsets = cumlen + payload_offset
 
-    if return_format == "base64":
-        result: List[str] = []
+    result: Union[np.ndarray, List[str], List[memoryview]]
+    if return_format != "numpy":
         with open(bin_path, "rb") as fin:
-            for idx in sel:
-                payload = _read_jpeg_payload(
-                    fin, offsets[idx], jpeg_lengths[idx], bin_path, idx
-                )
-                result.append(base64.b64encode(payload).decode("ascii"))
+            payloads = list(_read_payloads(fin, offsets, sel, bin_path, max_gap))
+        result = _encode_base64(payloads) if return_format == "base64" else payloads
     else:
-        frames: List[np.ndarray] = []
-        with open(bin_path, "rb") as fin:
-            for idx in sel:
-                payload = _read_jpeg_payload(
-                    fin, offsets[idx], jpeg_lengths[idx], bin_path, idx
+        # Frames are decoded straight into the output clip, whose size is
+        # known from the header -- no per-frame list and no np.stack copy.
+        width, height = target_size or (metadata["width"], metadata["height"])
+        result = _clip_buffer(out, len(sel), height, width)
+        flags = _reduced_decode_flag(metadata["width"], metadata["height"], target_size)
+        resize = target_size is not None
+
+        # Only frames missing from the cache are read and decoded.
+        missing = list(range(len(sel)))
+        if cache is not None:
+            cache_path = os.path.abspath(bin_path)
+            stamp = cache.stamp(bin_path)
+            missing = []
+            for i, idx in enumerate(sel):
+                frame = cache.get(cache_path, idx, stamp, target_size)
+                if frame is None:
+                    missing.append(i)
+                else:
+                    result[i] = frame
+        if missing:
+            todo = [sel[i] for i in missing]
+            if len(todo) == len(sel):
+                decoded = result
+            else:
+                decoded = np.empty((len(todo), height, width, 3), dtype=np.uint8)
+            with open(bin_path, "rb") as fin:
+                views = _read_payloads(fin, offsets, todo, bin_path, max_gap)
+                _decode_into(
+                    zip(todo, views), decoded, bin_path, workers, flags, resize
                 )
-                bgr = cv2.imdecode(
-                    np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR
-                )
-                if bgr is None:
-                    raise JPEGBinError(
-                        f"JPEG decode failed at frame {idx} in {bin_path!r}"
-                    )
-                rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-                frames.append(rgb)
-        result = np.stack(frames, axis=0)
+            if decoded is not result:
+                result[missing] = decoded
+            if cache is not None:
+                for j, idx in enumerate(todo):
+                    cache.put(cache_path, idx, stamp, decoded[j], target_size)
 
     # --- update metadata to reflect the sub-sampled selection ---
     old_indices = metadata["frame_indices"]
@@ -671,15 +2446,1331 @@ def read_jpeg_bin(
         or start_frame is not None
         or end_frame is not None
     )
-    if sub_sampled:
-        original_fps = metadata["source_fps"]
-        total_num_frames = metadata["total_num_frames"]
-        if total_num_frames > 0 and original_fps > 0:
-            video_duration = total_num_frames / original_fps
-            sample_fps = len(sel) / video_duration if video_duration > 0 else 0.0
-        else:
-            sample_fps = metadata["sample_fps"]
-    else:
-        sample_fps = metadata["sample_fps"]
+    sample_fps = _effective_sample_fps(metadata, len(sel), sub_sampled)
 
     return result, metadata, sample_fps
+
+
+def read_jpeg_bin_segments(
+    bin_path: str,
+    segments: Sequence[Dict[str, Optional[int]]],
+    workers: Optional[int] = None,
+    target_size: Optional[Tuple[int, int]] = None,
+    max_gap: int = DEFAULT_MAX_GAP,
+) -> List[Tuple[np.ndarray, Dict[str, Any], float]]:
+    """Decode several frame selections of one JPEGBIN1 file in one pass.
+
+    Equivalent to calling :func:`read_jpeg_bin` once per segment, e.g. for
+    the K temporal segments of a TSN-style sampler, but the header is read
+    once, the payloads of all segments are fetched in a single coalesced
+    pass and every stored frame is decoded at most once, however many
+    overlapping segments select it.
+
+    Args:
+        bin_path: Path to the ``.bin`` file.
+        segments: One dict per segment with any of the ``num_frames``,
+            ``frame_interval``, ``start_frame`` and ``end_frame`` keys,
+            interpreted exactly as by :func:`read_jpeg_bin`.
+        workers: Number of threads used to decode the unique frames, as
+            in :func:`read_jpeg_bin`.
+        target_size: Optional ``(width, height)`` to return frames at, as
+            in :func:`read_jpeg_bin`.
+        max_gap: Gap tolerance, in bytes, for coalescing payload reads, as
+            in :func:`read_jpeg_bin`.
+
+    Returns:
+        A list with one ``(video, metadata, sample_fps)`` tuple per
+        segment, in order, each equal to what :func:`read_jpeg_bin` returns
+        for that segment in ``"numpy"`` mode.  Every *video* is its own
+        array, so segments can be modified independently.
+
+    Raises:
+        JPEGBinError: If the file is corrupt or a JPEG payload cannot be
+            decoded.
+        ValueError: If *segments* is empty or a segment's selection is
+            invalid.
+
+    Examples:
+        >>> # Three 8-frame segments from the first, middle and last thirds
+        >>> n = read_jpeg_bin_metadata("video.bin")["nframes"]
+        >>> bounds = np.linspace(0, n, 4, dtype=int)
+        >>> clips = read_jpeg_bin_segments(
+        ...     "video.bin",
+        ...     [{"start_frame": s, "end_frame": e, "num_frames": 8}
+        ...      for s, e in zip(bounds[:-1], bounds[1:])],
+        ...     workers=8,
+        ... )
+        >>> [video.shape for video, meta, fps in clips]
+    """
+    _check_target_size(target_size)
+    if max_gap < 0:
+        raise ValueError(f"max_gap must be >= 0, got {max_gap}")
+
+    metadata = read_jpeg_bin_metadata(bin_path, validate_size=True)
+    jpeg_lengths = metadata.pop("jpeg_lengths")
+    payload_offset = metadata.pop("payload_offset")
+    metadata.pop("crc32")
+    sels, unique = _select_segments(metadata["nframes"], segments)
+
+    cumlen = np.empty(len(jpeg_lengths) + 1, dtype=np.int64)
+    cumlen[0] = 0
+    np.cumsum(jpeg_lengths, out=cumlen[1:], dtype=np.int64)
+    offsets = cumlen + payload_offset
+
+    width, height = target_size or (metadata["width"], metadata["height"])
+    decoded = np.empty((len(unique), height, width, 3), dtype=np.uint8)
+    flags = _reduced_decode_flag(metadata["width"], metadata["height"], target_size)
+    with open(bin_path, "rb") as fin:
+        payloads = _read_payloads(fin, offsets, unique, bin_path, max_gap)
+        _decode_into(
+            zip(unique, payloads),
+            decoded,
+            bin_path,
+            workers,
+            flags,
+            target_size is not None,
+        )
+    return _split_segments(decoded, unique, sels, segments, metadata)
+
+
+def read_jpeg_bin_batch(
+    paths: Sequence[str],
+    num_frames: Optional[int] = None,
+    frame_interval: Optional[int] = None,
+    start_frame: Optional[int] = None,
+    end_frame: Optional[int] = None,
+    workers: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    target_size: Optional[Tuple[int, int]] = None,
+    max_gap: int = DEFAULT_MAX_GAP,
+) -> Tuple[np.ndarray, List[Dict[str, Any]], List[float]]:
+    """Decode one clip from each of several JPEGBIN1 files into one batch.
+
+    Equivalent to calling :func:`read_jpeg_bin` for every path and stacking
+    the clips, without the per-clip arrays and the stacking copy: frames
+    are decoded straight into a single ``(B, T, H, W, 3)`` array.  The
+    decodes of all clips share one pool of threads, and the payloads of
+    the next file are read while the previous ones are being decoded.
+
+    Args:
+        paths: Paths to the ``.bin`` files, one per clip.
+        num_frames: Frame selection applied to every file, as in
+            :func:`read_jpeg_bin`.  All files must yield the same number of
+            frames ``T``, so this is usually set.
+        frame_interval: As in :func:`read_jpeg_bin`.
+        start_frame: As in :func:`read_jpeg_bin`.
+        end_frame: As in :func:`read_jpeg_bin`.
+        workers: Number of decode threads shared by all clips.  ``None``
+            (default) or ``1`` decodes serially.
+        out: Optional preallocated C-contiguous ``uint8`` array of shape
+            ``(B, T, H, W, 3)`` to decode into, e.g. a pinned buffer
+            reused across steps.  It is returned as *batch*.
+        target_size: Optional ``(width, height)`` every clip is decoded and
+            resized to, as in :func:`read_jpeg_bin`.  Required when the
+            files do not all share the same stored resolution.
+        max_gap: Gap tolerance, in bytes, for coalescing payload reads, as
+            in :func:`read_jpeg_bin`.
+
+    Returns:
+        A tuple ``(batch, metadata, sample_fps)`` where *batch* is the
+        ``(B, T, H, W, 3)`` RGB array and *metadata* and *sample_fps* are
+        lists with the per-clip values :func:`read_jpeg_bin` would return.
+
+    Raises:
+        JPEGBinError: If a file is corrupt or a JPEG payload cannot be
+            decoded.
+        ValueError: If *paths* is empty, a selection is invalid, the clips
+            differ in length, the files differ in resolution and no
+            *target_size* is given, or *out* does not match the batch.
+
+    Examples:
+        >>> batch, metas, fps = read_jpeg_bin_batch(paths, num_frames=16,
+        ...                                         target_size=(224, 224),
+        ...                                         workers=16)
+        >>> batch.shape        # (B, 16, 224, 224, 3)
+    """
+    _check_target_size(target_size)
+    if max_gap < 0:
+        raise ValueError(f"max_gap must be >= 0, got {max_gap}")
+    if not paths:
+        raise ValueError("paths must not be empty")
+
+    sub_sampled = (
+        num_frames is not None
+        or frame_interval is not None
+        or start_frame is not None
+        or end_frame is not None
+    )
+    clips = []
+    metadatas = []
+    sample_fps = []
+    for bin_path in paths:
+        metadata = read_jpeg_bin_metadata(bin_path, validate_size=True)
+        jpeg_lengths = metadata.pop("jpeg_lengths")
+        payload_offset = metadata.pop("payload_offset")
+        metadata.pop("crc32")
+        sel = _select_frames(
+            metadata["nframes"], num_frames, frame_interval, start_frame, end_frame
+        )
+        cumlen = np.empty(len(jpeg_lengths) + 1, dtype=np.int64)
+        cumlen[0] = 0
+        np.cumsum(jpeg_lengths, out=cumlen[1:], dtype=np.int64)
+        offsets = cumlen + payload_offset
+        clips.append((bin_path, sel, offsets, metadata["width"], metadata["height"]))
+
+        old_indices = metadata["frame_indices"]
+        metadata["frame_indices"] = [old_indices[i] for i in sel]
+        metadata["nframes"] = len(sel)
+        metadatas.append(metadata)
+        sample_fps.append(_effective_sample_fps(metadata, len(sel), sub_sampled))
+
+    lengths = {len(sel) for _, sel, _, _, _ in clips}
+    if len(lengths) > 1:
+        raise ValueError(
+            f"Clips have different lengths {sorted(lengths)}; pass num_frames "
+            f"to select the same number of frames from every file"
+        )
+    if target_size is None:
+        sizes = {(w, h) for _, _, _, w, h in clips}
+        if len(sizes) > 1:
+            raise ValueError(
+                f"Files have different resolutions {sorted(sizes)}; pass "
+                f"target_size to resize them to a common one"
+            )
+        width, height = sizes.pop()
+    else:
+        width, height = target_size
+    batch = _check_buffer(out, (len(paths), lengths.pop(), height, width, 3))
+
+    def tasks() -> Iterator[Tuple[Any, ...]]:
+        # Reads happen lazily on the calling thread, so the I/O of the next
+        # file overlaps with the decoding of the previous ones.
+        for b, (bin_path, sel, offsets, w, h) in enumerate(clips):
+            flags = _reduced_decode_flag(w, h, target_size)
+            resize = target_size is not None
+            with open(bin_path, "rb") as fin:
+                payloads = _read_payloads(fin, offsets, sel, bin_path, max_gap)
+                for i, (idx, payload) in enumerate(zip(sel, payloads)):
+                    yield payload, bin_path, idx, batch[b, i], flags, resize
+
+    if workers is None or workers <= 1:
+        for task in tasks():
+            _decode_jpeg_payload(*task)
+        return batch, metadatas, sample_fps
+
+    for _ in _imap_bounded(_decode_jpeg_payload, tasks(), workers):
+        pass
+    return batch, metadatas, sample_fps
+
+
+class JPEGBinReader:
+    """Memory-mapped, zero-copy reader for a JPEGBIN1 file.
+
+    The file is opened and mapped once; the header is parsed a single time
+    and the two index tables are exposed as read-only ``np.frombuffer``
+    views into the mapping.  Each JPEG payload is handed to
+    ``cv2.imdecode`` as a ``memoryview`` slice, so no intermediate
+    ``bytes`` object is created per frame.  This makes the reader cheap to
+    query repeatedly when the same file is touched many times (e.g. by a
+    dataloader over several epochs).
+
+    Args:
+        bin_path: Path to the ``.bin`` file.
+        validate_size: If ``True``, verify that the file size matches the
+            expected size computed from the header and index arrays.
+
+    Attributes:
+        bin_path: Path of the mapped file.
+        nframes: Number of stored frames.
+        width: Frame width in pixels.
+        height: Frame height in pixels.
+        frame_indices: ``uint64`` view of the stored original frame indices.
+        jpeg_lengths: ``uint64`` view of the JPEG payload lengths.
+        crc32: ``uint32`` view of the payload CRC-32s, or ``None`` for
+            version 1 files.
+        offsets: ``int64`` array of absolute payload start offsets, with a
+            trailing entry marking the end of the last payload.
+
+    Raises:
+        JPEGBinError: If the file is corrupt, truncated, or unsupported.
+        FileNotFoundError: If *bin_path* does not exist.
+
+    Examples:
+        >>> with JPEGBinReader("video.bin") as reader:
+        ...     first = reader.decode(0)        # (H, W, 3) RGB
+        ...     raw = reader.payload(1)         # memoryview of JPEG bytes
+        ...     clip = reader[10:20]            # (10, H, W, 3)
+        ...     picked = reader[[0, 5, 9]]      # (3, H, W, 3)
+        ...     len(reader)                     # number of stored frames
+    """
+
+    def __init__(self, bin_path: str, validate_size: bool = True) -> None:
+        self.bin_path = bin_path
+        self._owner: Any = None
+        with open(bin_path, "rb") as fin:
+            file_size = os.fstat(fin.fileno()).st_size
+            if file_size < HEADER_SIZE:
+                raise JPEGBinError(f"Truncated bin header: {bin_path!r}")
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(
+                fin.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        self._buf: Optional[memoryview] = memoryview(self._mmap)
+        try:
+            self._init_index(validate_size)
+        except BaseException:
+            self.close()
+            raise
+
+    @classmethod
+    def _from_buffer(
+        cls, buf: memoryview, name: str, validate_size: bool = True, owner: Any = None
+    ) -> "JPEGBinReader":
+        """Create a reader over an in-memory JPEGBIN1 image.
+
+        Args:
+            buf: ``memoryview`` spanning exactly one JPEGBIN1 file, e.g. a
+                record slice of a mapped shard.
+            name: Name used in error messages.
+            validate_size: As for the constructor.
+            owner: Object that keeps the underlying buffer alive.
+        """
+        self = cls.__new__(cls)
+        self.bin_path = name
+        self._owner = owner
+        self._mmap = None
+        if len(buf) < HEADER_SIZE:
+            raise JPEGBinError(f"Truncated bin header: {name!r}")
+        self._buf = buf
+        try:
+            self._init_index(validate_size)
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def _init_index(self, validate_size: bool) -> None:
+        assert self._buf is not None
+        file_size = len(self._buf)
+        (
+            _,
+            version,
+            nframes,
+            total_num_frames,
+            source_fps,
+            sample_fps,
+            selected_duration,
+            width,
+            height,
+            jpeg_quality,
+        ) = _unpack_header(self._buf[:HEADER_SIZE].tobytes(), self.bin_path)
+
+        payload_offset = HEADER_SIZE + nframes * _index_entry_size(version)
+        if file_size < payload_offset:
+            raise JPEGBinError(
+                f"File too small for {nframes} frames in {self.bin_path!r}: "
+                f"need at least {payload_offset} bytes"
+            )
+
+        self.frame_indices = np.frombuffer(
+            self._buf, dtype="<u8", count=nframes, offset=HEADER_SIZE
+        )
+        self.jpeg_lengths = np.frombuffer(
+            self._buf, dtype="<u8", count=nframes, offset=HEADER_SIZE + nframes * 8
+        )
+        self.crc32: Optional[np.ndarray] = None
+        if version >= 2:
+            self.crc32 = np.frombuffer(
+                self._buf, dtype="<u4", count=nframes, offset=HEADER_SIZE + nframes * 16
+            )
+        self.offsets = np.empty(nframes + 1, dtype=np.int64)
+        self.offsets[0] = payload_offset
+        np.cumsum(self.jpeg_lengths, out=self.offsets[1:], dtype=np.int64)
+        self.offsets[1:] += payload_offset
+
+        if validate_size and file_size != self.offsets[-1]:
+            raise JPEGBinError(
+                f"Corrupt bin size for {self.bin_path!r}: "
+                f"actual={file_size}, expected={int(self.offsets[-1])}"
+            )
+
+        self.nframes = int(nframes)
+        self.width = int(width)
+        self.height = int(height)
+        self.payload_offset = payload_offset
+        self._header = {
+            "source_fps": float(source_fps),
+            "total_num_frames": int(total_num_frames),
+            "video_backend": "jpeg_bin",
+            "sample_fps": float(sample_fps),
+            "selected_duration": float(selected_duration),
+            "width": int(width),
+            "height": int(height),
+            "jpeg_quality": int(jpeg_quality),
+            "nframes": int(nframes),
+        }
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """The file metadata, as returned by :func:`read_jpeg_bin_metadata`."""
+        meta = dict(self._header)
+        meta["frame_indices"] = self.frame_indices.tolist()
+        meta["jpeg_lengths"] = self.jpeg_lengths.tolist()
+        meta["crc32"] = None if self.crc32 is None else self.crc32.tolist()
+        meta["payload_offset"] = self.payload_offset
+        return meta
+
+    def payload(self, idx: int) -> memoryview:
+        """Return the raw JPEG bytes of stored frame *idx* without copying.
+
+        Args:
+            idx: Zero-based stored-frame index.
+
+        Returns:
+            A read-only ``memoryview`` slice of the memory map.
+
+        Raises:
+            IndexError: If *idx* is out of range.
+            JPEGBinError: If the payload extends past the end of the file.
+            ValueError: If the reader is closed.
+        """
+        buf = self._buf
+        if buf is None:
+            raise ValueError("I/O operation on closed JPEGBinReader")
+        if not 0 <= idx < self.nframes:
+            raise IndexError(
+                f"Frame index {idx} out of range for {self.nframes} frames"
+            )
+        start = int(self.offsets[idx])
+        end = int(self.offsets[idx + 1])
+        if end > len(buf):
+            raise JPEGBinError(
+                f"Truncated JPEG payload at frame {idx} in {self.bin_path!r}: "
+                f"expected {end - start} bytes, got {max(0, len(buf) - start)}"
+            )
+        return buf[start:end]
+
+    def decode(
+        self, idx: int, target_size: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """Decode stored frame *idx* into an RGB image.
+
+        Args:
+            idx: Zero-based stored-frame index.
+            target_size: Optional ``(width, height)`` to decode to, using a
+                reduced-resolution JPEG decode (see :func:`read_jpeg_bin`).
+
+        Returns:
+            An RGB ``np.ndarray`` of shape ``(H, W, 3)`` and dtype ``uint8``.
+
+        Raises:
+            IndexError: If *idx* is out of range.
+            JPEGBinError: If the payload is truncated or cannot be decoded.
+        """
+        if target_size is None:
+            return _decode_jpeg_payload(self.payload(idx), self.bin_path, idx)
+        _check_target_size(target_size)
+        frame: np.ndarray = self._decode_selection([idx], target_size=target_size)[0]
+        return frame
+
+    def read(
+        self,
+        return_format: str = "numpy",
+        num_frames: Optional[int] = None,
+        frame_interval: Optional[int] = None,
+        start_frame: Optional[int] = None,
+        end_frame: Optional[int] = None,
+        workers: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[Union[np.ndarray, List[str], List[memoryview]], Dict[str, Any], float]:
+        """Read a sub-sampled selection of frames.
+
+        Accepts the same arguments and returns the same ``(video, metadata,
+        sample_fps)`` tuple as :func:`read_jpeg_bin`, but serves the frames
+        from the already-parsed header and index tables.  In ``"bytes"``
+        mode the returned ``memoryview`` objects slice the memory map
+        directly; the mapping stays alive while any of them is referenced.
+
+        Raises:
+            JPEGBinError: If a JPEG payload cannot be decoded (only applies
+                to ``"numpy"`` mode).
+            ValueError: If *return_format* is invalid, *num_frames* is out
+                of range, *frame_interval* is < 1, or *out* does not match
+                the selection.
+
+        Examples:
+            >>> with JPEGBinReader("video.bin") as reader:
+            ...     for _ in range(epochs):
+            ...         clip, meta, fps = reader.read(num_frames=16)
+        """
+        sel, metadata, sample_fps = self._plan(
+            return_format, num_frames, frame_interval, start_frame, end_frame
+        )
+        _check_target_size(target_size)
+
+        result: Union[np.ndarray, List[str], List[memoryview]]
+        if return_format == "base64":
+            result = _encode_base64(self.payload(idx) for idx in sel)
+        elif return_format == "bytes":
+            result = [self.payload(idx) for idx in sel]
+        else:
+            result = self._decode_selection(sel, workers, out, target_size)
+        return result, metadata, sample_fps
+
+    def _plan(
+        self,
+        return_format: str,
+        num_frames: Optional[int],
+        frame_interval: Optional[int],
+        start_frame: Optional[int],
+        end_frame: Optional[int],
+    ) -> Tuple[List[int], Dict[str, Any], float]:
+        """Resolve a :meth:`read` request into ``(sel, metadata, sample_fps)``."""
+        _check_return_format(return_format)
+        sel = _select_frames(
+            self.nframes, num_frames, frame_interval, start_frame, end_frame
+        )
+
+        metadata = dict(self._header)
+        metadata["frame_indices"] = self.frame_indices[sel].tolist()
+        metadata["nframes"] = len(sel)
+        sub_sampled = (
+            num_frames is not None
+            or frame_interval is not None
+            or start_frame is not None
+            or end_frame is not None
+        )
+        sample_fps = _effective_sample_fps(metadata, len(sel), sub_sampled)
+        return sel, metadata, sample_fps
+
+    def read_segments(
+        self,
+        segments: Sequence[Dict[str, Optional[int]]],
+        workers: Optional[int] = None,
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[np.ndarray, Dict[str, Any], float]]:
+        """Read several frame selections, decoding shared frames once.
+
+        Accepts the same *segments* and returns the same list of ``(video,
+        metadata, sample_fps)`` tuples as :func:`read_jpeg_bin_segments`,
+        but serves the frames from the memory map.
+
+        Raises:
+            JPEGBinError: If a JPEG payload cannot be decoded.
+            ValueError: If *segments* is empty or a segment's selection is
+                invalid.
+        """
+        _check_target_size(target_size)
+        sels, unique = _select_segments(self.nframes, segments)
+        decoded = self._decode_selection(unique, workers, None, target_size)
+        metadata = dict(self._header)
+        metadata["frame_indices"] = self.frame_indices
+        return _split_segments(decoded, unique, sels, segments, metadata)
+
+    def __len__(self) -> int:
+        return self.nframes
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        """Decode one or more stored frames.
+
+        Args:
+            key: An ``int`` (negative values count from the end), a
+                ``slice``, or a sequence/array of integer indices or a
+                boolean mask.
+
+        Returns:
+            An ``(H, W, 3)`` RGB image for an integer key, otherwise an
+            ``(T, H, W, 3)`` array with one entry per selected frame.
+
+        Raises:
+            IndexError: If an index is out of range.
+            JPEGBinError: If a payload cannot be decoded.
+        """
+        if isinstance(key, (int, np.integer)):
+            idx = int(key)
+            if idx < 0:
+                idx += self.nframes
+            return self.decode(idx)
+
+        return self._decode_selection(np.arange(self.nframes)[key].tolist())
+
+    def _decode_selection(
+        self,
+        sel: List[int],
+        workers: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+        target_size: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        width, height = target_size or (self.width, self.height)
+        out = _clip_buffer(out, len(sel), height, width)
+        flags = _reduced_decode_flag(self.width, self.height, target_size)
+        payloads = ((idx, self.payload(idx)) for idx in sel)
+        return _decode_into(
+            payloads, out, self.bin_path, workers, flags, target_size is not None
+        )
+
+    def close(self) -> None:
+        """Release the index views and unmap the file."""
+        buf = getattr(self, "_buf", None)
+        if buf is None:
+            return
+        mapping = self._mmap
+        self.frame_indices = self.jpeg_lengths = self.crc32 = None  # type: ignore
+        self._buf = None
+        self._mmap = None
+        self._owner = None
+        try:
+            buf.release()
+            if mapping is not None:
+                mapping.close()
+        except BufferError:
+            # A caller still holds a view into the mapping; it is unmapped
+            # once the last reference is garbage-collected.
+            pass
+
+    @property
+    def closed(self) -> bool:
+        """Whether :meth:`close` has been called."""
+        return getattr(self, "_buf", None) is None
+
+    def __enter__(self) -> "JPEGBinReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def repack_jpeg_bin(
+    input_path: str,
+    output_path: str,
+    jpeg_quality: Optional[int] = None,
+    max_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Re-encode a JPEGBIN1 file at a new JPEG quality and/or resolution.
+
+    Derives a smaller copy of an existing bin without the source video:
+    every frame is decoded, optionally downscaled so the longest side does
+    not exceed *max_size*, and re-encoded at *jpeg_quality*.  Downscaling
+    uses libjpeg's reduced decode (``cv2.IMREAD_REDUCED_COLOR_*``) to skip
+    most of the full-resolution decode, followed by ``cv2.INTER_AREA``.
+    Frames are streamed through a :class:`JPEGBinWriter`, so only a few
+    of them are held in memory at a time.
+    ``frame_indices``, ``total_num_frames``, both frame rates and
+    ``selected_duration`` are copied unchanged.  The output is always
+    written in the current format version, so it also upgrades version 1
+    files, and *output_path* may equal *input_path*.
+
+    Args:
+        input_path: Path to the source ``.bin`` file.
+        output_path: Destination ``.bin`` file path.
+        jpeg_quality: JPEG quality (1-100) of the output.  Defaults to the
+            quality recorded in the source header.
+        max_size: If not ``None``, frames whose longest side exceeds this
+            value are resized proportionally, exactly as in
+            :func:`video_to_jpeg_bin`.  Frames are never enlarged.
+        workers: Number of threads used to decode and encode frames.
+            ``None`` (default) or ``1`` processes frames serially.
+
+    Returns:
+        A dictionary with keys: ``nframes``, ``width``, ``height``,
+        ``jpeg_quality``, ``source_fps``, ``sample_fps``,
+        ``total_num_frames``, ``selected_duration``, ``file_size``.
+
+    Raises:
+        JPEGBinError: If the source file is corrupt or a frame cannot be
+            decoded or encoded.
+        ValueError: If *max_size* is < 1.
+
+    Examples:
+        >>> # A 224px, quality-85 copy of a 448px dataset bin
+        >>> info = repack_jpeg_bin("448/video.bin", "224/video.bin",
+        ...                        jpeg_quality=85, max_size=224, workers=8)
+    """
+    if max_size is not None and max_size < 1:
+        raise ValueError(f"max_size must be >= 1, got {max_size}")
+
+    with JPEGBinReader(input_path) as reader:
+        header = reader.metadata
+        width, height = reader.width, reader.height
+        size = None
+        if max_size is not None and max(width, height) > max_size:
+            scale = max_size / max(width, height)
+            size = (int(width * scale), int(height * scale))
+            width, height = size
+        flags = _reduced_decode_flag(reader.width, reader.height, size)
+        if jpeg_quality is None:
+            jpeg_quality = header["jpeg_quality"]
+
+        # Downscaled frames are resized into a fresh buffer of the new size.
+        tasks = (
+            (
+                reader.payload(i),
+                input_path,
+                i,
+                None if size is None else np.empty((height, width, 3), np.uint8),
+                flags,
+                size is not None,
+                False,
+            )
+            for i in range(reader.nframes)
+        )
+        if workers is None or workers <= 1:
+            frames: Iterator[np.ndarray] = (
+                _decode_jpeg_payload(*task) for task in tasks
+            )
+        else:
+            frames = _imap_bounded(_decode_jpeg_payload, tasks, workers)
+
+        with JPEGBinWriter(
+            output_path,
+            source_fps=header["source_fps"],
+            sample_fps=header["sample_fps"],
+            total_num_frames=header["total_num_frames"],
+            selected_duration=header["selected_duration"],
+            jpeg_quality=jpeg_quality,
+            expected_nframes=reader.nframes,
+            workers=workers,
+        ) as writer:
+            for frame, frame_index in zip(frames, header["frame_indices"]):
+                writer.append(frame, frame_index)
+            nframes = len(writer)
+
+    return {
+        "nframes": nframes,
+        "width": width,
+        "height": height,
+        "jpeg_quality": int(jpeg_quality),
+        "source_fps": header["source_fps"],
+        "sample_fps": header["sample_fps"],
+        "total_num_frames": header["total_num_frames"],
+        "selected_duration": header["selected_duration"],
+        "file_size": os.path.getsize(output_path),
+    }
+
+
+class JPEGBinShardWriter:
+    """Pack many JPEGBIN1 files into a single shard file.
+
+    Each added ``.bin`` is copied verbatim, back to back, followed by a JSON
+    index mapping every key to its ``(offset, size)`` and a fixed-size
+    footer.  Storing many clips per file reduces inode pressure on shared
+    filesystems, and records are laid out in insertion order so a shard can
+    be streamed sequentially.  The shard is written to a temporary file and
+    moved into place atomically with ``os.replace()`` on :meth:`close`.
+
+    Args:
+        output_path: Destination shard path.
+
+    Examples:
+        >>> with JPEGBinShardWriter("shard-0000.jbs") as writer:
+        ...     writer.add("video_a", "video_a.bin")
+        ...     writer.add("video_b", "video_b.bin")
+    """
+
+    def __init__(self, output_path: str) -> None:
+        self.output_path = output_path
+        self._index: Dict[str, Tuple[int, int]] = {}
+        dir_name = os.path.dirname(os.path.abspath(output_path))
+        self._ftmp: Optional[Any] = tempfile.NamedTemporaryFile(
+            dir=dir_name, delete=False, suffix=".tmp"
+        )
+
+    def add(self, key: str, bin_path: str) -> None:
+        """Append the JPEGBIN1 file *bin_path* under *key*.
+
+        Args:
+            key: Unique key the clip is stored under.
+            bin_path: Path to a valid ``.bin`` file.
+
+        Raises:
+            ValueError: If *key* was already added or the writer is closed.
+            JPEGBinError: If *bin_path* is not a valid JPEGBIN1 file.
+        """
+        if self._ftmp is None:
+            raise ValueError("JPEGBinShardWriter is closed")
+        if key in self._index:
+            raise ValueError(f"Duplicate shard key: {key!r}")
+        read_jpeg_bin_metadata(bin_path, validate_size=True)
+
+        offset = self._ftmp.tell()
+        with open(bin_path, "rb") as fin:
+            shutil.copyfileobj(fin, self._ftmp, 1 << 20)
+        self._index[key] = (offset, self._ftmp.tell() - offset)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        """Write the index and footer and move the shard into place."""
+        ftmp = self._ftmp
+        if ftmp is None:
+            return
+        try:
+            index_offset = ftmp.tell()
+            index = json.dumps(self._index, ensure_ascii=False).encode("utf-8")
+            ftmp.write(index)
+            ftmp.write(SHARD_FOOTER_STRUCT.pack(SHARD_MAGIC, index_offset, len(index)))
+            ftmp.close()
+            self._ftmp = None
+            os.replace(ftmp.name, self.output_path)
+        except BaseException:
+            self._ftmp = ftmp
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Discard the shard without touching *output_path*."""
+        ftmp = self._ftmp
+        if ftmp is None:
+            return
+        self._ftmp = None
+        ftmp.close()
+        if os.path.exists(ftmp.name):
+            os.remove(ftmp.name)
+
+    def __enter__(self) -> "JPEGBinShardWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        exc_value: Optional[BaseException],
+        traceback: Optional[Any],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class JPEGBinShardReader(Mapping):
+    """Read-only mapping from keys to clips stored in a JPEGBIN1 shard.
+
+    The shard is opened and memory-mapped once; the footer and JSON index
+    are parsed a single time.  Looking up a key returns a
+    :class:`JPEGBinReader` over that record's slice of the shared mapping,
+    so no further ``open``/``stat`` calls are made per clip.  Keys iterate
+    in on-disk order.
+
+    Args:
+        shard_path: Path to a shard written by :class:`JPEGBinShardWriter`.
+
+    Raises:
+        JPEGBinError: If the shard footer or index is corrupt.
+        FileNotFoundError: If *shard_path* does not exist.
+
+    Examples:
+        >>> with JPEGBinShardReader("shard-0000.jbs") as shard:
+        ...     video, meta, fps = shard.read("video_a", num_frames=16)
+        ...     with shard["video_b"] as reader:
+        ...         frame = reader.decode(0)
+    """
+
+    def __init__(self, shard_path: str) -> None:
+        self.shard_path = shard_path
+        with open(shard_path, "rb") as fin:
+            size = os.fstat(fin.fileno()).st_size
+            if size < SHARD_FOOTER_STRUCT.size:
+                raise JPEGBinError(f"Truncated shard footer: {shard_path!r}")
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(
+                fin.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        try:
+            self._index = self._load_index(size)
+        except BaseException:
+            self.close()
+            raise
+
+    def _load_index(self, size: int) -> Dict[str, Tuple[int, int]]:
+        assert self._mmap is not None
+        magic, index_offset, index_size = SHARD_FOOTER_STRUCT.unpack_from(
+            self._mmap, size - SHARD_FOOTER_STRUCT.size
+        )
+        if magic != SHARD_MAGIC:
+            raise JPEGBinError(
+                f"Invalid shard magic in {self.shard_path!r}: {magic!r} "
+                f"(expected {SHARD_MAGIC!r})"
+            )
+        if index_offset + index_size != size - SHARD_FOOTER_STRUCT.size:
+            raise JPEGBinError(f"Corrupt shard index bounds in {self.shard_path!r}")
+        try:
+            raw = json.loads(self._mmap[index_offset : index_offset + index_size])
+        except ValueError as e:
+            raise JPEGBinError(
+                f"Corrupt shard index in {self.shard_path!r}: {e}"
+            ) from e
+        index = {}
+        for key, (offset, length) in raw.items():
+            if offset + length > index_offset:
+                raise JPEGBinError(
+                    f"Shard record {key!r} in {self.shard_path!r} overlaps the index"
+                )
+            index[key] = (int(offset), int(length))
+        return index
+
+    def __getitem__(self, key: str) -> JPEGBinReader:
+        """Return a :class:`JPEGBinReader` for the clip stored under *key*.
+
+        Raises:
+            KeyError: If *key* is not in the shard.
+            JPEGBinError: If the record is corrupt.
+        """
+        if self._mmap is None:
+            raise ValueError("I/O operation on closed JPEGBinShardReader")
+        offset, length = self._index[key]
+        buf = memoryview(self._mmap)[offset : offset + length]
+        return JPEGBinReader._from_buffer(buf, f"{self.shard_path}[{key}]", owner=self)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def metadata(self, key: str) -> Dict[str, Any]:
+        """Return :func:`read_jpeg_bin_metadata`-equivalent metadata for *key*.
+
+        The ``payload_offset`` is relative to the start of the record.
+        """
+        with self[key] as reader:
+            return reader.metadata
+
+    def read(
+        self, key: str, **kwargs: Any
+    ) -> Tuple[Union[np.ndarray, List[str], List[memoryview]], Dict[str, Any], float]:
+        """Return :func:`read_jpeg_bin`-equivalent results for *key*.
+
+        Keyword arguments are forwarded to :meth:`JPEGBinReader.read`.
+        """
+        with self[key] as reader:
+            return reader.read(**kwargs)
+
+    def close(self) -> None:
+        """Unmap the shard file."""
+        mapping = getattr(self, "_mmap", None)
+        if mapping is None:
+            return
+        self._mmap = None
+        try:
+            mapping.close()
+        except BufferError:
+            # Readers handed out by __getitem__ still reference the mapping;
+            # it is unmapped once they are garbage-collected.
+            pass
+
+    def __enter__(self) -> "JPEGBinShardReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+# Per-file header columns of a JPEGBIN index, with their dtypes.
+_INDEX_COLUMNS = (
+    ("nframes", np.int64),
+    ("total_num_frames", np.int64),
+    ("source_fps", np.float64),
+    ("sample_fps", np.float64),
+    ("selected_duration", np.float64),
+    ("width", np.int64),
+    ("height", np.int64),
+    ("jpeg_quality", np.int64),
+    ("payload_offset", np.int64),
+    ("version", np.int64),
+    ("file_size", np.int64),
+    ("mtime_ns", np.int64),
+)
+# Per-file columns that are not part of read_jpeg_bin_metadata's result.
+_INDEX_EXTRA_COLUMNS = ("version", "file_size", "mtime_ns")
+_INDEX_VERSION = 2
+
+
+def _scan_jpeg_bin(path: str) -> Union[Dict[str, Any], str]:
+    """Read the metadata of one bin for the index, or an error message."""
+    try:
+        st = os.stat(path)
+        meta = read_jpeg_bin_metadata(path, validate_size=True)
+        # The metadata only tell v1 from later versions; take the header's.
+        with open(path, "rb") as fin:
+            meta["version"] = HEADER_STRUCT.unpack(fin.read(HEADER_SIZE))[1]
+    except (OSError, JPEGBinError) as e:
+        return f"{type(e).__name__}: {e}"
+    meta["file_size"] = st.st_size
+    meta["mtime_ns"] = st.st_mtime_ns
+    return meta
+
+
+def build_jpeg_bin_index(
+    root: str, output_path: str, workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Scan a directory of JPEGBIN1 files into a columnar metadata index.
+
+    Every ``*.bin`` file under *root* is read once with
+    :func:`read_jpeg_bin_metadata` (on a thread pool, as the work is
+    I/O-bound), and the headers and index tables of all files are written
+    as NumPy columns to a single ``.npz`` file.  Load it with
+    :class:`JPEGBinIndex` to answer metadata queries without touching the
+    bins.  Files that fail validation are left out and reported.
+
+    The index holds, per file, the header fields plus ``payload_offset``,
+    ``version``, ``file_size`` and ``mtime_ns``; the concatenated
+    ``frame_indices``, ``jpeg_lengths`` and ``crc32`` tables (zeros for
+    version 1 files) with a ``frame_offsets`` column delimiting each file's
+    rows; and the UTF-8 paths relative to *root*.
+
+    Args:
+        root: Directory to scan recursively.
+        output_path: Path of the ``.npz`` index, written atomically.
+        workers: Number of threads reading headers.  Defaults to
+            ``min(32, os.cpu_count() + 4)``.
+
+    Returns:
+        A dict with ``output_path``, ``nfiles`` (indexed files),
+        ``nframes`` (their total stored frames) and ``errors`` (mapping the
+        relative path of each skipped file to its error message).
+
+    Examples:
+        >>> info = build_jpeg_bin_index("bins/", "bins/index.npz", workers=64)
+        >>> index = JPEGBinIndex("bins/index.npz")
+    """
+    root = os.path.abspath(root)
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(".bin"):
+                paths.append(os.path.join(dirpath, name))
+    paths.sort()
+
+    executor = _get_io_executor(workers or _DEFAULT_ASYNC_WORKERS)
+    keys: List[bytes] = []
+    metas: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    for path, meta in zip(paths, executor.map(_scan_jpeg_bin, paths)):
+        rel = os.path.relpath(path, root)
+        if isinstance(meta, str):
+            errors[rel] = meta
+        else:
+            keys.append(rel.encode("utf-8"))
+            metas.append(meta)
+
+    columns: Dict[str, np.ndarray] = {
+        name: np.array([meta[name] for meta in metas], dtype=dtype)
+        for name, dtype in _INDEX_COLUMNS
+    }
+    columns["frame_offsets"] = np.zeros(len(metas) + 1, dtype=np.int64)
+    np.cumsum(columns["nframes"], out=columns["frame_offsets"][1:])
+    for table, dtype in (
+        ("frame_indices", np.uint64),
+        ("jpeg_lengths", np.uint64),
+        ("crc32", np.uint32),
+    ):
+        columns[table] = np.fromiter(
+            itertools.chain.from_iterable(
+                meta[table] or itertools.repeat(0, meta["nframes"]) for meta in metas
+            ),
+            dtype=dtype,
+            count=int(columns["frame_offsets"][-1]),
+        )
+    columns["path_offsets"] = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum([len(k) for k in keys], out=columns["path_offsets"][1:])
+    columns["path_data"] = np.frombuffer(b"".join(keys), dtype=np.uint8)
+    columns["root"] = np.array(root)
+    columns["index_version"] = np.array(_INDEX_VERSION)
+
+    dir_name = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.NamedTemporaryFile(dir=dir_name, delete=False, suffix=".tmp") as ftmp:
+        try:
+            # numpy's stubs type **kwds as if they could be allow_pickle.
+            np.savez(ftmp, **cast(Dict[str, Any], columns))
+        except BaseException:
+            os.remove(ftmp.name)
+            raise
+    os.replace(ftmp.name, output_path)
+
+    return {
+        "output_path": output_path,
+        "nfiles": len(metas),
+        "nframes": int(columns["frame_offsets"][-1]),
+        "errors": errors,
+    }
+
+
+class JPEGBinIndex:
+    """Metadata of a directory of JPEGBIN1 files, served from one index file.
+
+    Loads an index written by :func:`build_jpeg_bin_index` and answers
+    :func:`read_jpeg_bin_metadata` queries from memory: a lookup is a dict
+    access plus slicing of the concatenated index tables, and the bins
+    themselves are never opened.  Whole columns are available for
+    vectorized filtering (e.g. all clips with at least 16 frames).
+
+    Args:
+        index_path: Path to the ``.npz`` index.
+
+    Attributes:
+        root: Absolute directory the index was built from.
+
+    Raises:
+        JPEGBinError: If the file is not a supported index.
+
+    Examples:
+        >>> index = JPEGBinIndex("bins/index.npz")
+        >>> meta = index.metadata("clips/0001.bin")   # relative to root
+        >>> long = [p for p, n in zip(index, index.column("nframes")) if n >= 16]
+    """
+
+    def __init__(self, index_path: str) -> None:
+        with np.load(index_path, allow_pickle=False) as data:
+            columns: Dict[str, np.ndarray] = {name: data[name] for name in data.files}
+        if int(columns.get("index_version", -1)) != _INDEX_VERSION:
+            raise JPEGBinError(f"Unsupported JPEGBIN index: {index_path!r}")
+        self.root = str(columns.pop("root"))
+        self._columns = columns
+        path_data = columns.pop("path_data").tobytes()
+        bounds = columns.pop("path_offsets").tolist()
+        self._paths = [
+            path_data[start:end].decode("utf-8")
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+
+    def _row(self, bin_path: str) -> int:
+        row = self._rows.get(bin_path)
+        if row is None:
+            rel = os.path.relpath(os.path.abspath(bin_path), self.root)
+            row = self._rows.get(rel)
+            if row is None:
+                raise KeyError(bin_path)
+        return row
+
+    def metadata(self, bin_path: str) -> Dict[str, Any]:
+        """Return the metadata of one bin, as :func:`read_jpeg_bin_metadata`.
+
+        Args:
+            bin_path: Path relative to :attr:`root`, or any path resolving
+                to a file under it.
+
+        Raises:
+            KeyError: If the file is not in the index.
+        """
+        row = self._row(bin_path)
+        cols = self._columns
+        start, end = cols["frame_offsets"][row : row + 2]
+        meta: Dict[str, Any] = {
+            name: cols[name][row].item()
+            for name, _ in _INDEX_COLUMNS
+            if name not in _INDEX_EXTRA_COLUMNS
+        }
+        meta["video_backend"] = "jpeg_bin"
+        meta["frame_indices"] = cols["frame_indices"][start:end].tolist()
+        meta["jpeg_lengths"] = cols["jpeg_lengths"][start:end].tolist()
+        meta["crc32"] = None
+        if cols["version"][row] >= 2:
+            meta["crc32"] = cols["crc32"][start:end].tolist()
+        return meta
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a per-file column (e.g. ``"nframes"``), in :meth:`paths` order."""
+        if name not in dict(_INDEX_COLUMNS):
+            raise KeyError(name)
+        return self._columns[name]
+
+    @property
+    def paths(self) -> List[str]:
+        """Indexed paths, relative to :attr:`root`."""
+        return list(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __contains__(self, bin_path: object) -> bool:
+        if not isinstance(bin_path, str):
+            return False
+        try:
+            self._row(bin_path)
+        except KeyError:
+            return False
+        return True
+
+
+async def aread_jpeg_bin_metadata(
+    bin_path: str,
+    validate_size: bool = True,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Asynchronous counterpart of :func:`read_jpeg_bin_metadata`.
+
+    The header read runs on the shared I/O thread pool, so the event loop is
+    never blocked on file I/O.
+
+    Args:
+        bin_path: Path to the ``.bin`` file.
+        validate_size: As for :func:`read_jpeg_bin_metadata`.
+        semaphore: Optional semaphore shared between calls to bound the
+            number of files being read concurrently.
+        workers: Minimum size of the shared I/O thread pool.  Defaults to
+            ``min(32, os.cpu_count() + 4)``.
+
+    Returns:
+        The metadata dictionary from :func:`read_jpeg_bin_metadata`.
+
+    Examples:
+        >>> meta = await aread_jpeg_bin_metadata("video.bin")
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_io_executor(workers or _DEFAULT_ASYNC_WORKERS)
+    call = functools.partial(read_jpeg_bin_metadata, bin_path, validate_size)
+    if semaphore is None:
+        return await loop.run_in_executor(executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(executor, call)
+
+
+async def aread_jpeg_bin(
+    bin_path: str,
+    return_format: str = "numpy",
+    num_frames: Optional[int] = None,
+    frame_interval: Optional[int] = None,
+    start_frame: Optional[int] = None,
+    end_frame: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    target_size: Optional[Tuple[int, int]] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    workers: Optional[int] = None,
+) -> Tuple[Union[np.ndarray, List[str], List[memoryview]], Dict[str, Any], float]:
+    """Asynchronous counterpart of :func:`read_jpeg_bin`.
+
+    The file is opened and indexed on the shared I/O thread pool, and each
+    selected frame is decoded as a separate pool task, so many clips can be
+    in flight at once without blocking the event loop or queueing a small
+    clip behind a large one.  Cancelling the awaiting task cancels all
+    frame decodes that have not started yet.
+
+    Args:
+        bin_path: Path to the ``.bin`` file.
+        return_format: As for :func:`read_jpeg_bin`.
+        num_frames: As for :func:`read_jpeg_bin`.
+        frame_interval: As for :func:`read_jpeg_bin`.
+        start_frame: As for :func:`read_jpeg_bin`.
+        end_frame: As for :func:`read_jpeg_bin`.
+        out: As for :func:`read_jpeg_bin`.
+        target_size: As for :func:`read_jpeg_bin`.
+        semaphore: Optional semaphore shared between calls to bound the
+            number of clips being read concurrently.
+        workers: Minimum size of the shared I/O thread pool.  Defaults to
+            ``min(32, os.cpu_count() + 4)``.
+
+    Returns:
+        The same ``(video, metadata, sample_fps)`` tuple as
+        :func:`read_jpeg_bin`.
+
+    Raises:
+        JPEGBinError: If the file is corrupt or a payload cannot be decoded.
+        ValueError: For invalid arguments, as :func:`read_jpeg_bin`.
+
+    Examples:
+        >>> limit = asyncio.Semaphore(64)
+        >>> clips = await asyncio.gather(
+        ...     *(aread_jpeg_bin(p, num_frames=16, semaphore=limit) for p in paths)
+        ... )
+    """
+    if semaphore is None:
+        return await _aread_jpeg_bin(
+            bin_path,
+            return_format,
+            num_frames,
+            frame_interval,
+            start_frame,
+            end_frame,
+            out,
+            target_size,
+            workers,
+        )
+    async with semaphore:
+        return await _aread_jpeg_bin(
+            bin_path,
+            return_format,
+            num_frames,
+            frame_interval,
+            start_frame,
+            end_frame,
+            out,
+            target_size,
+            workers,
+        )
+
+
+async def _aread_jpeg_bin(
+    bin_path: str,
+    return_format: str,
+    num_frames: Optional[int],
+    frame_interval: Optional[int],
+    start_frame: Optional[int],
+    end_frame: Optional[int],
+    out: Optional[np.ndarray],
+    target_size: Optional[Tuple[int, int]],
+    workers: Optional[int],
+) -> Tuple[Union[np.ndarray, List[str], List[memoryview]], Dict[str, Any], float]:
+    loop = asyncio.get_running_loop()
+    executor = _get_io_executor(workers or _DEFAULT_ASYNC_WORKERS)
+    _check_target_size(target_size)
+
+    reader = await loop.run_in_executor(executor, JPEGBinReader, bin_path)
+    futures: List[Future] = []
+    try:
+        sel, metadata, sample_fps = reader._plan(
+            return_format, num_frames, frame_interval, start_frame, end_frame
+        )
+        result: Union[np.ndarray, List[str], List[memoryview]]
+        if return_format == "base64":
+            # One task for the whole clip: encoding is cheap per frame.
+            payloads = [reader.payload(idx) for idx in sel]
+            futures = [executor.submit(_encode_base64, payloads)]
+        elif return_format == "bytes":
+            return [reader.payload(idx) for idx in sel], metadata, sample_fps
+        else:
+            width, height = target_size or (reader.width, reader.height)
+            result = _clip_buffer(out, len(sel), height, width)
+            flags = _reduced_decode_flag(reader.width, reader.height, target_size)
+            resize = target_size is not None
+            futures = [
+                executor.submit(
+                    _decode_jpeg_payload,
+                    reader.payload(idx),
+                    bin_path,
+                    idx,
+                    result[i],
+                    flags,
+                    resize,
+                )
+                for i, idx in enumerate(sel)
+            ]
+        encoded = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        if return_format == "base64":
+            result = encoded[0]
+        return result, metadata, sample_fps
+    except BaseException:
+        # Cancel work that has not started and wait for tasks that are
+        # already running, so the mapping is not closed underneath them.
+        for fut in futures:
+            fut.cancel()
+        running = [asyncio.wrap_future(f) for f in futures if not f.done()]
+        if running:
+            await asyncio.wait(running)
+        raise
+    finally:
+        reader.close()